@@ -3,6 +3,8 @@
 """
 高级新闻爬虫 - 支持JavaScript渲染的网站
 使用Selenium + Chrome Headless
+
+已由 advanced_news_crawler_v3.py 取代（共享浏览器池并行爬取相同的网站），保留供对照
 """
 
 import json
@@ -14,6 +16,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
+from keyword_matcher import get_sector_matcher
+from snapshot_store import get_snapshot_store
+from extractor_registry import get_extractor_registry
 
 class AdvancedNewsCrawler:
     """高级新闻爬虫 - 支持JS渲染"""
@@ -23,6 +28,7 @@ class AdvancedNewsCrawler:
         self.results = []
         self.config = self.load_config()
         self.keywords = self.config['sectors'][sector]['keywords']
+        self.matcher = get_sector_matcher(sector, self.keywords)
         
         # 初始化Chrome浏览器（无头模式）
         chrome_options = Options()
@@ -43,11 +49,8 @@ class AdvancedNewsCrawler:
             return json.load(f)
     
     def match_keywords(self, title):
-        """检查标题是否包含关键词"""
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        return False
+        """检查标题是否包含关键词（多模式自动机，一次扫描）"""
+        return self.matcher.search(title)
     
     def crawl_mohrss(self):
         """爬取人社部地方动态"""
@@ -215,40 +218,29 @@ class AdvancedNewsCrawler:
         """
         爬取文章内容
         
+        先查网页快照，未命中时用浏览器渲染，并把渲染后的页面写入快照；
+        两种情况都由提取器注册表按域名选择提取器（含 CONTENT_SELECTORS 选择器）提取正文。
+        
         参数:
             url: 文章URL
         
         返回:
             文章内容字符串
         """
-        try:
-            self.driver.get(url)
-            time.sleep(2)
-            
-            # 尝试多种常见的文章内容选择器
-            content_selectors = [
-                'div.article-content',
-                'div.content',
-                'div.news-content',
-                'div.detail-content',
-                'article',
-                'div#content',
-                'div.main-content'
-            ]
-            
-            for selector in content_selectors:
-                try:
-                    content_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    content = content_elem.text.strip()
-                    if content and len(content) > 100:  # 确保内容足够长
-                        return content
-                except:
-                    continue
-            
-            return ""
-        except Exception as e:
-            print(f"    ⚠️ 内容爬取失败: {e}")
-            return ""
+        store = get_snapshot_store()
+        html = store.get(url)
+        if html is None:
+            try:
+                self.driver.get(url)
+                time.sleep(2)
+                html = self.driver.page_source
+                store.put(url, html)
+            except Exception as e:
+                print(f"    ⚠️ 内容爬取失败: {e}")
+                return ""
+        
+        content, _ = get_extractor_registry().extract(url, html)
+        return content or ""
     
     def crawl_all_sources(self, fetch_content=False):
         """
@@ -299,8 +291,9 @@ class AdvancedNewsCrawler:
         print(f"📊 共保存: {len(self.results)} 条新闻")
     
     def close(self):
-        """关闭浏览器"""
+        """关闭浏览器（并写入提取器统计）"""
         self.driver.quit()
+        get_extractor_registry().flush()
 
 
 def main():
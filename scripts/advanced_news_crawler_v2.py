@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 高级新闻爬虫 V2 - 使用requests-html支持JavaScript渲染
+
+已由 advanced_news_crawler_v3.py 取代（共享浏览器池并行爬取相同的网站），保留供对照
 """
 
 import json
@@ -9,6 +11,7 @@ import os
 from datetime import datetime
 from requests_html import HTMLSession
 import time
+from keyword_matcher import get_sector_matcher
 
 class AdvancedNewsCrawlerV2:
     """高级新闻爬虫 - 使用requests-html"""
@@ -18,6 +21,7 @@ class AdvancedNewsCrawlerV2:
         self.results = []
         self.config = self.load_config()
         self.keywords = self.config['sectors'][sector]['keywords']
+        self.matcher = get_sector_matcher(sector, self.keywords)
         self.session = HTMLSession()
     
     def load_config(self):
@@ -28,11 +32,8 @@ class AdvancedNewsCrawlerV2:
             return json.load(f)
     
     def match_keywords(self, title):
-        """检查标题是否包含关键词"""
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        return False
+        """检查标题是否包含关键词（多模式自动机，一次扫描）"""
+        return self.matcher.search(title)
     
     def crawl_mohrss(self):
         """爬取人社部地方动态"""
@@ -2,13 +2,41 @@
 # -*- coding: utf-8 -*-
 """
 高级新闻爬虫 V3 - 使用playwright支持JavaScript渲染
+
+列表页和文章页在共享浏览器池（browser_pool.py）中并行打开，按就绪选择器等待。
+静态 HTML 中就能取到足够新闻链接的网站不用浏览器渲染（按域名记住，见 render_probe.py）。
+AdvancedNewsCrawler（Selenium）和 AdvancedNewsCrawlerV2（requests-html）爬取相同的网站，已由本版本取代。
 """
 
+import asyncio
 import json
 import os
 from datetime import datetime
-from playwright.sync_api import sync_playwright
+from browser_pool import BrowserPool, crawl_listing, fetch_text
+from extractor_registry import CONTENT_SELECTORS
 import time
+from keyword_matcher import get_sector_matcher
+from render_probe import get_render_memory
+
+# 各板块的列表页：links 为新闻链接选择器（取前30个），title_attr 指定时标题优先取该属性
+SECTOR_SOURCES = {
+    'education': [
+        {'name': '人社部', 'label': '人社部地方动态',
+         'url': 'https://www.mohrss.gov.cn/SYrlzyhshbzb/dongtaixinwen/dfdt/',
+         'links': 'ul.list_16 li a', 'limit': 30},
+    ],
+    'healthcare': [
+        # 直接选择带title属性的a标签
+        {'name': '中国证券报', 'label': '中国证券报财经要闻', 'url': 'https://www.cs.com.cn/xwzx/hg/',
+         'links': 'li a[title]', 'title_attr': 'title', 'limit': 30},
+        {'name': '财联社', 'label': '财联社头条', 'url': 'https://www.cls.cn/depth?id=1000',
+         'links': 'div.depth-item a.item-title, div.article-item a', 'limit': 30},
+        {'name': '观点网', 'label': '观点网资讯', 'url': 'https://www.guandian.cn/news/',
+         'links': 'div.news-item a, li.news-item a, div.article a', 'limit': 30},
+        {'name': '经济参考报', 'label': '经济参考报要闻', 'url': 'http://jjckb.xinhuanet.com/yw.htm',
+         'links': 'ul.news-list li a, div.news-list a, div.list a', 'limit': 30},
+    ],
+}
 
 class AdvancedNewsCrawlerV3:
     """高级新闻爬虫 - 使用playwright"""
@@ -18,9 +46,7 @@ class AdvancedNewsCrawlerV3:
         self.results = []
         self.config = self.load_config()
         self.keywords = self.config['sectors'][sector]['keywords']
-        self.playwright = None
-        self.browser = None
-        self.page = None
+        self.matcher = get_sector_matcher(sector, self.keywords)
     
     def load_config(self):
         """加载配置文件"""
@@ -29,225 +55,48 @@ class AdvancedNewsCrawlerV3:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def start_browser(self):
-        """启动浏览器"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=True)
-        self.page = self.browser.new_page()
-    
-    def close_browser(self):
-        """关闭浏览器"""
-        if self.page:
-            self.page.close()
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-    
     def match_keywords(self, title):
-        """检查标题是否包含关键词"""
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        return False
-    
-    def crawl_mohrss(self):
-        """爬取人社部地方动态"""
-        url = "https://www.mohrss.gov.cn/SYrlzyhshbzb/dongtaixinwen/dfdt/"
-        print(f"\n🔍 爬取: 人社部地方动态")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('ul.list_16 li a')
-            
-            count = 0
-            for link in links[:30]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.mohrss.gov.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '人社部',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_cs_com_cn(self):
-        """爬取中国证券报财经要闻"""
-        url = "https://www.cs.com.cn/xwzx/hg/"
-        print(f"\n🔍 爬取: 中国证券报财经要闻")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            # 修改选择器：直接选择带title属性的a标签
-            links = self.page.query_selector_all('li a[title]')
-            
-            count = 0
-            for link in links[:30]:
-                try:
-                    title = link.get_attribute('title') or link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.cs.com.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '中国证券报',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_cls_cn(self):
-        """爬取财联社头条"""
-        url = "https://www.cls.cn/depth?id=1000"
-        print(f"\n🔍 爬取: 财联社头条")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('div.depth-item a.item-title, div.article-item a')
-            
-            count = 0
-            for link in links[:30]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.cls.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '财联社',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
+        """检查标题是否包含关键词（多模式自动机，一次扫描）"""
+        return self.matcher.search(title)
     
-    def crawl_guandian_cn(self):
-        """爬取观点网资讯"""
-        url = "https://www.guandian.cn/news/"
-        print(f"\n🔍 爬取: 观点网资讯")
-        
+    async def crawl_source(self, pool, source):
+        """爬取一个网站的列表页，返回匹配的新闻"""
         try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('div.news-item a, li.news-item a, div.article a')
-            
-            count = 0
-            for link in links[:30]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.guandian.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '观点网',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
+            links = await crawl_listing(pool, source, get_render_memory())
         except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_jjckb(self):
-        """爬取经济参考报要闻"""
-        url = "http://jjckb.xinhuanet.com/yw.htm"
-        print(f"\n🔍 爬取: 经济参考报要闻")
+            print(f"  ✗ {source['label']} 爬取失败: {e}")
+            return []
         
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(2000)
-            
-            links = self.page.query_selector_all('ul.news-list li a, div.news-list a, div.list a')
-            
-            count = 0
-            for link in links[:30]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '经济参考报',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
+        news_list = []
+        for title, href in links:
+            if title and len(title) > 10 and self.match_keywords(title):
+                news_list.append({
+                    'title': title,
+                    'url': href,
+                    'source': source['name'],
+                    'date': datetime.now().strftime('%Y-%m-%d')
+                })
+        print(f"  ✓ {source['label']}: 找到 {len(news_list)} 条匹配新闻")
+        return news_list
     
-    def fetch_article_content(self, url):
-        """爬取文章内容"""
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(2000)
+    async def crawl_async(self, sources, fetch_content=False):
+        """在共享浏览器池中并行打开列表页和文章页"""
+        async with BrowserPool() as pool:
+            print(f"\n🔍 并行爬取 {len(sources)} 个网站（并发上限 {pool.max_contexts}）")
+            for news_list in await asyncio.gather(*(self.crawl_source(pool, source) for source in sources)):
+                self.results.extend(news_list)
             
-            content_selectors = [
-                'div.article-content', 'div.content', 'div.news-content',
-                'div.detail-content', 'article', 'div#content'
-            ]
-            
-            for selector in content_selectors:
-                try:
-                    element = self.page.query_selector(selector)
-                    if element:
-                        content = element.inner_text().strip()
-                        if content and len(content) > 100:
-                            return content
-                except:
-                    continue
+            if fetch_content and self.results:
+                print(f"\n📄 开始爬取文章内容（{len(self.results)} 篇）...")
+                contents = await asyncio.gather(*(
+                    fetch_text(pool, news['url'], CONTENT_SELECTORS) for news in self.results
+                ))
+                for news, content in zip(self.results, contents):
+                    news['content'] = content
+                print(f"  ✓ 有正文: {sum(1 for content in contents if content)}/{len(contents)} 篇")
             
-            return ""
-        except:
-            return ""
+            pool.print_stats()
+            get_render_memory().print_stats()
     
     def crawl_all_sources(self, fetch_content=False):
         """批量爬取所有配置的新闻源"""
@@ -255,26 +104,9 @@ class AdvancedNewsCrawlerV3:
         print(f"开始爬取 {self.config['sectors'][self.sector]['name']} 板块")
         print(f"{'='*60}")
         
-        self.start_browser()
-        
-        try:
-            if self.sector == 'education':
-                self.crawl_mohrss()
-            elif self.sector == 'healthcare':
-                self.crawl_cs_com_cn()
-                self.crawl_cls_cn()
-                self.crawl_guandian_cn()
-                self.crawl_jjckb()
-            
-            if fetch_content and self.results:
-                print(f"\n📄 开始爬取文章内容...")
-                for i, news in enumerate(self.results, 1):
-                    print(f"  {i}/{len(self.results)}: {news['title'][:30]}...")
-                    content = self.fetch_article_content(news['url'])
-                    news['content'] = content
-                    time.sleep(1)
-        finally:
-            self.close_browser()
+        start = time.time()
+        asyncio.run(self.crawl_async(SECTOR_SOURCES.get(self.sector, []), fetch_content))
+        print(f"⏱️  总耗时: {time.time() - start:.1f}秒")
     
     def save_results(self):
         """保存结果"""
@@ -8,6 +8,8 @@ from googlenewsdecoder import new_decoderv1
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+from google_url_cache import GoogleURLCache
+
 def decode_single_url(url):
     """解码单个Google News URL"""
     try:
@@ -27,8 +29,23 @@ def decode_single_url(url):
         'success': False
     }
 
-def decode_urls_async(urls, max_workers=10):
-    """异步解码多个URL"""
+def decode_urls_async(urls, max_workers=10, use_cache=True):
+    """
+    异步解码多个URL
+    
+    默认先查文章ID → 原始链接的持久化缓存，只有未命中的才分批并发联网解码
+    （见 google_url_cache.py）；use_cache=False 时每个URL都联网解码。
+    """
+    if use_cache:
+        cache = GoogleURLCache(workers=max_workers)
+        resolved = cache.resolve(urls)
+        cache.print_stats()
+        cache.close()
+        return [
+            {'original_url': url, 'actual_url': resolved.get(url), 'success': bool(resolved.get(url))}
+            for url in urls
+        ]
+    
     results = []
     
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准/一致性测试共用的测试数据
+
+真实标题来自 data/raw/*.csv；build_news 在此基础上构造带来源和内容的新闻。
+"""
+
+import csv
+import glob
+import os
+import random
+
+SAMPLE_SOURCES = ['人民网', '新华网', '某市人民政府', '教育局官网', '网易新闻', '澎湃新闻', '']
+
+
+def load_seed_titles():
+    """从 data/raw/*.csv 读取真实标题，作为字符分布和种子标题"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    titles = []
+    for path in sorted(glob.glob(os.path.join(script_dir, '../data/raw/*.csv'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                title = (row.get('title') or '').strip()
+                if title:
+                    titles.append(title)
+    return titles
+
+
+def build_news(titles, seed=42):
+    """用真实标题构造新闻（随机来源、内容，部分标题转为大写以覆盖大小写规则）"""
+    rng = random.Random(seed)
+    news_list = []
+    for title in titles:
+        if rng.random() < 0.1:
+            title = title.upper()
+        news_list.append({
+            'title': title,
+            'source': rng.choice(SAMPLE_SOURCES),
+            'content': '内容' * rng.choice([0, 20, 80])
+        })
+    return news_list
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享浏览器池 - 一个 Chromium 进程，按并发上限分配相互隔离的浏览器上下文
+
+CompleteCrawler / AdvancedNewsCrawlerV3 以前各自启动 Chromium、只开一个页面，
+逐个网站访问，每个网站固定等待 2~3 秒。这里改为：
+- 一个浏览器进程（Playwright async API），每个任务新建一个上下文（Cookie、缓存互不影响），用完关闭
+- asyncio.Semaphore 限制同时打开的上下文数（browser_pool.max_contexts）
+- goto_ready() 打开页面后等待就绪选择器（列表链接、正文元素）出现，不再固定等待；
+  选择器超时时退回等待 load 事件；没有就绪选择器或只有泛指的 'a'（DOMContentLoaded 时
+  导航链接就已存在，说明不了列表渲染完成）时等待 load 和 networkidle
+- 渲染配置（render profile）：拦截请求，丢弃图片、字体、样式表、音视频和已知广告/统计域名，
+  可选在 DOMContentLoaded 之后丢弃所有脚本请求；按域名在 browser_pool.site_profiles 中覆盖
+  （test_render_profile.py 逐站对比开启前后的传输字节数和就绪耗时）
+
+同步代码（UniversalNewsCrawler、render_probe）通过 get_browser_thread().render(url)
+使用在后台线程事件循环中运行的同一个浏览器池。
+
+用法:
+    async with BrowserPool() as pool:
+        results = await asyncio.gather(*(crawl_listing(pool, source) for source in sources))
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin
+
+from extractor_registry import domain_of
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 不能说明列表已渲染的就绪选择器（页面框架里的导航链接一开始就能匹配）
+GENERIC_READY_SELECTORS = {'a', 'a[href]'}
+
+# 一次 evaluate 取回前 limit 个链接的 [标题, href]（标题优先取 title_attr 属性，否则取文字）
+COLLECT_LINKS_JS = '''(elements, [limit, titleAttr]) => elements.slice(0, limit).map(e => [
+    ((titleAttr && e.getAttribute(titleAttr)) || e.innerText || '').trim(),
+    e.getAttribute('href') || ''
+])'''
+
+
+def load_browser_settings():
+    """从 references/config.json 读取 browser_pool 配置"""
+    settings = {
+        'max_contexts': 4,
+        'headless': True,
+        'nav_timeout': 30000,
+        'ready_timeout': 10000,
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        # 渲染配置：爬虫只读链接和文字，这些资源不必下载
+        'block_resources': True,
+        'block_types': ['image', 'font', 'stylesheet', 'media'],
+        'block_hosts': [
+            'hm.baidu.com', 'tongji.baidu.com', 'pos.baidu.com', 'cpro.baidustatic.com',
+            'cnzz.com', 'umeng.com', '51.la', 'google-analytics.com', 'googletagmanager.com',
+            'doubleclick.net', 'googlesyndication.com'
+        ],
+        'block_js_after_dcl': False,
+        # 域名 → 覆盖上面的 block_types / block_hosts / block_js_after_dcl
+        'site_profiles': {}
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('browser_pool', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+class BrowserPool:
+    """共享一个浏览器进程，按并发上限分配隔离的上下文"""
+    
+    def __init__(self, max_contexts=None, headless=None, block_resources=None):
+        """
+        Args:
+            max_contexts: 同时打开的上下文数上限
+            headless: 是否无头模式
+            block_resources: 是否启用渲染配置（拦截非必要资源）
+        """
+        settings = load_browser_settings()
+        self.settings = settings
+        self.max_contexts = max(1, max_contexts or settings['max_contexts'])
+        self.headless = settings['headless'] if headless is None else headless
+        self.nav_timeout = settings['nav_timeout']
+        self.ready_timeout = settings['ready_timeout']
+        self.user_agent = settings['user_agent']
+        self.block_resources = settings['block_resources'] if block_resources is None else block_resources
+        self.semaphore = asyncio.Semaphore(self.max_contexts)
+        self.stats = {'pages': 0, 'ready': 0, 'fallback': 0, 'failed': 0, 'blocked': 0}
+        self.ready_seconds = []
+        self._playwright = None
+        self._start_lock = asyncio.Lock()
+        self.browser = None
+    
+    async def start(self):
+        """启动浏览器（已启动时直接返回）"""
+        async with self._start_lock:
+            if self.browser is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self
+    
+    async def close(self):
+        """关闭浏览器"""
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def __aenter__(self):
+        # 浏览器在第一次取页面时才启动（列表页都能静态抓取时不启动）
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    def profile_for(self, url):
+        """某个链接的渲染配置（默认配置 + 域名覆盖）；未启用时返回 None"""
+        if not self.block_resources:
+            return None
+        profile = {key: self.settings[key] for key in ('block_types', 'block_hosts', 'block_js_after_dcl')}
+        domain = domain_of(url)
+        for site, overrides in self.settings['site_profiles'].items():
+            if domain == site or domain.endswith('.' + site):
+                profile.update(overrides)
+        return profile
+    
+    async def apply_profile(self, page, profile):
+        """拦截页面请求：丢弃配置中的资源类型和域名，可选丢弃 DOMContentLoaded 之后的脚本"""
+        block_types = set(profile['block_types'])
+        block_hosts = tuple(profile['block_hosts'])
+        state = {'dom_loaded': False}
+        
+        async def handle(route):
+            request = route.request
+            host = domain_of(request.url)
+            if (request.resource_type in block_types
+                    or any(host == blocked or host.endswith('.' + blocked) for blocked in block_hosts)
+                    or (state['dom_loaded'] and request.resource_type == 'script')):
+                self.stats['blocked'] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+        
+        if profile.get('block_js_after_dcl'):
+            page.on('domcontentloaded', lambda _: state.update(dom_loaded=True))
+        await page.route('**/*', handle)
+    
+    @asynccontextmanager
+    async def page(self, url=None):
+        """
+        取得一个新上下文中的页面（超过并发上限时等待），退出时关闭上下文
+        
+        Args:
+            url: 将要打开的链接，用于选择渲染配置
+        """
+        async with self.semaphore:
+            await self.start()
+            context = await self.browser.new_context(user_agent=self.user_agent)
+            try:
+                page = await context.new_page()
+                profile = self.profile_for(url) if url else None
+                if profile:
+                    await self.apply_profile(page, profile)
+                yield page
+            finally:
+                await context.close()
+    
+    async def goto_ready(self, page, url, ready_selector=None):
+        """
+        打开页面并等待就绪
+        
+        DOMContentLoaded 后等待 ready_selector 出现，选择器超时时等待 load 事件；
+        未指定或只是泛指的链接选择器（GENERIC_READY_SELECTORS）时等待 load 事件和 networkidle
+        （异步加载列表的请求结束）。
+        
+        Returns:
+            float: 从开始导航到就绪的秒数
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        
+        start = time.perf_counter()
+        self.stats['pages'] += 1
+        try:
+            await page.goto(url, timeout=self.nav_timeout, wait_until='domcontentloaded')
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        
+        if not ready_selector or ready_selector.strip() in GENERIC_READY_SELECTORS:
+            self.stats['fallback'] += 1
+            for state in ('load', 'networkidle'):
+                try:
+                    await page.wait_for_load_state(state, timeout=self.ready_timeout)
+                except PlaywrightTimeoutError:
+                    break
+        else:
+            try:
+                await page.wait_for_selector(ready_selector, timeout=self.ready_timeout)
+                self.stats['ready'] += 1
+            except PlaywrightTimeoutError:
+                self.stats['fallback'] += 1
+                try:
+                    await page.wait_for_load_state('load', timeout=self.ready_timeout)
+                except PlaywrightTimeoutError:
+                    pass
+        
+        elapsed = time.perf_counter() - start
+        self.ready_seconds.append(elapsed)
+        return elapsed
+    
+    def print_stats(self):
+        """打印页面数和就绪耗时"""
+        stats = self.stats
+        print(f"\n🌐 浏览器池: 页面 {stats['pages']} 个（并发上限 {self.max_contexts}）, "
+              f"选择器就绪 {stats['ready']} 个, 等待 load {stats['fallback']} 个, 打开失败 {stats['failed']} 个, "
+              f"拦截请求 {stats['blocked']} 个")
+        if self.ready_seconds:
+            seconds = sorted(self.ready_seconds)
+            print(f"  就绪耗时: 平均 {sum(seconds) / len(seconds):.2f}秒, "
+                  f"P50 {seconds[len(seconds) // 2]:.2f}秒, 最长 {seconds[-1]:.2f}秒")
+
+
+async def collect_links(page, selector, limit=50, title_attr=None):
+    """一次取回前 limit 个匹配元素的 [(标题, 链接), ...]（相对链接按页面地址补全）"""
+    links = await page.eval_on_selector_all(selector, COLLECT_LINKS_JS, [limit, title_attr])
+    return [(title, urljoin(page.url, href) if href else href) for title, href in links]
+
+
+async def crawl_listing(pool, source, memory=None):
+    """
+    打开一个列表页并取回链接
+    
+    Args:
+        source: {'url', 'links': 链接选择器, 'ready': 就绪选择器（默认同 links）,
+                 'limit': 取前几个（默认50）, 'title_attr': 标题属性（默认取文字）}
+        memory: render_probe.RenderModeMemory；指定时先静态抓取，新闻链接不足才用浏览器，
+                并按域名记住结论（已知需要浏览器的域名直接渲染）
+    
+    Returns:
+        [(标题, 链接), ...]
+    """
+    from render_probe import BROWSER, STATIC, link_yield, static_links
+    
+    if memory is not None and not memory.enabled:
+        memory = None
+    url = source['url']
+    static = None
+    mode = memory.mode(url) if memory is not None else BROWSER
+    if mode != BROWSER:
+        try:
+            static = await asyncio.to_thread(static_links, source)
+        except Exception:
+            static = []
+        if not memory.needs_probe(url, link_yield(static)):
+            if mode is None:
+                memory.remember(url, STATIC, link_yield(static))
+            memory.count(STATIC)
+            return static
+    
+    async with pool.page(url) as page:
+        await pool.goto_ready(page, url, source.get('ready', source['links']))
+        links = await collect_links(page, source['links'], source.get('limit', 50), source.get('title_attr'))
+    
+    if memory is not None:
+        if static is not None and memory.decide(url, link_yield(static), link_yield(links)) == STATIC:
+            memory.count(STATIC)
+            return static
+        memory.count(BROWSER)
+    return links
+
+
+async def fetch_text(pool, url, selectors, min_chars=100):
+    """打开文章页，按选择器顺序取第一个足够长的正文，失败返回空字符串"""
+    try:
+        async with pool.page(url) as page:
+            await pool.goto_ready(page, url, ', '.join(selectors))
+            for selector in selectors:
+                element = await page.query_selector(selector)
+                if element:
+                    content = (await element.inner_text()).strip()
+                    if content and len(content) > min_chars:
+                        return content
+    except Exception:
+        pass
+    return ""
+
+
+class BrowserThread:
+    """在后台线程的事件循环中运行浏览器池，供同步代码调用（浏览器首次使用时才启动）"""
+    
+    def __init__(self, max_contexts=None):
+        self.pool = BrowserPool(max_contexts)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+    
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    async def _render(self, url, ready_selector):
+        async with self.pool.page(url) as page:
+            # 不知道列表结构时 goto_ready 会等到异步加载的请求结束
+            await self.pool.goto_ready(page, url, ready_selector)
+            return await page.content()
+    
+    def render(self, url, ready_selector=None):
+        """渲染页面，返回渲染后的 HTML（可在多个线程中同时调用，并发受浏览器池上限限制）"""
+        return self._call(self._render(url, ready_selector))
+    
+    def close(self):
+        """关闭浏览器并停止事件循环"""
+        self._call(self.pool.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+
+
+_browser_thread = None
+_browser_thread_lock = threading.Lock()
+
+
+def get_browser_thread():
+    """获取进程内共享的后台浏览器（进程退出时自动关闭）"""
+    global _browser_thread
+    with _browser_thread_lock:
+        if _browser_thread is None:
+            _browser_thread = BrowserThread()
+            atexit.register(_browser_thread.close)
+        return _browser_thread
@@ -2,13 +2,45 @@
 # -*- coding: utf-8 -*-
 """
 完整新闻源爬虫 - 针对7个网站的专门爬取逻辑
+
+7个列表页在共享浏览器池（browser_pool.py）中并行打开，按就绪选择器等待，不再逐个固定等待。
+静态 HTML 中就能取到足够新闻链接的网站不用浏览器渲染（按域名记住，见 render_probe.py）。
 """
 
+import asyncio
 import json
 import os
 from datetime import datetime
-from playwright.sync_api import sync_playwright
+from browser_pool import BrowserPool, crawl_listing, fetch_text
+from extractor_registry import CONTENT_SELECTORS
 import time
+from keyword_matcher import get_sector_matcher
+from render_probe import get_render_memory
+
+# 7个网站的列表页：links 为新闻链接选择器，ready 为页面就绪选择器（默认同 links；
+# 只有泛指的 'a' 时 goto_ready 等待 load 和 networkidle，不会在列表渲染前就开始取链接），
+# title_attr 指定时标题取该属性（否则取链接文字）
+SOURCES = [
+    # 中工网的新闻链接在 a 标签中，标题在 title 属性
+    {'name': '中工网', 'label': '中工网滚动新闻', 'url': 'https://www.workercn.cn/roll/',
+     'links': 'a[title]', 'title_attr': 'title'},
+    # 中国证券报的新闻链接在 li a[title] 中
+    {'name': '中国证券报', 'label': '中国证券报财经要闻', 'url': 'https://www.cs.com.cn/xwzx/hg/',
+     'links': 'li a[title]', 'title_attr': 'title'},
+    {'name': '财联社', 'label': '财联社头条', 'url': 'https://www.cls.cn/depth?id=1000',
+     'links': 'a', 'ready': 'div.depth-item a.item-title, div.article-item a'},
+    {'name': '京报网', 'label': '京报网热点', 'url': 'https://www.bjd.com.cn/app/rdjh/redian/',
+     'links': 'a'},
+    {'name': '观点网', 'label': '观点网资讯', 'url': 'https://www.guandian.cn/news/',
+     'links': 'a', 'ready': 'div.news-item a, li.news-item a, div.article a'},
+    {'name': '经济参考报', 'label': '经济参考报要闻', 'url': 'http://jjckb.xinhuanet.com/yw.htm',
+     'links': 'a'},
+    {'name': '人社部', 'label': '人社部地方动态',
+     'url': 'https://www.mohrss.gov.cn/SYrlzyhshbzb/dongtaixinwen/dfdt/', 'links': 'a'},
+]
+
+# 文章内容选择器（按顺序尝试）
+ARTICLE_SELECTORS = CONTENT_SELECTORS + ['div.text', 'div.article-body']
 
 class CompleteCrawler:
     """完整新闻源爬虫"""
@@ -18,9 +50,7 @@ class CompleteCrawler:
         self.results = []
         self.config = self.load_config()
         self.keywords = self.config['sectors'][sector]['keywords']
-        self.playwright = None
-        self.browser = None
-        self.page = None
+        self.matcher = get_sector_matcher(sector, self.keywords)
     
     def load_config(self):
         """加载配置文件"""
@@ -29,304 +59,49 @@ class CompleteCrawler:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def start_browser(self):
-        """启动浏览器"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=True)
-        self.page = self.browser.new_page()
-    
-    def close_browser(self):
-        """关闭浏览器"""
-        if self.page:
-            self.page.close()
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-    
     def match_keywords(self, title):
-        """检查标题是否包含关键词"""
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        return False
-    
-    def crawl_workercn(self):
-        """爬取中工网滚动新闻"""
-        url = "https://www.workercn.cn/roll/"
-        print(f"\n🔍 爬取: 中工网滚动新闻")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            # 中工网的新闻链接在 a 标签中，标题在 title 属性
-            links = self.page.query_selector_all('a[title]')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.get_attribute('title')
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.workercn.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '中工网',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_cs_com_cn(self):
-        """爬取中国证券报财经要闻"""
-        url = "https://www.cs.com.cn/xwzx/hg/"
-        print(f"\n🔍 爬取: 中国证券报财经要闻")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            # 中国证券报的新闻链接在 li a[title] 中
-            links = self.page.query_selector_all('li a[title]')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.get_attribute('title')
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.cs.com.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '中国证券报',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_cls_cn(self):
-        """爬取财联社头条"""
-        url = "https://www.cls.cn/depth?id=1000"
-        print(f"\n🔍 爬取: 财联社头条")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('a')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.cls.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '财联社',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_bjd_com_cn(self):
-        """爬取京报网热点"""
-        url = "https://www.bjd.com.cn/app/rdjh/redian/"
-        print(f"\n🔍 爬取: 京报网热点")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('a')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.bjd.com.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '京报网',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_guandian_cn(self):
-        """爬取观点网资讯"""
-        url = "https://www.guandian.cn/news/"
-        print(f"\n🔍 爬取: 观点网资讯")
-        
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('a')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.guandian.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '观点网',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
+        """检查标题是否包含关键词（多模式自动机，一次扫描）"""
+        return self.matcher.search(title)
     
-    def crawl_jjckb(self):
-        """爬取经济参考报要闻"""
-        url = "http://jjckb.xinhuanet.com/yw.htm"
-        print(f"\n🔍 爬取: 经济参考报要闻")
-        
+    async def crawl_source(self, pool, source):
+        """爬取一个网站的列表页，返回匹配的新闻"""
         try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(2000)
-            
-            links = self.page.query_selector_all('a')
-            
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '经济参考报',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
+            links = await crawl_listing(pool, source, get_render_memory())
         except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def crawl_mohrss(self):
-        """爬取人社部地方动态"""
-        url = "https://www.mohrss.gov.cn/SYrlzyhshbzb/dongtaixinwen/dfdt/"
-        print(f"\n🔍 爬取: 人社部地方动态")
+            print(f"  ✗ {source['label']} 爬取失败: {e}")
+            return []
         
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(3000)
-            
-            links = self.page.query_selector_all('a')
+        news_list = []
+        for title, href in links:
+            if title and len(title) > 10 and self.match_keywords(title):
+                news_list.append({
+                    'title': title,
+                    'url': href,
+                    'source': source['name'],
+                    'date': datetime.now().strftime('%Y-%m-%d')
+                })
+        print(f"  ✓ {source['label']}: 找到 {len(news_list)} 条匹配新闻")
+        return news_list
+    
+    async def crawl_async(self, sources, fetch_content=False):
+        """在一个浏览器进程中并行打开所有列表页（并发受浏览器池上限限制）"""
+        async with BrowserPool() as pool:
+            print(f"\n🔍 并行爬取 {len(sources)} 个网站（并发上限 {pool.max_contexts}）")
+            for news_list in await asyncio.gather(*(self.crawl_source(pool, source) for source in sources)):
+                self.results.extend(news_list)
             
-            count = 0
-            for link in links[:50]:
-                try:
-                    title = link.inner_text().strip()
-                    href = link.get_attribute('href')
-                    
-                    if title and len(title) > 10 and self.match_keywords(title):
-                        if href and not href.startswith('http'):
-                            href = 'https://www.mohrss.gov.cn' + href
-                        
-                        self.results.append({
-                            'title': title,
-                            'url': href,
-                            'source': '人社部',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                        count += 1
-                except:
-                    continue
-            
-            print(f"  ✓ 找到 {count} 条匹配新闻")
-        except Exception as e:
-            print(f"  ✗ 爬取失败: {e}")
-    
-    def fetch_article_content(self, url):
-        """爬取文章内容"""
-        try:
-            self.page.goto(url, timeout=30000)
-            self.page.wait_for_timeout(2000)
-            
-            # 尝试多种常见的文章内容选择器
-            content_selectors = [
-                'div.article-content',
-                'div.content',
-                'div.news-content',
-                'div.detail-content',
-                'article',
-                'div#content',
-                'div.main-content',
-                'div.text',
-                'div.article-body'
-            ]
-            
-            for selector in content_selectors:
-                try:
-                    element = self.page.query_selector(selector)
-                    if element:
-                        content = element.inner_text().strip()
-                        if content and len(content) > 100:
-                            return content
-                except:
-                    continue
+            # 如果需要爬取文章内容
+            if fetch_content and self.results:
+                print(f"\n📄 开始爬取文章内容（{len(self.results)} 篇）...")
+                contents = await asyncio.gather(*(
+                    fetch_text(pool, news['url'], ARTICLE_SELECTORS) for news in self.results
+                ))
+                for news, content in zip(self.results, contents):
+                    news['content'] = content
+                print(f"  ✓ 有正文: {sum(1 for content in contents if content)}/{len(contents)} 篇")
             
-            return ""
-        except:
-            return ""
+            pool.print_stats()
+            get_render_memory().print_stats()
     
     def crawl_all_sources(self, fetch_content=False):
         """批量爬取所有新闻源"""
@@ -334,28 +109,9 @@ class CompleteCrawler:
         print(f"开始爬取所有新闻源")
         print(f"{'='*60}")
         
-        self.start_browser()
-        
-        try:
-            # 爬取所有7个网站
-            self.crawl_workercn()
-            self.crawl_cs_com_cn()
-            self.crawl_cls_cn()
-            self.crawl_bjd_com_cn()
-            self.crawl_guandian_cn()
-            self.crawl_jjckb()
-            self.crawl_mohrss()
-            
-            # 如果需要爬取文章内容
-            if fetch_content and self.results:
-                print(f"\n📄 开始爬取文章内容...")
-                for i, news in enumerate(self.results, 1):
-                    print(f"  {i}/{len(self.results)}: {news['title'][:30]}...")
-                    content = self.fetch_article_content(news['url'])
-                    news['content'] = content
-                    time.sleep(1)
-        finally:
-            self.close_browser()
+        start = time.time()
+        asyncio.run(self.crawl_async(SOURCES, fetch_content))
+        print(f"⏱️  总耗时: {time.time() - start:.1f}秒")
     
     def save_results(self):
         """保存结果"""
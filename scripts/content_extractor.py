@@ -2,46 +2,80 @@
 # -*- coding: utf-8 -*-
 """
 新闻内容提取器 - 集成URL解码和内容提取
+
+下载（网络等待）和正文提取（trafilatura 解析，CPU 密集）分成两级：
+下载线程把 HTML 放入有界队列，提取在按 CPU 核数创建的进程池中进行，
+解析不再受 GIL 限制；队列满时下载线程等待，提取跟不上时不会无限堆积 HTML。
+
+每条链接用哪个提取器由 extractor_registry 按域名的历史统计决定（首选失败时才尝试后备提取器）。
 """
 
-from googlenewsdecoder import new_decoderv1
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+import os
+import queue
+import threading
 import trafilatura
 import time
 
+from extractor_registry import get_extractor_registry, run_plan
+from google_url_cache import get_url_cache
+from snapshot_store import get_snapshot_store
+
+
 class NewsContentExtractor:
     """新闻内容提取器"""
     
-    def __init__(self, max_workers=10):
+    def __init__(self, max_workers=10, extract_processes=None, queue_size=None, registry=None):
+        """
+        Args:
+            max_workers: 下载线程数
+            extract_processes: 提取进程数（默认 CPU 核数）
+            queue_size: 下载 → 提取之间的队列容量（默认提取进程数的4倍）
+            registry: ExtractorRegistry，默认进程内共享的注册表
+        """
         self.max_workers = max_workers
+        self.registry = registry or get_extractor_registry()
+        self.extract_processes = extract_processes or os.cpu_count() or 1
+        self.queue_size = queue_size or self.extract_processes * 4
     
     def decode_google_news_url(self, url):
-        """解码Google News URL"""
+        """解码Google News URL（按文章ID缓存，命中时不联网）"""
         try:
             if 'news.google.com' in url:
-                result = new_decoderv1(url)
-                if result and result.get('status'):
-                    return result['decoded_url']
+                return get_url_cache().resolve_one(url)
         except:
             pass
         return url
     
-    def extract_content(self, url):
-        """提取新闻内容"""
+    def download(self, url):
+        """下载网页（先查网页快照，下载成功后写入快照），失败返回 None"""
+        store = get_snapshot_store()
+        html = store.get(url)
+        if html is not None:
+            return html
         try:
-            downloaded = trafilatura.fetch_url(url)
-            if downloaded:
-                content = trafilatura.extract(
-                    downloaded,
-                    output_format='markdown',
-                    include_comments=False,
-                    include_tables=True
-                )
-                return content
+            html = trafilatura.fetch_url(url)
         except:
-            pass
+            return None
+        if html:
+            store.put(url, html)
+        return html
+    
+    def extract_content(self, url):
+        """提取新闻内容"""
+        downloaded = self.download(url)
+        if downloaded:
+            content, _ = self.registry.extract(url, downloaded)
+            return content
         return None
     
+    def apply_content(self, news_item, actual_url, content):
+        """把提取结果写回新闻项"""
+        news_item['actual_url'] = actual_url
+        news_item['content'] = content if content else ''
+        news_item['has_content'] = bool(content)
+        return news_item
+    
     def process_single_news(self, news_item):
         """处理单条新闻：解码URL + 提取内容"""
         try:
@@ -52,22 +86,45 @@ class NewsContentExtractor:
             content = self.extract_content(actual_url)
             
             # 3. 更新新闻项
-            news_item['actual_url'] = actual_url
-            news_item['content'] = content if content else ''
-            news_item['has_content'] = bool(content)
-            
-            return news_item
+            return self.apply_content(news_item, actual_url, content)
         except Exception as e:
-            news_item['actual_url'] = news_item['url']
-            news_item['content'] = ''
-            news_item['has_content'] = False
-            return news_item
+            return self.apply_content(news_item, news_item['url'], None)
     
-    def process_news_list_async(self, news_list):
-        """异步处理新闻列表"""
+    def process_news_list_async(self, news_list, use_processes=True):
+        """
+        异步处理新闻列表
+        
+        Args:
+            news_list: 新闻列表（原地写入 actual_url / content / has_content）
+            use_processes: 下载线程 + 提取进程池分级处理；False 时每个线程既下载又提取（旧版）
+        """
         print(f"\n开始异步处理 {len(news_list)} 条新闻...")
         start_time = time.time()
         
+        # 先批量解码所有 Google News 链接（缓存命中的不联网），逐条处理时直接命中
+        url_cache = get_url_cache()
+        url_cache.reset_stats()
+        url_cache.resolve([news['url'] for news in news_list if 'news.google.com' in news.get('url', '')])
+        
+        if use_processes:
+            results = self.process_news_list_staged(news_list)
+        else:
+            results = self.process_news_list_threaded(news_list)
+        
+        elapsed = time.time() - start_time
+        success_count = sum(1 for r in results if r['has_content'])
+        
+        print(f"✅ 处理完成")
+        print(f"⏱️  总耗时: {elapsed:.1f}秒")
+        print(f"📝 成功提取内容: {success_count}/{len(news_list)}")
+        url_cache.print_stats()
+        get_snapshot_store().print_stats()
+        self.registry.flush()
+        
+        return results
+    
+    def process_news_list_threaded(self, news_list):
+        """每个线程既下载又提取（提取部分受 GIL 限制）"""
         results = []
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_news = {
@@ -85,11 +142,78 @@ class NewsContentExtractor:
                 if completed % 100 == 0:
                     print(f"  进度: {completed}/{len(news_list)}")
         
-        elapsed = time.time() - start_time
-        success_count = sum(1 for r in results if r['has_content'])
+        return results
+    
+    def process_news_list_staged(self, news_list):
+        """
+        下载线程 → 有界队列 → 提取进程池
         
-        print(f"✅ 处理完成")
-        print(f"⏱️  总耗时: {elapsed:.1f}秒")
-        print(f"📝 成功提取内容: {success_count}/{len(news_list)}")
+        下载线程把 (新闻, 实际链接, HTML) 放入有界队列，队列满时阻塞；
+        主线程从队列取出 HTML 提交给进程池，进行中的提取任务不超过进程数的2倍。
+        """
+        print(f"  下载线程 {self.max_workers} 个 → 队列 {self.queue_size} → "
+              f"提取进程 {self.extract_processes} 个")
+        downloaded = queue.Queue(maxsize=self.queue_size)
+        finished = object()
+        
+        def download(news):
+            actual_url = news.get('url', '')
+            html = None
+            try:
+                actual_url = self.decode_google_news_url(news['url'])
+                html = self.download(actual_url)
+            except Exception:
+                pass
+            downloaded.put((news, actual_url, html))
+        
+        def produce():
+            try:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    list(executor.map(download, news_list))
+            finally:
+                downloaded.put(finished)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        results = []
+        in_flight = {}
+        max_in_flight = self.extract_processes * 2
+        done_downloading = False
+        
+        def collect(futures):
+            for future in futures:
+                news, actual_url = in_flight.pop(future)
+                try:
+                    content, _, attempts = future.result()
+                    self.registry.record(actual_url, attempts)
+                except Exception:
+                    content = None
+                results.append(self.apply_content(news, actual_url, content))
+                if len(results) % 100 == 0:
+                    print(f"  进度: {len(results)}/{len(news_list)}")
+        
+        with ProcessPoolExecutor(max_workers=self.extract_processes) as pool:
+            while not done_downloading or in_flight:
+                if done_downloading or len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    continue
+                
+                item = downloaded.get()
+                if item is finished:
+                    done_downloading = True
+                    continue
+                news, actual_url, html = item
+                if html:
+                    future = pool.submit(run_plan, actual_url, html,
+                                         self.registry.plan(actual_url), self.registry.min_chars)
+                    in_flight[future] = (news, actual_url)
+                else:
+                    results.append(self.apply_content(news, actual_url, None))
+                
+                # 顺便收走已完成的提取结果
+                collect([future for future in in_flight if future.done()])
         
+        producer.join()
         return results
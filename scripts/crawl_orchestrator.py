@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内异步爬虫编排器 - 所有爬虫在同一进程中并发运行
+
+替代 NewsAggregator 中逐个 subprocess 启动 python3 的方式：
+- 爬虫插件接口（name / timeout / load / run）
+- asyncio 并发调度，每个插件独立超时，超时后通过取消事件通知插件尽快收尾
+- 共享一个 HTTP 客户端（连接复用，见 http_client.py），结果在内存中传递
+- 输出每个插件各阶段（导入 / 爬取 / 保存）的耗时
+- 多板块插件（MultiSector*Plugin）：所有板块相同的检索词、列表页和新闻源只抓取一次，
+  结果分发给需要它的板块，返回 [(板块, 新闻), ...]
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CrawlerPlugin:
+    """
+    爬虫插件基类
+    
+    子类需要实现 load()（延迟导入爬虫模块并创建爬虫）和 crawl()（逐个任务爬取，
+    每个任务开始前检查取消事件）。插件在线程池中运行，run() 结束时通过爬虫的
+    save_results() 落盘（同时经过跨天去重），并返回内存中的结果列表。
+    """
+    
+    key = 'base'     # 配置中的标识（crawler_settings.plugin_timeouts）
+    name = 'base'    # 显示名称
+    timeout = 600    # 秒
+    
+    def __init__(self, sector, hours=24, session=None, timeout=None):
+        self.sector = sector
+        self.hours = hours
+        self.session = session
+        if timeout is not None:
+            self.timeout = timeout
+        self.crawler = None
+        self.timings = {}
+    
+    def load(self):
+        """延迟导入爬虫模块并创建爬虫实例"""
+        raise NotImplementedError
+    
+    def crawl(self, cancel_event):
+        """执行爬取（在工作线程中运行）"""
+        raise NotImplementedError
+    
+    def run(self, cancel_event):
+        """导入 → 爬取 → 保存，返回结果列表"""
+        start = time.perf_counter()
+        self.load()
+        self.timings['import'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        self.crawl(cancel_event)
+        self.timings['crawl'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = self.save()
+        self.timings['save'] = time.perf_counter() - start
+        
+        return results
+    
+    def save(self):
+        """保存结果（经过跨天去重），返回结果列表"""
+        self.crawler.save_results()
+        return list(self.crawler.results)
+
+
+def sector_owners(sectors, entries_by_sector):
+    """把 {板块: [条目]} 转为 {条目: [板块]}（保持首次出现顺序）"""
+    owners = {}
+    for sector in sectors:
+        for entry in entries_by_sector.get(sector, []):
+            owners.setdefault(entry, []).append(sector)
+    return owners
+
+
+class GoogleNewsPlugin(CrawlerPlugin):
+    """Google 新闻搜索插件"""
+    
+    key = 'google'
+    name = 'Google搜索'
+    timeout = 600
+    
+    def __init__(self, sector, hours=24, session=None, timeout=None, keywords=None):
+        super().__init__(sector, hours, session, timeout)
+        self.keywords = keywords or []
+    
+    def load(self):
+        from google_news_crawler import GoogleNewsCrawler
+        self.crawler = GoogleNewsCrawler(self.sector, self.hours)
+    
+    def crawl(self, cancel_event):
+        # GNews 内部自行管理请求，无法接入共享会话；关键词在爬虫内部并发检索
+        self.crawler.search_with_keywords(self.keywords, cancel_event=cancel_event)
+
+
+class UniversalPlugin(CrawlerPlugin):
+    """通用新闻爬虫插件（一个爬虫实例依次处理所有信源）"""
+    
+    key = 'universal'
+    name = '通用爬虫'
+    timeout = 600
+    
+    def __init__(self, sector, hours=24, session=None, timeout=None, sources=None, pages=5):
+        super().__init__(sector, hours, session, timeout)
+        self.sources = sources or []
+        self.pages = pages
+    
+    def load(self):
+        from universal_crawler import UniversalNewsCrawler
+        self.crawler = UniversalNewsCrawler(self.sector)
+        if self.session is not None:
+            self.crawler.session = self.session
+    
+    def crawl(self, cancel_event):
+        for source in self.sources:
+            if cancel_event.is_set():
+                print(f"  ⏹️  {self.name} 已取消，跳过剩余信源")
+                break
+            print(f"\n📰 爬取: {source['name']}")
+            self.crawler.crawl_url(source['url'], self.pages)
+
+
+class NewspaperPlugin(CrawlerPlugin):
+    """Newspaper4k 新闻提取插件"""
+    
+    key = 'newspaper'
+    name = 'Newspaper4k'
+    timeout = 900
+    
+    def load(self):
+        from newspaper_crawler import Newspaper4kCrawler
+        self.crawler = Newspaper4kCrawler(self.sector, self.hours)
+    
+    def crawl(self, cancel_event):
+        # newspaper 的 Source 内部自行下载，无法接入共享会话
+        for source_url in self.crawler.news_sources.get(self.sector, []):
+            if cancel_event.is_set():
+                print(f"  ⏹️  {self.name} 已取消，跳过剩余新闻源")
+                break
+            self.crawler.results.extend(self.crawler.crawl_source(source_url))
+        self.crawler.deduplicate()
+
+
+class MultiSectorGooglePlugin(GoogleNewsPlugin):
+    """多板块 Google 新闻插件：每个检索词只搜索一次，结果分发给使用该检索词的板块"""
+    
+    def __init__(self, sectors, hours=24, session=None, timeout=None, keywords=None):
+        """
+        Args:
+            keywords: {板块: [检索词]}
+        """
+        self.sectors = list(sectors)
+        self.sector_keywords = keywords or {}
+        self.owners = sector_owners(self.sectors, self.sector_keywords)
+        super().__init__(self.sectors[0], hours, session, timeout, keywords=list(self.owners))
+    
+    def save(self):
+        from google_news_crawler import GoogleNewsCrawler
+        results = []
+        for sector in self.sectors:
+            crawler = GoogleNewsCrawler(sector, self.hours)
+            for keyword in self.sector_keywords.get(sector, []):
+                crawler.results.extend(dict(news) for news in self.crawler.keyword_results.get(keyword, []))
+            crawler.deduplicate()
+            crawler.save_results()
+            results.extend((sector, news) for news in crawler.results)
+        return results
+
+
+class MultiSectorUniversalPlugin(UniversalPlugin):
+    """多板块通用爬虫插件：每个列表页只下载解析一次，按各板块关键词分别过滤"""
+    
+    def __init__(self, sectors, hours=24, session=None, timeout=None, sources=None, pages=5):
+        """
+        Args:
+            sources: {板块: [{'name': 名称, 'url': 列表页}]}
+        """
+        self.sectors = list(sectors)
+        sources = sources or {}
+        self.names = {}
+        for sector in self.sectors:
+            for source in sources.get(sector, []):
+                self.names.setdefault(source['url'], source['name'])
+        self.owners = sector_owners(self.sectors, {
+            sector: [source['url'] for source in sources.get(sector, [])] for sector in self.sectors
+        })
+        self.crawlers = {}
+        super().__init__(self.sectors[0], hours, session, timeout, pages=pages)
+    
+    def load(self):
+        from universal_crawler import UniversalNewsCrawler
+        for sector in self.sectors:
+            crawler = UniversalNewsCrawler(sector)
+            if self.session is not None:
+                crawler.session = self.session
+            self.crawlers[sector] = crawler
+        self.crawler = self.crawlers[self.sectors[0]]
+    
+    def crawl(self, cancel_event):
+        for url, sectors in self.owners.items():
+            if cancel_event.is_set():
+                print(f"  ⏹️  {self.name} 已取消，跳过剩余列表页")
+                break
+            print(f"\n📰 爬取: {self.names[url]}（{', '.join(sectors)}）")
+            routes = [self.crawlers[sector] for sector in sectors]
+            routes[0].crawl_url(url, self.pages, routes=routes)
+    
+    def save(self):
+        results = []
+        for sector, crawler in self.crawlers.items():
+            crawler.save_results()
+            results.extend((sector, news) for news in crawler.results)
+        return results
+
+
+class MultiSectorNewspaperPlugin(NewspaperPlugin):
+    """多板块 Newspaper4k 插件：每个新闻源只构建一次，结果分发给使用该新闻源的板块"""
+    
+    def __init__(self, sectors, hours=24, session=None, timeout=None):
+        self.sectors = list(sectors)
+        self.owners = {}  # 新闻源在 load() 中读取
+        self.crawlers = {}
+        super().__init__(self.sectors[0], hours, session, timeout)
+    
+    def load(self):
+        from newspaper_crawler import Newspaper4kCrawler
+        self.crawlers = {sector: Newspaper4kCrawler(sector, self.hours) for sector in self.sectors}
+        self.crawler = self.crawlers[self.sectors[0]]
+        self.owners = sector_owners(self.sectors, {
+            sector: crawler.news_sources.get(sector, []) for sector, crawler in self.crawlers.items()
+        })
+    
+    def crawl(self, cancel_event):
+        for source_url, sectors in self.owners.items():
+            if cancel_event.is_set():
+                print(f"  ⏹️  {self.name} 已取消，跳过剩余新闻源")
+                break
+            news_items = self.crawler.crawl_source(source_url)
+            for sector in sectors:
+                self.crawlers[sector].results.extend(dict(news) for news in news_items)
+    
+    def save(self):
+        results = []
+        for sector, crawler in self.crawlers.items():
+            crawler.deduplicate()
+            crawler.save_results()
+            results.extend((sector, news) for news in crawler.results)
+        return results
+
+
+class CrawlOrchestrator:
+    """进程内异步爬虫编排器"""
+    
+    def __init__(self, plugins, cancel_grace=30):
+        """
+        初始化编排器
+        
+        Args:
+            plugins: 爬虫插件列表
+            cancel_grace: 超时后等待插件收尾（完成当前任务并保存）的秒数
+        """
+        self.plugins = plugins
+        self.cancel_grace = cancel_grace
+        self.report = []
+    
+    async def _run_plugin(self, loop, executor, plugin):
+        """运行单个插件（超时后发出取消信号，等待其收尾）"""
+        cancel_event = threading.Event()
+        start = time.perf_counter()
+        future = loop.run_in_executor(executor, plugin.run, cancel_event)
+        
+        status = '完成'
+        results = []
+        try:
+            results = await asyncio.wait_for(asyncio.shield(future), timeout=plugin.timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️  {plugin.name} 超时（{plugin.timeout}秒），通知取消...")
+            cancel_event.set()
+            status = '超时'
+            try:
+                results = await asyncio.wait_for(asyncio.shield(future), timeout=self.cancel_grace)
+            except asyncio.TimeoutError:
+                print(f"✗ {plugin.name} 未能在 {self.cancel_grace} 秒内收尾，放弃结果")
+                status = '放弃'
+            except Exception as e:
+                print(f"✗ {plugin.name} 失败: {e}")
+                status = '失败'
+        except Exception as e:
+            print(f"✗ {plugin.name} 失败: {e}")
+            status = '失败'
+        
+        if status == '完成':
+            print(f"✓ {plugin.name} 完成")
+        
+        self.report.append({
+            'name': plugin.name,
+            'status': status,
+            'count': len(results),
+            'total': time.perf_counter() - start,
+            'timings': dict(plugin.timings)
+        })
+        return results
+    
+    async def run_async(self):
+        """并发运行所有插件，返回合并后的结果列表"""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.plugins)))
+        try:
+            results = await asyncio.gather(*[
+                self._run_plugin(loop, executor, plugin) for plugin in self.plugins
+            ])
+        finally:
+            # 被放弃的插件线程不再等待
+            executor.shutdown(wait=False)
+        
+        all_news = []
+        for plugin_results in results:
+            all_news.extend(plugin_results)
+        return all_news
+    
+    def run(self):
+        """同步入口"""
+        self.report = []
+        start = time.perf_counter()
+        all_news = asyncio.run(self.run_async())
+        self.wall_time = time.perf_counter() - start
+        return all_news
+    
+    def print_report(self):
+        """打印各插件分阶段耗时"""
+        print("\n" + "="*60)
+        print("⏱️  爬虫阶段耗时")
+        print("="*60)
+        print(f"{'爬虫':<14}{'状态':<6}{'条数':>6}{'导入':>9}{'爬取':>9}{'保存':>9}{'总计':>9}")
+        for item in self.report:
+            timings = item['timings']
+            stages = [timings.get(stage) for stage in ('import', 'crawl', 'save')]
+            stage_text = ''.join(
+                f"{value:>8.1f}s" if value is not None else f"{'-':>9}" for value in stages
+            )
+            print(f"{item['name']:<14}{item['status']:<6}{item['count']:>6}"
+                  f"{stage_text}{item['total']:>8.1f}s")
+        print(f"墙钟总耗时: {self.wall_time:.1f}秒")
+
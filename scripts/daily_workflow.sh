@@ -8,15 +8,10 @@ echo "=========================================="
 
 cd /root/clawd/news-workflow/scripts
 
-# 1. 医疗健康板块
+# 医疗健康 + 教育人才板块（多板块模式：相同检索词和网页只抓取一次）
 echo ""
-echo "📰 开始爬取医疗健康新闻..."
-python3 news_aggregator.py --sector healthcare --hours 24
-
-# 2. 教育人才板块
-echo ""
-echo "📰 开始爬取教育人才新闻..."
-python3 news_aggregator.py --sector education --hours 24
+echo "📰 开始爬取医疗健康、教育人才新闻..."
+python3 news_aggregator.py --sectors healthcare education --hours 24
 
 echo ""
 echo "=========================================="
@@ -2,22 +2,36 @@
 # -*- coding: utf-8 -*-
 """
 新闻去重模块 - 基于标题相似度的智能去重
+
+默认使用字符倒排索引做候选分桶（前缀过滤），只对可能重复的标题对
+计算 SequenceMatcher 相似度，保留/移除结果与逐对比较完全一致。
+大批量（数万条以上）时可设置 max_token_df 限制倒排表长度，每条标题的耗时不再随总量增长。
 """
 
+from collections import Counter
 from difflib import SequenceMatcher
+import math
 import re
 
 class NewsDeduplicator:
     """新闻去重器"""
     
-    def __init__(self, similarity_threshold=0.8):
+    def __init__(self, similarity_threshold=0.8, use_blocking=True, max_token_df=None):
         """
         初始化去重器
         
         Args:
             similarity_threshold: 相似度阈值，默认0.8（80%）
+            use_blocking: 是否启用候选分桶（倒排索引），默认启用；
+                          关闭后退回逐对比较
+            max_token_df: 候选分桶时忽略出现次数超过该值的字符/二元组记号，
+                          每条标题的候选数有上限；只共享这些高频记号的重复对可能漏判。
+                          默认 None（不限制，结果与逐对比较完全一致）
         """
         self.similarity_threshold = similarity_threshold
+        self.use_blocking = use_blocking
+        self.max_token_df = max_token_df
+        self.last_stats = {}
     
     def normalize_title(self, title):
         """标准化标题"""
@@ -40,6 +54,10 @@ class NewsDeduplicator:
         norm_title1 = self.normalize_title(title1)
         norm_title2 = self.normalize_title(title2)
         
+        return self._normalized_similarity(norm_title1, norm_title2)
+    
+    def _normalized_similarity(self, norm_title1, norm_title2):
+        """计算两个已标准化标题的相似度"""
         if not norm_title1 or not norm_title2:
             return 0.0
         
@@ -52,40 +70,221 @@ class NewsDeduplicator:
         similarity = self.calculate_similarity(title1, title2)
         return similarity >= self.similarity_threshold
     
+    def _is_normalized_duplicate(self, norm_title1, norm_title2):
+        """
+        判断两个已标准化标题是否重复
+        
+        先用 real_quick_ratio / quick_ratio（长度、字符多重集上界）快速排除，
+        再计算精确的 ratio，判定结果与 is_duplicate 相同。
+        """
+        if not norm_title1 or not norm_title2:
+            return False
+        
+        matcher = SequenceMatcher(None, norm_title1, norm_title2)
+        threshold = self.similarity_threshold
+        return (matcher.real_quick_ratio() >= threshold and
+                matcher.quick_ratio() >= threshold and
+                matcher.ratio() >= threshold)
+    
     def deduplicate(self, news_list):
         """
         对新闻列表进行去重
         
         Args:
             news_list: 新闻列表，每条新闻需要有'title'字段
-            
+        
         Returns:
             去重后的新闻列表
         """
         if not news_list:
             return []
         
+        if self.use_blocking and 0 < self.similarity_threshold <= 1:
+            unique_news, removed_count = self._deduplicate_blocked(news_list)
+        else:
+            unique_news, removed_count = self._deduplicate_pairwise(news_list)
+        
+        print(f"  🔄 去重: 移除 {removed_count} 条相似新闻")
+        print(f"  📊 去重后: {len(unique_news)} 条新闻")
+        
+        return unique_news
+    
+    def _deduplicate_pairwise(self, news_list):
+        """逐对比较去重（每条新闻与所有已保留新闻比较）"""
         unique_news = []
+        unique_norms = []
         removed_count = 0
+        comparisons = 0
         
         for news in news_list:
             title = news.get('title', '')
             if not title:
                 continue
             
+            norm_title = self.normalize_title(title)
+            
             # 检查是否与已有新闻重复
             is_dup = False
-            for existing_news in unique_news:
-                existing_title = existing_news.get('title', '')
-                if self.is_duplicate(title, existing_title):
+            for existing_norm in unique_norms:
+                comparisons += 1
+                if self._is_normalized_duplicate(norm_title, existing_norm):
                     is_dup = True
                     removed_count += 1
                     break
             
             if not is_dup:
                 unique_news.append(news)
+                unique_norms.append(norm_title)
         
-        print(f"  🔄 去重: 移除 {removed_count} 条相似新闻")
-        print(f"  📊 去重后: {len(unique_news)} 条新闻")
+        self.last_stats = {'mode': 'pairwise', 'comparisons': comparisons}
+        return unique_news, removed_count
+    
+    def _deduplicate_blocked(self, news_list):
+        """
+        候选分桶去重（字符/二元组倒排索引 + 前缀过滤）
         
-        return unique_news
+        SequenceMatcher.ratio() = 2M / (|a| + |b|)，M 为匹配块总长度，
+        匹配块在两个标题中都是有序的公共子序列。ratio >= t 时有：
+          1. 长度过滤：t/(2-t) <= |b|/|a| <= (2-t)/t
+          2. 字符交集 >= M >= t*(|a|+|b|)/2
+          3. 二元组交集 >= 3M - |a| - |b| - 1（每个未匹配字符最多打断一次连续匹配）
+        按全局频率（稀有在前）排序记号，每个标题只需索引/探测前缀部分的记号，
+        真实重复对必定同时共享字符前缀记号和二元组前缀记号。候选再经交集计数
+        和精确 ratio 校验，因此保留/移除结果与逐对比较完全一致。
+        
+        设置 max_token_df 时高频记号不建索引、不探测（记号按频率排序，高频记号都在前缀末尾）。
+        前缀没有去掉记号的一侧仍然保证不漏；两侧都去掉了记号时合并两侧候选，尽量少漏。
+        """
+        threshold = self.similarity_threshold
+        # |b| >= |a| * min_length_ratio 是相似对的长度下界
+        min_length_ratio = threshold / (2 - threshold)
+        
+        entries = []
+        char_freq = Counter()
+        bigram_freq = Counter()
+        for news in news_list:
+            title = news.get('title', '')
+            if not title:
+                continue
+            norm_title = self.normalize_title(title)
+            chars = self._tokens(norm_title)
+            bigrams = self._tokens([norm_title[i:i + 2] for i in range(len(norm_title) - 1)])
+            char_freq.update(chars)
+            bigram_freq.update(bigrams)
+            entries.append((news, norm_title, chars, bigrams))
+        
+        # 记号按全局频率升序排列（稀有记号在前，前缀更有区分度）
+        char_rank = self._token_rank(char_freq)
+        bigram_rank = self._token_rank(bigram_freq)
+        
+        # 出现次数超过 max_token_df 的记号不建索引、不探测（倒排表长度有上限）
+        max_df = self.max_token_df
+        char_stop = {t for t, f in char_freq.items() if f > max_df} if max_df else set()
+        bigram_stop = {t for t, f in bigram_freq.items() if f > max_df} if max_df else set()
+        
+        unique_news = []
+        unique_norms = []
+        unique_chars = []
+        unique_bigrams = []
+        char_index = {}
+        bigram_index = {}
+        removed_count = 0
+        comparisons = 0
+        capped = 0
+        
+        for news, norm_title, chars, bigrams in entries:
+            length = len(norm_title)
+            is_dup = False
+            char_prefix = bigram_prefix = ()
+            
+            if length:
+                chars.sort(key=char_rank.__getitem__)
+                bigrams.sort(key=bigram_rank.__getitem__)
+                min_partner = length * min_length_ratio
+                max_partner = length / min_length_ratio
+                
+                # 交集下界对所有可能的相似标题长度取最小值（减去极小量避免浮点误差）
+                char_overlap = math.ceil(threshold * (length + min_partner) / 2 - 1e-9)
+                bigram_overlap = math.ceil(min(
+                    (1.5 * threshold - 1) * (length + partner) - 1
+                    for partner in (min_partner, max_partner)
+                ) - 1e-9)
+                char_prefix = chars[:length - max(1, char_overlap) + 1]
+                bigram_prefix = bigrams[:len(bigrams) - max(1, bigram_overlap) + 1]
+                
+                # 去掉前缀中的高频记号；前缀完整保留的一侧仍然保证不漏
+                char_exact = not char_stop.intersection(char_prefix)
+                bigram_exact = bigram_overlap >= 1 and not bigram_stop.intersection(bigram_prefix)
+                char_prefix = [t for t in char_prefix if t not in char_stop]
+                bigram_prefix = [t for t in bigram_prefix if t not in bigram_stop]
+                
+                # 真实重复对同时共享字符前缀记号和二元组前缀记号（集合运算在C层完成）
+                if bigram_exact:
+                    candidates = set().union(
+                        *[bigram_index[t] for t in bigram_prefix if t in bigram_index]
+                    )
+                    if candidates and char_exact:
+                        candidates.intersection_update(set().union(
+                            *[char_index[t] for t in char_prefix if t in char_index]
+                        ))
+                else:
+                    candidates = set().union(
+                        *[char_index[t] for t in char_prefix if t in char_index]
+                    )
+                    if not char_exact:
+                        # 两侧前缀都去掉了高频记号：合并两侧候选，只共享高频记号的重复对可能漏掉
+                        capped += 1
+                        candidates.update(*[bigram_index[t] for t in bigram_prefix if t in bigram_index])
+                
+                char_set = frozenset(chars)
+                bigram_set = frozenset(bigrams)
+                for candidate_idx in candidates:
+                    candidate_norm = unique_norms[candidate_idx]
+                    total = length + len(candidate_norm)
+                    # 长度过滤 + 交集计数过滤（留出浮点误差余量，保证不漏掉边界情况）
+                    if not min_partner - 1e-9 <= len(candidate_norm) <= max_partner + 1e-9:
+                        continue
+                    if (len(bigram_set & unique_bigrams[candidate_idx]) <
+                            (1.5 * threshold - 1) * total - 1 - 1e-9):
+                        continue
+                    if len(char_set & unique_chars[candidate_idx]) < threshold * total / 2 - 1e-9:
+                        continue
+                    
+                    comparisons += 1
+                    if self._normalized_similarity(norm_title, candidate_norm) >= threshold:
+                        is_dup = True
+                        break
+            
+            if is_dup:
+                removed_count += 1
+                continue
+            
+            unique_idx = len(unique_news)
+            unique_news.append(news)
+            unique_norms.append(norm_title)
+            unique_chars.append(frozenset(chars))
+            unique_bigrams.append(frozenset(bigrams))
+            for token in char_prefix:
+                char_index.setdefault(token, []).append(unique_idx)
+            for token in bigram_prefix:
+                bigram_index.setdefault(token, []).append(unique_idx)
+        
+        self.last_stats = {'mode': 'blocked', 'comparisons': comparisons, 'capped': capped}
+        return unique_news, removed_count
+    
+    @staticmethod
+    def _tokens(items):
+        """把字符/二元组序列转为多重集记号：(内容, 第几次出现)"""
+        seen = {}
+        tokens = []
+        for item in items:
+            count = seen.get(item, 0)
+            tokens.append((item, count))
+            seen[item] = count + 1
+        return tokens
+    
+    @staticmethod
+    def _token_rank(token_freq):
+        """按全局频率升序给记号编号"""
+        ordered = sorted(token_freq.items(), key=lambda kv: (kv[1], kv[0]))
+        return {token: rank for rank, (token, _) in enumerate(ordered)}
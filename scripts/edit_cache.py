@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻编辑结果缓存 - 按原文内容哈希、模型和提示词版本（提示词 + 影响提示词的设置）持久化
+
+NewsEditor 中途失败或调整配置后重跑时，已编辑过的新闻直接复用结果，只为新增新闻调用大模型。
+缓存键是原标题 + 原内容的哈希，原文有任何改动都会重新编辑。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from verdict_cache import prompt_hash
+
+
+def load_edit_cache_settings():
+    """从 references/config.json 读取 edit_cache 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/news_edits.db',
+        'ttl_days': 90
+    }
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('edit_cache', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def content_hash(news_item):
+    """原文内容哈希（原标题 + 原内容）"""
+    raw = '\x1f'.join([news_item.get('title') or '', news_item.get('content') or ''])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class EditCache:
+    """新闻编辑结果缓存"""
+    
+    def __init__(self, model, system_prompt, db_path=None, ttl_days=None, enabled=None,
+                 prompt_settings=None):
+        """
+        初始化缓存
+        
+        Args:
+            model: 模型名称（缓存键的一部分）
+            system_prompt: 编辑提示词（其哈希作为提示词版本）
+            db_path: SQLite文件路径，默认 data/cache/news_edits.db
+            ttl_days: 结果保留天数
+            enabled: 是否启用；关闭后 lookup 全部未命中、store 不写入
+            prompt_settings: 影响提示词内容的设置（如正文截取长度 content_chars），
+                             与提示词一起计入提示词版本
+        """
+        settings = load_edit_cache_settings()
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        
+        self.model = model
+        if prompt_settings:
+            system_prompt += '\x1f' + json.dumps(prompt_settings, sort_keys=True)
+        self.prompt_version = prompt_hash(system_prompt)
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(script_dir, settings['db_path'])
+        self.ttl_days = settings['ttl_days'] if ttl_days is None else ttl_days
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS edits (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    edit TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_edits_created_at ON edits(created_at);
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def make_key(self, news_item):
+        """缓存键：原文内容哈希 + 模型 + 提示词版本"""
+        raw = '\x1f'.join([content_hash(news_item), self.model, self.prompt_version])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def lookup(self, news_list):
+        """
+        批量查询缓存
+        
+        Returns:
+            dict: news_list 下标 → {'title', 'keywords', 'summary'}（只包含命中的新闻）
+        """
+        if not self.enabled or not news_list:
+            self.stats['misses'] += len(news_list)
+            return {}
+        
+        cutoff = time.time() - self.ttl_days * 86400
+        edits = {}
+        try:
+            conn = self.connect()
+            for i, news in enumerate(news_list):
+                row = conn.execute(
+                    'SELECT edit FROM edits WHERE key = ? AND created_at >= ?',
+                    (self.make_key(news), cutoff)
+                ).fetchone()
+                if row:
+                    edits[i] = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"  ⚠️  编辑缓存不可用，全部重新编辑: {e}")
+            edits = {}
+        
+        self.stats['hits'] += len(edits)
+        self.stats['misses'] += len(news_list) - len(edits)
+        return edits
+    
+    def store(self, pairs):
+        """
+        保存编辑结果
+        
+        Args:
+            pairs: [(原新闻, 编辑结果), ...]
+        """
+        if not self.enabled or not pairs:
+            return
+        
+        now = time.time()
+        try:
+            conn = self.connect()
+            with conn:
+                for news, edit in pairs:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO edits (key, model, prompt_version, edit, created_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (self.make_key(news), self.model, self.prompt_version,
+                         json.dumps(edit, ensure_ascii=False), now)
+                    )
+            self.stats['stored'] += len(pairs)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  编辑缓存写入失败: {e}")
+    
+    def reset_stats(self):
+        """清零本次运行的统计"""
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+    
+    def print_stats(self):
+        """打印本次运行的缓存统计"""
+        total = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / total if total else 0.0
+        print(f"\n🗄️  编辑缓存: 命中 {self.stats['hits']} 条, 未命中 {self.stats['misses']} 条, "
+              f"命中率 {hit_rate:.1%}, 新写入 {self.stats['stored']} 条")
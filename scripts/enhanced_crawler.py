@@ -9,9 +9,8 @@ import json
 import os
 import sys
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import time
+from html_parser import parse_html, ANCHORS
+from http_client import get_http_client
 import re
 
 class EnhancedNewsCrawler:
@@ -22,15 +21,8 @@ class EnhancedNewsCrawler:
         self.count = count
         self.config = self.load_config()
         self.results = []
-        self.session = requests.Session()
-        
-        # 设置请求头
-        self.session.headers.update({
-            'User-Agent': self.config['crawler_settings']['user_agent'],
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Connection': 'keep-alive',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
     
     def load_config(self):
         """加载配置文件"""
@@ -52,7 +44,6 @@ class EnhancedNewsCrawler:
         for source in news_sources:
             print(f"📍 {source['name']}")
             self.crawl_source(source)
-            time.sleep(2)  # 礼貌延迟
         
         # 去重
         self.deduplicate()
@@ -86,10 +77,10 @@ class EnhancedNewsCrawler:
         """爬取健康报行业快讯（JSON提取方式）"""
         try:
             url = 'https://www.jkb.com.cn/news/industryNews'
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url)
             response.encoding = 'utf-8'
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, ('div', {'id': 'ttde_data'}))
             data_div = soup.find('div', id='ttde_data')
             
             if data_div:
@@ -118,10 +109,10 @@ class EnhancedNewsCrawler:
     def crawl_pharmnet_news(self, url):
         """爬取医药网最新资讯"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url)
             response.encoding = 'gbk'  # 医药网使用gbk编码
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, ANCHORS)
             
             # 查找新闻列表
             news_links = soup.find_all('a', href=re.compile(r'/news/\d+/\d+/\d+/\d+\.html'))
@@ -156,10 +147,10 @@ class EnhancedNewsCrawler:
     def crawl_generic_site(self, source):
         """通用网站爬取方法"""
         try:
-            response = self.session.get(source['url'], timeout=10)
+            response = self.session.get(source['url'])
             response.encoding = 'utf-8'
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, ANCHORS)
             
             # 通用的新闻链接查找
             news_links = soup.find_all('a', href=True)
@@ -208,10 +199,10 @@ class EnhancedNewsCrawler:
             total_count = 0
             
             for url in urls:
-                response = self.session.get(url, timeout=10)
+                response = self.session.get(url)
                 response.encoding = source.get('encoding', 'utf-8')
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = parse_html(response.text, ('ul', {'class': 'infoList'}))
                 
                 # 查找新闻列表 - 使用正确的选择器
                 news_list = soup.find('ul', class_='infoList')
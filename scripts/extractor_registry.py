@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取器注册表 - 按域名记录各提取器的耗时、正文长度和失败率，自动选择最合适的提取器
+
+同一个提取器在不同网站上的效果差别很大（见 test_trafilatura*.py / test_newspaper4k*.py）。
+这里把三种提取方式注册在一起，都以 HTML 为输入：
+- trafilatura：通用正文提取（markdown）
+- newspaper：newspaper4k 的 Article 解析
+- selectors：爬虫中手写的 CSS 选择器（div.article-content 等）
+
+每个域名按历史成功率（高优先）、平均正文长度（长优先，按 chars_bucket 字分档）和平均耗时
+（低优先）排出提取顺序，依次尝试直到成功（正文达到 min_chars）；都不足 min_chars 时
+返回最长的非空正文。样本不足的提取器按默认顺序排在后面。首选提取器一直成功的域名不再运行后备提取器，
+只以 explore_rate 的概率抽样运行一个后备提取器，保持统计更新。
+
+提取在进程池中运行时，由主进程 plan() 给出顺序，工作进程执行 run_plan()，
+再由主进程 record() 写入统计。
+
+用法:
+    python3 extractor_registry.py --stats
+    python3 extractor_registry.py --stats --domain news.cn
+    python3 extractor_registry.py --reset
+"""
+
+import importlib.util
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 常见的文章内容选择器（按顺序尝试）
+CONTENT_SELECTORS = [
+    'div.article-content',
+    'div.content',
+    'div.news-content',
+    'div.detail-content',
+    'article',
+    'div#content',
+    'div.main-content'
+]
+
+
+def load_registry_settings():
+    """从 references/config.json 读取 extractor_registry 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/extractor_stats.db',
+        'order': ['trafilatura', 'newspaper', 'selectors'],
+        'min_chars': 100,
+        'min_samples': 5,
+        'chars_bucket': 200,
+        'explore_rate': 0.05
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('extractor_registry', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def domain_of(url):
+    """域名（小写，去掉 www.）"""
+    try:
+        host = urlsplit(url or '').netloc.lower()
+    except ValueError:
+        return ''
+    host = host.split('@')[-1].split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+
+def extract_with_trafilatura(url, html):
+    """trafilatura 提取 markdown 正文"""
+    import trafilatura
+    return trafilatura.extract(
+        html,
+        output_format='markdown',
+        include_comments=False,
+        include_tables=True
+    )
+
+
+def extract_with_newspaper(url, html):
+    """newspaper4k 解析正文"""
+    from newspaper import Article
+    article = Article(url, language='zh')
+    article.download(input_html=html)
+    article.parse()
+    return article.text
+
+
+def extract_with_selectors(url, html):
+    """按 CONTENT_SELECTORS 依次查找正文元素"""
+    from html_parser import parse_html
+    soup = parse_html(html)
+    for selector in CONTENT_SELECTORS:
+        content_elem = soup.select_one(selector)
+        if content_elem is None:
+            continue
+        content = content_elem.get_text('\n', strip=True)
+        if content and len(content) > 100:  # 确保内容足够长
+            return content
+    return None
+
+
+# 提取器名称 → (函数, 依赖的模块)
+EXTRACTORS = {
+    'trafilatura': (extract_with_trafilatura, 'trafilatura'),
+    'newspaper': (extract_with_newspaper, 'newspaper'),
+    'selectors': (extract_with_selectors, 'bs4'),
+}
+
+
+def available_extractors(names):
+    """过滤掉依赖未安装的提取器"""
+    return [name for name in names
+            if name in EXTRACTORS and importlib.util.find_spec(EXTRACTORS[name][1]) is not None]
+
+
+def extract_with(name, url, html):
+    """用指定提取器提取正文，出错返回 None（可在提取进程中运行）"""
+    try:
+        return EXTRACTORS[name][0](url, html)
+    except Exception:
+        return None
+
+
+def run_plan(url, html, plan, min_chars=100):
+    """
+    按计划依次尝试提取器（可在提取进程中运行）
+    
+    min_chars 只决定是否继续尝试下一个提取器：都不足 min_chars 时返回最长的非空正文
+    （由后续质量筛选按“内容过短”处理），尝试记录中仍记为失败。
+    
+    Args:
+        plan: (提取顺序, 需要抽样运行的后备提取器或 None)
+    
+    Returns:
+        (正文或 None, 给出正文的提取器或 None, 尝试记录 [(提取器, 耗时, 正文长度, 是否成功), ...])
+    """
+    order, probe = plan
+    content = None
+    winner = None
+    attempts = []
+    for name in order:
+        start = time.perf_counter()
+        text = extract_with(name, url, html)
+        elapsed = time.perf_counter() - start
+        ok = bool(text) and len(text) >= min_chars
+        attempts.append((name, elapsed, len(text or ''), ok))
+        if ok:
+            content, winner = text, name
+            break
+        if text and len(text) > len(content or ''):
+            content, winner = text, name
+    
+    # 抽样运行一个后备提取器，只记录统计，不影响结果
+    if probe and attempts and attempts[-1][3] and probe != winner:
+        start = time.perf_counter()
+        text = extract_with(probe, url, html)
+        attempts.append((probe, time.perf_counter() - start, len(text or ''),
+                         bool(text) and len(text) >= min_chars))
+    return content, winner, attempts
+
+
+class ExtractorRegistry:
+    """按域名统计并选择提取器"""
+    
+    def __init__(self, db_path=None, order=None, enabled=None):
+        """
+        初始化注册表
+        
+        Args:
+            db_path: 统计数据库路径，默认 data/cache/extractor_stats.db
+            order: 默认提取顺序（无统计数据的域名使用）
+            enabled: 是否启用；关闭后总是按默认顺序提取，不记录统计
+        """
+        settings = load_registry_settings()
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, settings['db_path'])
+        self.order = available_extractors(order or settings['order'])
+        self.min_chars = settings['min_chars']
+        self.min_samples = settings['min_samples']
+        self.chars_bucket = settings['chars_bucket']
+        self.explore_rate = settings['explore_rate']
+        self.lock = threading.Lock()
+        # 域名 → 提取器 → {'attempts', 'failures', 'seconds', 'chars'}
+        self.stats = {}
+        self.dirty = set()
+        self.loaded = False
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS domain_stats (
+                    domain TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    failures INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    chars INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (domain, extractor)
+                );
+            ''')
+        return self._conn
+    
+    def close(self):
+        """写入统计并关闭数据库"""
+        self.flush()
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _load(self):
+        """首次使用时读入全部统计（在锁内调用）"""
+        if self.loaded or not self.enabled:
+            return
+        self.loaded = True
+        try:
+            for domain, name, attempts, failures, seconds, chars in self.connect().execute(
+                    'SELECT domain, extractor, attempts, failures, seconds, chars FROM domain_stats'):
+                self.stats.setdefault(domain, {})[name] = {
+                    'attempts': attempts, 'failures': failures, 'seconds': seconds, 'chars': chars
+                }
+        except sqlite3.Error as e:
+            print(f"  ⚠️  提取器统计不可用，按默认顺序提取: {e}")
+    
+    def _rank_key(self, stats, name):
+        """排序键：样本足够的按成功率、平均正文长度（分档）、平均耗时；样本不足的排在后面，按默认顺序"""
+        item = stats.get(name)
+        if not item or item['attempts'] < self.min_samples:
+            return (1, 0, 0, self.order.index(name))
+        success_rate = 1 - item['failures'] / item['attempts']
+        chars_level = item['chars'] / item['attempts'] // self.chars_bucket
+        return (0, -round(success_rate, 2), -chars_level, item['seconds'] / item['attempts'])
+    
+    def ranking(self, domain):
+        """某个域名的提取器顺序"""
+        with self.lock:
+            self._load()
+            stats = dict(self.stats.get(domain, {}))
+        return sorted(self.order, key=lambda name: self._rank_key(stats, name))
+    
+    def plan(self, url):
+        """
+        给出一个链接的提取计划
+        
+        Returns:
+            (提取顺序, 需要抽样运行的后备提取器或 None)
+        """
+        if not self.enabled:
+            return list(self.order), None
+        
+        order = self.ranking(domain_of(url))
+        probe = None
+        if len(order) > 1 and random.random() < self.explore_rate:
+            probe = random.choice(order[1:])
+        return order, probe
+    
+    def record(self, url, attempts):
+        """记录一次提取的尝试结果"""
+        if not self.enabled or not attempts:
+            return
+        domain = domain_of(url)
+        with self.lock:
+            self._load()
+            domain_stats = self.stats.setdefault(domain, {})
+            for name, seconds, chars, ok in attempts:
+                item = domain_stats.setdefault(name, {'attempts': 0, 'failures': 0, 'seconds': 0.0, 'chars': 0})
+                item['attempts'] += 1
+                item['failures'] += 0 if ok else 1
+                item['seconds'] += seconds
+                item['chars'] += chars
+                self.dirty.add((domain, name))
+    
+    def extract(self, url, html):
+        """按计划提取并记录统计，返回 (正文或 None, 成功的提取器或 None)"""
+        content, winner, attempts = run_plan(url, html, self.plan(url), self.min_chars)
+        self.record(url, attempts)
+        return content, winner
+    
+    def flush(self):
+        """把本次运行更新过的统计写入数据库"""
+        with self.lock:
+            if not self.enabled or not self.dirty:
+                return
+            rows = []
+            now = time.time()
+            for domain, name in self.dirty:
+                item = self.stats[domain][name]
+                rows.append((domain, name, item['attempts'], item['failures'],
+                             item['seconds'], item['chars'], now))
+            try:
+                conn = self.connect()
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO domain_stats '
+                        '(domain, extractor, attempts, failures, seconds, chars, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        rows
+                    )
+                self.dirty.clear()
+            except sqlite3.Error as e:
+                print(f"  ⚠️  提取器统计写入失败: {e}")
+    
+    def print_stats(self, domain=None, limit=20):
+        """打印各域名的提取器统计和当前顺序"""
+        with self.lock:
+            self._load()
+            stats = {d: dict(items) for d, items in self.stats.items()}
+        domains = [domain] if domain else sorted(
+            stats, key=lambda d: -sum(item['attempts'] for item in stats[d].values())
+        )[:limit]
+        
+        print(f"\n🧰 提取器统计（{len(stats)} 个域名）")
+        for name in domains:
+            items = stats.get(name, {})
+            order = sorted(self.order, key=lambda extractor: self._rank_key(items, extractor))
+            print(f"\n  {name or '(无域名)'}  顺序: {' → '.join(order)}")
+            for extractor, item in sorted(items.items()):
+                attempts = item['attempts']
+                print(f"    {extractor:<12} 尝试 {attempts:>5}  失败率 {item['failures'] / attempts:>6.1%}  "
+                      f"平均 {item['seconds'] / attempts:>6.3f}秒  平均长度 {item['chars'] // attempts:>6}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_extractor_registry():
+    """获取进程内共享的提取器注册表"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ExtractorRegistry()
+        return _registry
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='正文提取器注册表')
+    parser.add_argument('--stats', action='store_true', help='显示各域名的提取器统计')
+    parser.add_argument('--domain', help='只显示某个域名')
+    parser.add_argument('--reset', action='store_true', help='清空统计')
+    args = parser.parse_args()
+    
+    registry = ExtractorRegistry()
+    print(f"可用提取器: {', '.join(registry.order) or '无'}")
+    
+    if args.reset:
+        with registry.connect() as conn:
+            removed = conn.execute('DELETE FROM domain_stats').rowcount
+        print(f"🧹 已清空 {removed} 条统计")
+    
+    if args.stats or args.domain:
+        registry.print_stats(domain_of('http://' + args.domain) if args.domain else None)
+    registry.close()
+
+
+if __name__ == '__main__':
+    main()
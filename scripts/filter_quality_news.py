@@ -5,11 +5,30 @@
 根据参考标题库的标准，过滤出符合要求的新闻
 """
 
+import argparse
 import json
 import re
 from pathlib import Path
 from datetime import datetime
 
+from rule_engine import RuleEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # 列式批量评分（score_columns）需要 numpy，逐条筛选不受影响
+
+# 省份（价值性评分：包含地区）
+PROVINCES = [
+    '北京', '上海', '广东', '浙江', '江苏', '山东', '河南', '四川', '湖北', '湖南',
+    '福建', '安徽', '河北', '陕西', '重庆', '天津', '辽宁', '吉林', '黑龙江', '山西',
+    '江西', '贵州', '云南', '甘肃', '青海', '宁夏', '新疆', '西藏', '广西', '内蒙古', '海南',
+]
+
+# 预编译正则（以前每次评分都重新解析）
+DATA_PATTERN = re.compile(r'\d+%|\d+亿|\d+万')
+PROVINCE_PATTERN = re.compile('|'.join(PROVINCES))
+
 class NewsFilter:
     """新闻质量筛选器"""
     
@@ -56,9 +75,29 @@ class NewsFilter:
             '健康报', '医药经济报', '中国教育报',
             '财新', '第一财经', '经济日报',
         ]
+        
+        # 官方来源标志（加分，低于权威来源）
+        self.official_keywords = ['政府', '官网']
+        
+        # 具体措施词（价值性加分）
+        self.measure_words = ['推进', '启动', '落地', '建设', '发展', '改革', '创新']
+        
+        self.provinces = PROVINCES
+        self.data_pattern = DATA_PATTERN
+        self._engine = None
+    
+    def rules(self):
+        """编译后的规则引擎（首次使用时编译）"""
+        if self._engine is None:
+            self._engine = RuleEngine(news_filter=self)
+        return self._engine
     
     def calculate_score(self, news_item, sector):
-        """计算新闻质量分数"""
+        """
+        计算新闻质量分数（逐条、逐个词表的参考实现）
+        
+        批量筛选走 rules().score()，两者的分数和原因完全相同
+        """
         title = news_item.get('title', '')
         source = news_item.get('source', '')
         
@@ -90,7 +129,7 @@ class NewsFilter:
         if any(auth in source for auth in self.authority_sources):
             authority_score = 25
             reasons.append(f"权威来源: {authority_score}分")
-        elif '政府' in source or '官网' in source:
+        elif any(word in source for word in self.official_keywords):
             authority_score = 20
             reasons.append(f"官方来源: {authority_score}分")
         else:
@@ -107,15 +146,15 @@ class NewsFilter:
         # 5. 价值性评分（25分）
         value_score = 0
         # 包含数据
-        if re.search(r'\d+%|\d+亿|\d+万', title):
+        if self.data_pattern.search(title):
             value_score += 10
             reasons.append("包含数据")
         # 包含地区
-        if re.search(r'北京|上海|广东|浙江|江苏|山东|河南|四川|湖北|湖南|福建|安徽|河北|陕西|重庆|天津|辽宁|吉林|黑龙江|山西|江西|贵州|云南|甘肃|青海|宁夏|新疆|西藏|广西|内蒙古|海南', title):
+        if PROVINCE_PATTERN.search(title):
             value_score += 10
             reasons.append("包含地区")
         # 包含具体措施
-        if any(word in title for word in ['推进', '启动', '落地', '建设', '发展', '改革', '创新']):
+        if any(word in title for word in self.measure_words):
             value_score += 5
             reasons.append("包含具体措施")
         score += value_score
@@ -126,9 +165,9 @@ class NewsFilter:
         """筛选新闻"""
         filtered_news = []
         
-        for news in news_list:
-            score, reasons = self.calculate_score(news, sector)
-            
+        # 每条标题只扫描一次自动机
+        scores = self.rules().score_batch(news_list, sector)
+        for news, (score, reasons) in zip(news_list, scores):
             if score >= threshold:
                 news['quality_score'] = score
                 news['filter_reasons'] = reasons
@@ -138,9 +177,133 @@ class NewsFilter:
         filtered_news.sort(key=lambda x: x['quality_score'], reverse=True)
         
         return filtered_news
+    
+    def score_columns(self, titles, sources, sector):
+        """
+        列式批量评分（回填、调阈值实验用）
+        
+        每条标题扫描一次自动机，按规则组批量取出命中数列，整列转为特征矩阵，
+        各分项用 NumPy 向量计算，不修改、不创建新闻 dict。
+        
+        Args:
+            titles: 标题序列
+            sources: 来源序列（与 titles 等长）
+            sector: 板块
+        
+        Returns:
+            ScoreMatrix
+        """
+        if np is None:
+            raise ImportError("列式批量评分需要 numpy: pip install numpy")
+        
+        titles = list(titles)
+        sources = list(sources)
+        if len(titles) != len(sources):
+            raise ValueError(f"titles 与 sources 长度不一致: {len(titles)} != {len(sources)}")
+        
+        # 与 ScoreMatrix.FEATURES 一一对应的规则组
+        groups = ('news_exclude', f'must_include:{sector}', 'authority', 'official', 'data', 'province', 'measure')
+        counts = self.rules().evaluate_columns(titles, sources, groups)
+        features = np.column_stack([np.array(counts[group], dtype=np.int16) for group in groups])
+        # 除关键词个数外，其余特征只看是否命中
+        flags = [i for i, name in enumerate(ScoreMatrix.FEATURES) if name != 'keyword_count']
+        features[:, flags] = features[:, flags] > 0
+        
+        return ScoreMatrix(self, sector, titles, sources, features)
+
+
+class ScoreMatrix:
+    """
+    列式评分结果
+    
+    特征矩阵只计算一次；分数与 calculate_score 完全相同，
+    换阈值重新排名（rank）不需要重新扫描标题。
+    """
+    
+    # 特征矩阵的列
+    FEATURES = ('excluded', 'keyword_count', 'authority', 'official', 'data', 'province', 'measure')
+    
+    def __init__(self, news_filter, sector, titles, sources, features):
+        self.news_filter = news_filter
+        self.sector = sector
+        self.titles = titles
+        self.sources = sources
+        self.features = features
+        
+        column = {name: features[:, i] for i, name in enumerate(self.FEATURES)}
+        
+        # 各分项（与 calculate_score 的评分规则一致）
+        self.relevance = np.minimum(30, column['keyword_count'] * 10)
+        self.authority = np.where(column['authority'] > 0, 25,
+                                  np.where(column['official'] > 0, 20, 10))
+        self.timeliness = np.full(len(titles), 20, dtype=np.int16)
+        self.value = column['data'] * 10 + column['province'] * 10 + column['measure'] * 5
+        
+        # 命中排除词或没有相关关键词的新闻直接记0分
+        self.valid = (column['excluded'] == 0) & (column['keyword_count'] > 0)
+        self.scores = np.where(
+            self.valid, self.relevance + self.authority + self.timeliness + self.value, 0
+        )
+    
+    def __len__(self):
+        return len(self.titles)
+    
+    def rank(self, threshold=60):
+        """
+        按阈值筛选并按分数从高到低排名
+        
+        Returns:
+            达到阈值的新闻下标数组（同分保持原顺序，与 filter_news 的排序一致）
+        """
+        kept = np.flatnonzero(self.scores >= threshold)
+        order = np.argsort(-self.scores[kept], kind='stable')
+        return kept[order]
+    
+    def kept_counts(self, thresholds):
+        """各阈值下保留的条数"""
+        return {threshold: int((self.scores >= threshold).sum()) for threshold in thresholds}
+    
+    def reasons(self, index):
+        """单条新闻的评分原因（按需计算）"""
+        news_item = {'title': self.titles[index] or '', 'source': self.sources[index] or ''}
+        return self.news_filter.rules().score(news_item, self.sector)[1]
+
+
+def rescore_files(paths, sector, thresholds):
+    """对已保存的新闻文件重新评分，一次构建特征矩阵，比较多个阈值"""
+    filter_obj = NewsFilter()
+    titles, sources = [], []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for news in json.load(f):
+                titles.append(news.get('title', ''))
+                sources.append(news.get('source', ''))
+    
+    matrix = filter_obj.score_columns(titles, sources, sector)
+    print(f"📊 {sector}: {len(paths)} 个文件, {len(matrix)} 条新闻")
+    for threshold, count in matrix.kept_counts(thresholds).items():
+        print(f"   阈值 {threshold}: 保留 {count} 条")
+    
+    top = matrix.rank(max(thresholds))[:10]
+    if len(top):
+        print(f"\n🏆 阈值 {max(thresholds)} 下的前 {len(top)} 条:")
+        for index in top:
+            print(f"   [{matrix.scores[index]}] {titles[index]}")
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='智能筛选高质量新闻')
+    parser.add_argument('--rescore', nargs='+', metavar='FILE',
+                        help='对已保存的新闻文件批量重新评分（需要 numpy）')
+    parser.add_argument('--sector', default='healthcare', help='重新评分的板块')
+    parser.add_argument('--thresholds', type=int, nargs='+', default=[50, 60, 70],
+                        help='重新评分时比较的阈值')
+    args = parser.parse_args()
+    
+    if args.rescore:
+        rescore_files(args.rescore, args.sector, args.thresholds)
+        return
+    
     filter_obj = NewsFilter()
     
     # 数据文件路径
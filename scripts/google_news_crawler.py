@@ -7,8 +7,17 @@ Google 新闻搜索爬虫 - 获取24小时内的最新新闻
 from gnews import GNews
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 
+from http_client import get_http_client
+from seen_index import SeenStoryIndex
+
+# GNews 请求的主机（与其他爬虫共用 http_client 中该主机的令牌桶）
+GOOGLE_NEWS_URL = 'https://news.google.com/'
+
 class GoogleNewsCrawler:
     """Google 新闻搜索爬虫"""
     
@@ -17,15 +26,37 @@ class GoogleNewsCrawler:
         self.hours = hours
         self.results = []
         
-        # 初始化 GNews
-        self.google_news = GNews(
+        # 初始化 GNews（并发搜索时每个线程使用自己的实例）
+        self.google_news = self.create_client()
+        self._local = threading.local()
+        
+        self.config = self.load_config()
+        
+        # 并发检索设置
+        settings = self.config.get('crawler_settings', {}).get('google_news', {})
+        self.workers = settings.get('workers', 4)
+        self.keyword_timeout = settings.get('keyword_timeout', 30)
+        self.jitter = settings.get('jitter', 0.5)
+        self.keyword_report = []
+        self.keyword_results = {}  # 每个关键词的原始结果（去重前）
+    
+    def create_client(self):
+        """创建 GNews 实例"""
+        return GNews(
             language='zh',  # 中文
             country='CN',   # 中国
-            period=f'{hours}h',  # 时间范围
+            period=f'{self.hours}h',  # 时间范围
             max_results=100  # 每个关键词最多100条
         )
-        
-        self.config = self.load_config()
+    
+    def get_client(self):
+        """当前线程的 GNews 实例"""
+        if threading.current_thread() is threading.main_thread():
+            return self.google_news
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.create_client()
+        return client
     
     def load_config(self):
         """加载配置文件"""
@@ -45,7 +76,7 @@ class GoogleNewsCrawler:
         
         try:
             # 搜索新闻
-            news_list = self.google_news.get_news(keyword)
+            news_list = self.get_client().get_news(keyword)
             
             news_items = []
             for news in news_list:
@@ -65,19 +96,98 @@ class GoogleNewsCrawler:
             print(f"  ✗ 搜索失败: {e}")
             return []
     
-    def search_with_keywords(self, keywords):
-        """使用多个关键词搜索"""
+    def search_with_keywords(self, keywords, workers=None, cancel_event=None):
+        """
+        使用多个关键词并发搜索
+        
+        参数:
+            keywords: 关键词列表
+            workers: 并发数，默认取 crawler_settings.google_news.workers
+            cancel_event: 取消事件（threading.Event），置位后不再等待剩余关键词
+        
+        每个关键词完成后立即并入结果并按标题去重；单个关键词超过
+        keyword_timeout 秒未返回则放弃。完成后打印每个关键词的耗时和条数。
+        """
+        workers = workers or self.workers
         print(f"\n{'='*60}")
-        print(f"开始搜索 Google 新闻 - {self.config['sectors'][self.sector]['name']}")
-        print(f"时间范围: 最近 {self.hours} 小时")
+        sector_name = self.config['sectors'].get(self.sector, {}).get('name', self.sector)
+        print(f"开始搜索 Google 新闻 - {sector_name}")
+        print(f"时间范围: 最近 {self.hours} 小时 | 并发数: {workers}")
         print(f"{'='*60}")
         
-        for keyword in keywords:
-            news_items = self.search_news(keyword)
-            self.results.extend(news_items)
+        seen_titles = {news['title'] for news in self.results}
+        self.keyword_report = []
+        self.keyword_results = {}
+        started = {}
+        
+        def task(keyword):
+            # 所有线程共用 news.google.com 的令牌桶，按 per_host_rate 排队发出请求，
+            # 每个请求再随机推迟 0~jitter 秒
+            get_http_client().throttle(GOOGLE_NEWS_URL, self.jitter)
+            started[keyword] = time.perf_counter()
+            return self.search_news(keyword)
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = {executor.submit(task, keyword): keyword for keyword in keywords}
+        
+        try:
+            while pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    print(f"  ⏹️  已取消，放弃剩余 {len(pending)} 个关键词")
+                    for future, keyword in pending.items():
+                        future.cancel()
+                        self._record_keyword(keyword, started, 0, 0, '取消')
+                    break
+                
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    keyword = pending.pop(future)
+                    news_items = future.result()
+                    self.keyword_results[keyword] = news_items
+                    
+                    # 流式去重：每个关键词完成后立即并入结果
+                    added = 0
+                    for news in news_items:
+                        if news['title'] not in seen_titles:
+                            seen_titles.add(news['title'])
+                            self.results.append(news)
+                            added += 1
+                    self._record_keyword(keyword, started, len(news_items), added, '完成')
+                
+                # 单个关键词超时：不再等待（线程结束后结果被丢弃）
+                now = time.perf_counter()
+                for future, keyword in list(pending.items()):
+                    if keyword in started and now - started[keyword] > self.keyword_timeout:
+                        del pending[future]
+                        print(f"  ⏱️  关键词超时（{self.keyword_timeout}秒）: {keyword}")
+                        self._record_keyword(keyword, started, 0, 0, '超时')
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         # 去重
         self.deduplicate()
+        self.print_keyword_report()
+    
+    def _record_keyword(self, keyword, started, count, added, status):
+        """记录单个关键词的耗时和结果数"""
+        latency = time.perf_counter() - started[keyword] if keyword in started else 0.0
+        self.keyword_report.append({
+            'keyword': keyword,
+            'latency': latency,
+            'count': count,
+            'added': added,
+            'status': status
+        })
+    
+    def print_keyword_report(self):
+        """打印每个关键词的耗时和结果数"""
+        if not self.keyword_report:
+            return
+        print(f"\n⏱️  关键词检索耗时：")
+        for item in sorted(self.keyword_report, key=lambda x: -x['latency']):
+            print(f"  {item['keyword']}: {item['latency']:.1f}秒, {item['count']} 条"
+                  f"（新增 {item['added']} 条）[{item['status']}]")
     
     def deduplicate(self):
         """去重"""
@@ -98,6 +208,9 @@ class GoogleNewsCrawler:
     
     def save_results(self):
         """保存结果"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         if not self.results:
             print("\n⚠️  没有找到任何新闻")
             return
@@ -132,6 +245,7 @@ if __name__ == '__main__':
                         help='板块: healthcare, education, strategic_emerging, hightech')
     parser.add_argument('--hours', type=int, default=24, help='时间范围（小时）')
     parser.add_argument('--keywords', nargs='+', help='搜索关键词列表')
+    parser.add_argument('--workers', type=int, help='并发检索数（默认读取配置）')
     
     args = parser.parse_args()
     
@@ -150,6 +264,6 @@ if __name__ == '__main__':
     else:
         keywords = args.keywords
     
-    crawler.search_with_keywords(keywords)
+    crawler.search_with_keywords(keywords, args.workers)
     crawler.save_results()
 
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google News 链接解码缓存 - 文章ID → 原始新闻链接，持久化并带有效期
+
+news.google.com/rss/articles/<文章ID> 的链接每次都要通过 new_decoderv1 联网解码，
+而同一篇文章会在不同检索词、板块和日期里反复出现。这里把解码结果按文章ID保存在
+SQLite 中（data/cache/google_urls.db）：
+- 命中缓存的链接完全不联网
+- 未命中的链接去重后分批并发解码（线程数有上限），每批解码完立即写入缓存
+- 统计命中率和解码耗时
+
+用法:
+    python3 google_url_cache.py --stats
+    python3 google_url_cache.py --compact
+    python3 google_url_cache.py --warm ../data/raw/*_google_*.csv
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# news.google.com/rss/articles/<ID>、/articles/<ID>、/read/<ID>
+ARTICLE_ID_PATTERN = re.compile(r'news\.google\.com/(?:rss/)?(?:articles|read)/([A-Za-z0-9_-]+)')
+
+
+def load_url_cache_settings():
+    """从 references/config.json 读取 google_url_cache 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/google_urls.db',
+        'ttl_days': 90,
+        'workers': 8,
+        'batch_size': 50
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('google_url_cache', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def article_id(url):
+    """Google News 链接中的文章ID；不是 Google News 链接时返回 None"""
+    match = ARTICLE_ID_PATTERN.search(url or '')
+    return match.group(1) if match else None
+
+
+def network_decode(url):
+    """联网解码一个 Google News 链接，失败返回 None"""
+    from googlenewsdecoder import new_decoderv1
+    try:
+        result = new_decoderv1(url)
+        if result and result.get('status'):
+            return result['decoded_url']
+    except Exception:
+        pass
+    return None
+
+
+class GoogleURLCache:
+    """Google News 链接解码缓存"""
+    
+    def __init__(self, db_path=None, ttl_days=None, workers=None, batch_size=None,
+                 enabled=None, decode_func=None):
+        """
+        初始化缓存
+        
+        Args:
+            db_path: SQLite文件路径，默认 data/cache/google_urls.db
+            ttl_days: 解码结果保留天数
+            workers: 解码未命中链接的并发线程数
+            batch_size: 每批解码的链接数（每批完成后写入缓存）
+            enabled: 是否启用；关闭后每次都联网解码
+            decode_func: 解码函数 decode_func(链接) → 原始链接或 None，默认 network_decode
+        """
+        settings = load_url_cache_settings()
+        
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, settings['db_path'])
+        self.ttl_days = settings['ttl_days'] if ttl_days is None else ttl_days
+        self.workers = max(1, workers or settings['workers'])
+        self.batch_size = max(1, batch_size or settings['batch_size'])
+        self.decode_func = decode_func or network_decode
+        # 本进程内已解析的文章ID（多线程提取正文时逐条查询也不必每次读库）
+        self.memory = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'decoded': 0, 'failed': 0}
+        self.latencies = []
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            # 正文提取的工作线程也会查询，连接在锁保护下跨线程使用
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS google_urls (
+                    article_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_google_urls_created_at ON google_urls(created_at);
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+    
+    def _lookup(self, ids):
+        """从缓存读取 {文章ID: 原始链接}"""
+        found = {}
+        with self.lock:
+            for article in ids:
+                if article in self.memory:
+                    found[article] = self.memory[article]
+            rest = [article for article in ids if article not in found]
+            if not self.enabled or not rest:
+                return found
+            
+            cutoff = time.time() - self.ttl_days * 86400
+            try:
+                conn = self.connect()
+                # SQLite 参数个数有上限，分段查询
+                for start in range(0, len(rest), 500):
+                    chunk = rest[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = conn.execute(
+                        f'SELECT article_id, url FROM google_urls '
+                        f'WHERE article_id IN ({placeholders}) AND created_at >= ?',
+                        chunk + [cutoff]
+                    ).fetchall()
+                    found.update(rows)
+            except sqlite3.Error as e:
+                print(f"  ⚠️  链接解码缓存不可用，全部联网解码: {e}")
+            self.memory.update(found)
+        return found
+    
+    def _store(self, pairs):
+        """保存 [(文章ID, 原始链接), ...]"""
+        with self.lock:
+            self.memory.update(pairs)
+            if not self.enabled or not pairs:
+                return
+            now = time.time()
+            try:
+                conn = self.connect()
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO google_urls (article_id, url, created_at) VALUES (?, ?, ?)',
+                        [(article, url, now) for article, url in pairs]
+                    )
+            except sqlite3.Error as e:
+                print(f"  ⚠️  链接解码缓存写入失败: {e}")
+    
+    def _decode(self, url):
+        """联网解码并记录耗时"""
+        start = time.perf_counter()
+        decoded = self.decode_func(url)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(elapsed)
+        return decoded
+    
+    def resolve(self, urls):
+        """
+        批量解析链接
+        
+        Args:
+            urls: 链接列表（非 Google News 链接原样返回）
+        
+        Returns:
+            dict: 链接 → 原始链接；解码失败的 Google News 链接为 None
+        """
+        ids = {}
+        for url in urls:
+            article = article_id(url)
+            if article:
+                ids.setdefault(article, url)
+        
+        found = self._lookup(list(ids))
+        misses = [(article, url) for article, url in ids.items() if article not in found]
+        self._count('hits', len(found))
+        self._count('misses', len(misses))
+        
+        # 未命中的分批并发解码，每批完成后写入缓存（中途中断也不丢已解码的结果）
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(misses))) as executor:
+                for start in range(0, len(misses), self.batch_size):
+                    batch = misses[start:start + self.batch_size]
+                    decoded = list(executor.map(self._decode, [url for _, url in batch]))
+                    pairs = [(article, result) for (article, _), result in zip(batch, decoded) if result]
+                    self._store(pairs)
+                    found.update(pairs)
+                    self._count('decoded', len(pairs))
+                    self._count('failed', len(batch) - len(pairs))
+        
+        resolved = {}
+        for url in urls:
+            article = article_id(url)
+            resolved[url] = found.get(article) if article else url
+        return resolved
+    
+    def resolve_one(self, url):
+        """解析单个链接，失败时返回原链接"""
+        return self.resolve([url]).get(url) or url
+    
+    def reset_stats(self):
+        """清零本次运行的统计"""
+        with self.lock:
+            self.stats = {'hits': 0, 'misses': 0, 'decoded': 0, 'failed': 0}
+            self.latencies = []
+    
+    def hit_rate(self):
+        """本次运行的缓存命中率"""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+    
+    def print_stats(self):
+        """打印命中率和解码耗时"""
+        stats = self.stats
+        print(f"\n🔗 链接解码缓存: 命中 {stats['hits']} 条, 未命中 {stats['misses']} 条, "
+              f"命中率 {self.hit_rate():.1%}, 解码成功 {stats['decoded']} 条, 失败 {stats['failed']} 条")
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"  解码耗时: 平均 {sum(latencies) / len(latencies):.2f}秒, "
+                  f"P50 {p50:.2f}秒, P95 {p95:.2f}秒, 累计 {sum(latencies):.1f}秒")
+    
+    def compact(self, ttl_days=None):
+        """清理过期记录并压缩数据库，返回删除的记录数"""
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = time.time() - ttl_days * 86400
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                removed = conn.execute(
+                    'DELETE FROM google_urls WHERE created_at < ?', (cutoff,)
+                ).rowcount
+            conn.execute('VACUUM')
+        return removed
+    
+    def size(self):
+        """缓存条数和文件大小"""
+        with self.lock:
+            conn = self.connect()
+            count = conn.execute('SELECT COUNT(*) FROM google_urls').fetchone()[0]
+        return {
+            'urls': count,
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_url_cache():
+    """获取进程内共享的链接解码缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GoogleURLCache()
+        return _cache
+
+
+def load_urls(path):
+    """从爬虫输出（CSV / JSON）中读取链接"""
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return [row.get('url', '') for row in csv.DictReader(f)]
+    with open(path, 'r', encoding='utf-8') as f:
+        return [news.get('url', '') for news in json.load(f)]
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Google News 链接解码缓存')
+    parser.add_argument('--compact', action='store_true', help='清理过期记录并压缩数据库')
+    parser.add_argument('--ttl-days', type=int, help='保留天数（默认读取配置）')
+    parser.add_argument('--stats', action='store_true', help='显示缓存统计')
+    parser.add_argument('--warm', nargs='*', default=[], help='预先解码这些爬虫输出文件中的链接')
+    args = parser.parse_args()
+    
+    cache = GoogleURLCache()
+    
+    if args.warm:
+        urls = []
+        for path in args.warm:
+            urls.extend(url for url in load_urls(path) if article_id(url))
+        print(f"📥 {len(args.warm)} 个文件，Google News 链接 {len(urls)} 条"
+              f"（文章 {len({article_id(url) for url in urls})} 篇）")
+        cache.resolve(urls)
+        cache.print_stats()
+    
+    if args.compact:
+        removed = cache.compact(args.ttl_days)
+        print(f"🧹 已清理 {removed} 条过期记录")
+    
+    size = cache.size()
+    print(f"📊 链接: {size['urls']} 条 | 文件大小: {size['size_bytes'] / 1024:.1f} KB")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
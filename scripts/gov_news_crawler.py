@@ -8,9 +8,7 @@
 import json
 import os
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import time
+from http_client import get_http_client
 
 class GovNewsCrawler:
     """政府官网新闻爬虫"""
@@ -18,10 +16,5 @@ class GovNewsCrawler:
     def __init__(self, sector):
         self.sector = sector
         self.results = []
-        self.session = requests.Session()
-        
-        # 设置请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
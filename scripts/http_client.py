@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享HTTP客户端 - 连接池 + 自动重试 + 按主机限速
+
+所有爬虫共用一个 requests.Session：
+- HTTPAdapter 连接池，keep-alive 复用连接
+- 按 crawler_settings.max_retries 自动重试（429/5xx，指数退避，遵守 Retry-After）
+- 默认超时取 crawler_settings.timeout
+- 支持 gzip/deflate（安装 brotli 后支持 br）
+- 每个主机一个令牌桶限速，替代每页之后固定的 time.sleep，
+  不同主机的请求可以重叠，同一主机仍保持礼貌间隔
+- 条件请求缓存（ETag / Last-Modified）：列表页和RSS未变化时服务器返回304，
+  响应体取自缓存（不重复下载），并按信源统计命中/未命中/节省字节数
+- 解析结果缓存：爬虫把从响应体解析出的条目按 (解析方, URL) 连同响应体哈希一起保存，
+  304 时直接取回上次的条目，不再解析页面
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401  urllib3 检测到 brotli 后可解码 br
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def load_crawler_settings():
+    """读取 references/config.json 中的 crawler_settings"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('crawler_settings', {})
+    except (OSError, ValueError):
+        return {}
+
+
+class TokenBucket:
+    """令牌桶（线程安全）"""
+    
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate: 每秒补充的令牌数（即稳定请求速率）
+            burst: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, jitter=0):
+        """
+        取一个令牌，不足时等待；返回等待的秒数
+        
+        Args:
+            jitter: 在令牌桶的等待之外再随机推迟 0~jitter 秒（也计入预订，后来者一起顺延，
+                    请求间隔不会小于 1/rate）
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 令牌可以透支：先预订时间片，锁外等待，后来者顺延
+            self.tokens -= 1 + (random.uniform(0, jitter) * self.rate if jitter > 0 else 0)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HttpCache:
+    """条件请求缓存（SQLite，按URL保存校验信息和响应体）"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # 多个爬虫线程共用一个连接，由锁串行化
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS parsed_items (
+                consumer TEXT NOT NULL,
+                url TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                items TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (consumer, url)
+            )
+        ''')
+        self.conn.commit()
+        self.lock = threading.Lock()
+    
+    def lookup(self, url):
+        """查询缓存，返回 (etag, last_modified, body) 或 None"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT etag, last_modified, body FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+    
+    def store(self, url, response):
+        """保存带校验信息（ETag / Last-Modified）的响应"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (url, etag, last_modified, response.content, time.time())
+                )
+    
+    def touch(self, url):
+        """304 时刷新缓存时间"""
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    'UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url)
+                )
+    
+    def lookup_items(self, consumer, url):
+        """查询解析结果，返回 (响应体哈希, 条目JSON) 或 None"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT body_hash, items FROM parsed_items WHERE consumer = ? AND url = ?',
+                (consumer, url)
+            ).fetchone()
+    
+    def store_items(self, consumer, url, body_hash, items):
+        """保存从响应体解析出的条目"""
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO parsed_items (consumer, url, body_hash, items, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (consumer, url, body_hash, json.dumps(items, ensure_ascii=False), time.time())
+                )
+
+
+class HttpClient:
+    """共享HTTP客户端"""
+    
+    def __init__(self, settings=None):
+        """
+        初始化客户端
+        
+        Args:
+            settings: crawler_settings 配置，默认从 references/config.json 读取
+        """
+        settings = load_crawler_settings() if settings is None else settings
+        
+        self.timeout = settings.get('timeout', 10)
+        self.max_retries = settings.get('max_retries', 3)
+        self.host_rate = settings.get('per_host_rate', 1.0)
+        self.host_burst = settings.get('per_host_burst', 1)
+        
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'HEAD'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.get('pool_connections', 20),
+            pool_maxsize=settings.get('pool_maxsize', 20),
+            max_retries=retry
+        )
+        
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': settings.get('user_agent', DEFAULT_USER_AGENT),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+        })
+        
+        self.buckets = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        
+        # 条件请求缓存（首次使用时打开）
+        self.cache = None
+        self.cache_path = None
+        if settings.get('http_cache', True):
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            self.cache_path = os.path.join(
+                script_dir, settings.get('http_cache_path', '../data/cache/http_cache.db')
+            )
+        self.cache_stats = {}
+    
+    @property
+    def headers(self):
+        """会话默认请求头"""
+        return self.session.headers
+    
+    def _bucket(self, host):
+        """获取主机对应的令牌桶"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+                self.stats[host] = {'requests': 0, 'wait': 0.0}
+            return bucket
+    
+    def throttle(self, url, jitter=0):
+        """
+        按主机限速：取该主机的一个令牌（自行发送请求的库如 GNews 也经过这里），返回等待秒数
+        
+        jitter 大于 0 时在令牌桶的间隔之上再随机推迟 0~jitter 秒，请求时间不呈固定节拍
+        """
+        host = urlsplit(url).netloc.lower()
+        wait = self._bucket(host).acquire(jitter)
+        with self.lock:
+            self.stats[host]['requests'] += 1
+            self.stats[host]['wait'] += wait
+        return wait
+    
+    def request(self, method, url, **kwargs):
+        """发送请求（按主机限速，默认超时取配置）"""
+        self.throttle(url)
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url, **kwargs):
+        """GET 请求，参数与 requests.Session.get 相同"""
+        return self.request('GET', url, **kwargs)
+    
+    def head(self, url, **kwargs):
+        """HEAD 请求"""
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+    
+    def _get_cache(self):
+        """打开条件请求缓存（未启用时返回 None）"""
+        with self.lock:
+            if self.cache is None and self.cache_path:
+                self.cache = HttpCache(self.cache_path)
+            return self.cache
+    
+    def get_conditional(self, url, source=None, **kwargs):
+        """
+        条件GET：带上次的 ETag / Last-Modified 请求
+        
+        返回的响应带有 not_modified 属性；为 True 时服务器返回了304，
+        response.content 为缓存的响应体。校验信息按URL保存，而同一页面可能有多个使用方
+        （不同领域、中断后重跑），304 不代表当前调用方已经取过这些内容：调用方先用
+        cached_items 取回上次从这份响应体解析出的条目，没有时再解析并用 store_items 保存。
+        
+        Args:
+            url: 请求URL
+            source: 统计用的信源名称，默认为主机名
+        """
+        source = source or urlsplit(url).netloc.lower()
+        cached = None
+        try:
+            cache = self._get_cache()
+            if cache is not None:
+                cached = cache.lookup(url)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  HTTP缓存读取失败: {e}")
+        
+        headers = dict(kwargs.pop('headers', None) or {})
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = self.get(url, headers=headers, **kwargs)
+        
+        with self.lock:
+            stats = self.cache_stats.setdefault(source, {'hits': 0, 'misses': 0, 'bytes_saved': 0})
+            if response.status_code == 304 and cached:
+                stats['hits'] += 1
+                stats['bytes_saved'] += len(cached[2])
+            else:
+                stats['misses'] += 1
+        
+        try:
+            if response.status_code == 304 and cached:
+                response.not_modified = True
+                response._content = cached[2]
+                self.cache.touch(url)
+            else:
+                response.not_modified = False
+                if response.status_code == 200 and self.cache is not None:
+                    self.cache.store(url, response)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  HTTP缓存写入失败: {e}")
+        
+        return response
+    
+    def cached_items(self, consumer, url, response):
+        """
+        304 时取回上次从同一响应体解析出的条目
+        
+        Args:
+            consumer: 解析方标识（不同爬虫的解析方式不同，各自保存）
+            url: 请求URL
+            response: get_conditional 返回的响应
+        
+        Returns:
+            条目列表；不是304、没有保存过或响应体已变化时返回 None
+        """
+        if not getattr(response, 'not_modified', False) or self.cache is None:
+            return None
+        try:
+            row = self.cache.lookup_items(consumer, url)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  HTTP缓存读取失败: {e}")
+            return None
+        if row is None or row[0] != hashlib.sha1(response.content).hexdigest():
+            return None
+        return json.loads(row[1])
+    
+    def store_items(self, consumer, url, response, items):
+        """保存从响应体解析出的条目（只保存带校验信息、以后可能返回304的响应）"""
+        if self.cache is None:
+            return
+        has_validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        if not (getattr(response, 'not_modified', False)
+                or (response.status_code == 200 and has_validator)):
+            return
+        try:
+            self.cache.store_items(consumer, url, hashlib.sha1(response.content).hexdigest(), items)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  HTTP缓存写入失败: {e}")
+    
+    def print_stats(self):
+        """打印每个主机的请求数和限速等待时间"""
+        if not self.stats:
+            return
+        print("\n🌐 HTTP请求统计（按主机）：")
+        for host, item in sorted(self.stats.items(), key=lambda kv: -kv[1]['requests']):
+            print(f"  {host}: {item['requests']} 次请求, 限速等待 {item['wait']:.1f}秒")
+        
+        if self.cache_stats:
+            print("\n🗄️  条件请求缓存（按信源）：")
+            for source, item in sorted(self.cache_stats.items()):
+                print(f"  {source}: 命中 {item['hits']} 次, 未命中 {item['misses']} 次, "
+                      f"节省 {item['bytes_saved'] / 1024:.1f} KB")
+    
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """获取进程内共享的HTTP客户端"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
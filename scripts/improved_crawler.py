@@ -10,6 +10,7 @@ from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
 import time
+from keyword_matcher import get_matcher, get_sector_matcher
 
 class ImprovedRollingNewsCrawler:
     """改进版滚动新闻爬虫 - 提高匹配率"""
@@ -31,6 +32,10 @@ class ImprovedRollingNewsCrawler:
         
         # 辅助关键词（提高召回率）
         self.auxiliary_keywords = ['产业', '发展', '创新', '服务', '保障', '改革', '建设']
+        
+        # 编译多模式匹配自动机（按关键词集合缓存）
+        self.core_matcher = get_sector_matcher(sector, self.core_keywords)
+        self.auxiliary_matcher = get_matcher(self.auxiliary_keywords)
     
     def load_config(self):
         """加载配置文件"""
@@ -48,21 +53,11 @@ class ImprovedRollingNewsCrawler:
         2. 或者包含2个以上辅助关键词
         """
         # 检查核心关键词
-        core_match_count = 0
-        for keyword in self.core_keywords:
-            if keyword in title:
-                core_match_count += 1
-        
-        if core_match_count >= 1:
+        if self.core_matcher.search(title):
             return True
         
         # 检查辅助关键词
-        aux_match_count = 0
-        for keyword in self.auxiliary_keywords:
-            if keyword in title:
-                aux_match_count += 1
-        
-        if aux_match_count >= 2:
+        if self.auxiliary_matcher.count(title) >= 2:
             return True
         
         return False
@@ -7,6 +7,8 @@
 import json
 import os
 
+from rule_engine import RuleEngine
+
 class KeywordFilter:
     """关键词筛选器"""
     
@@ -43,6 +45,15 @@ class KeywordFilter:
         else:
             # 如果是列表，直接使用
             self.include_keywords = include_kw
+        
+        # 丢弃按旧规则表编译的引擎，下次调用 rules() 时按新规则表编译
+        self._engine = None
+    
+    def rules(self):
+        """编译后的规则引擎（首次使用时编译；直接修改规则列表不会触发重新编译，需重新调用 load_keywords）"""
+        if self._engine is None:
+            self._engine = RuleEngine(keyword_filter=self)
+        return self._engine
     
     def should_exclude(self, title):
         """判断是否应该排除"""
@@ -80,18 +91,10 @@ class KeywordFilter:
         """
         title = news_item.get('title', '')
         
-        # 第一步：检查是否应该排除
-        should_excl, excl_reason = self.should_exclude(title)
-        if should_excl:
-            return False, excl_reason
-        
-        # 第二步：检查是否应该包含
-        should_incl, incl_reason = self.should_include(title)
-        if should_incl:
-            return True, incl_reason
-        
-        # 不匹配任何关键词，排除
-        return False, "未匹配任何关键词"
+        # 排除词、排除领域、必选词一次扫描完成（与共用引擎的其他筛选器共享命中结果），
+        # 结论与依次调用 should_exclude / should_include 相同
+        engine = self.rules()
+        return engine.check_keywords(title, engine.hits_for(news_item))
     
     def filter_news_list(self, news_list):
         """批量筛选新闻"""
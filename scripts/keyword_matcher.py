@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词多模式匹配 - Aho-Corasick 自动机
+
+各爬虫的 match_keywords 以前对每个标题逐个关键词执行 `keyword in title`，
+关键词越多越慢。这里把一个板块的全部关键词（config.json + 扩展同义词）
+编译成一个自动机，对标题只扫描一遍即可得到所有命中的关键词。
+自动机按板块缓存，同一进程内的所有爬虫共用。
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+# 扩展同义词/相关词（原 UniversalNewsCrawler.match_keywords 中每次调用都重建的列表）
+EXTENDED_KEYWORDS = {
+    'healthcare': [
+        '药企', '药厂', '制药', '新药', '仿制药',
+        '医生', '护士', '患者', '病人',
+        '诊所', '卫生', '疾控', 'CDC',
+        '医学', '临床', '手术', '治疗'
+    ],
+    'education': [
+        '学生', '教师', '老师', '校长',
+        '大学生', '研究生', '博士', '硕士',
+        '招生', '考试', '升学', '毕业',
+        '科研', '学术', '论文', '课题'
+    ]
+}
+
+
+class KeywordMatcher:
+    """Aho-Corasick 多模式匹配器"""
+    
+    def __init__(self, keywords):
+        """
+        编译关键词
+        
+        Args:
+            keywords: 关键词列表（重复和空字符串会被忽略）
+        """
+        self.keywords = [kw for kw in dict.fromkeys(keywords) if kw]
+        
+        # 状态转移表：goto[state] = {字符: 下一状态}；output[state] = 在该状态结束的关键词
+        self.goto = [{}]
+        self.output = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(keyword)
+        
+        # 广度优先构建失败指针，并把失败链上的输出合并到当前状态
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+    
+    def _scan(self, text):
+        """逐字符扫描，依次产出命中的关键词"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+    
+    def find_all(self, text):
+        """返回文本中出现的所有关键词（去重，按出现位置排序）"""
+        if not text:
+            return []
+        return list(dict.fromkeys(self._scan(text)))
+    
+    def search(self, text):
+        """文本是否包含任一关键词（命中即停止）"""
+        if not text:
+            return False
+        for _ in self._scan(text):
+            return True
+        return False
+    
+    def count(self, text):
+        """文本中出现的不同关键词个数"""
+        return len(set(self._scan(text))) if text else 0
+    
+    def __len__(self):
+        return len(self.keywords)
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(keywords):
+    """按关键词集合缓存的匹配器"""
+    key = tuple(keywords)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = _matchers[key] = KeywordMatcher(keywords)
+        return matcher
+
+
+def load_sector_keywords(sector):
+    """读取 config.json 中板块的关键词（板块不存在时返回空列表）"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config['sectors'].get(sector, {}).get('keywords', [])
+
+
+def get_sector_matcher(sector, keywords=None, extended=False):
+    """
+    获取板块的关键词匹配器（按板块缓存）
+    
+    Args:
+        sector: 板块
+        keywords: 板块关键词，默认读取 config.json
+        extended: 是否加入扩展同义词（healthcare 用医疗词表，其它板块用教育词表，
+                  与原 UniversalNewsCrawler 的行为一致）
+    """
+    if keywords is None:
+        keywords = load_sector_keywords(sector)
+    keywords = list(keywords)
+    if extended:
+        keywords += EXTENDED_KEYWORDS['healthcare' if sector == 'healthcare' else 'education']
+    return get_matcher(keywords)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表页模板 - 缓存 UniversalNewsCrawler 自动识别的结果，之后的页面按模板一次定位
+
+auto_detect_news_list 每一页都要按三组正则扫描所有容器、再扫描200个链接找时间标记，
+对每个链接的父元素做日期匹配。第一次识别成功后，这里把结果保存成一个小模板：
+- containers：产出新闻链接的容器 CSS 路径（如 div#main > ul.news-list）
+- date：日期所在位置（链接父元素内的选择器，'parent' 表示父元素文字，None 表示没有日期）
+
+之后同一列表页（包括翻页）直接 soup.select(容器路径) 取链接，只在有日期时才匹配日期。
+只有模板能覆盖完整识别的全部新闻（没有按时间标记找到的零散链接，且在同一页面上按模板取到的
+结果与完整识别相同）时才保存模板，否则以后按模板会漏掉新闻。
+按模板取到的新闻数低于学习时的 min_yield_ratio（或 min_items）时模板作废，重新自动识别并学习。
+模板按列表页 URL 保存在 data/cache/listing_templates.db。
+
+用法:
+    python3 listing_templates.py --stats
+    python3 listing_templates.py --forget https://www.example.com/news/
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from extractor_registry import domain_of
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 可以直接写进 CSS 选择器的 class / id
+CSS_IDENT = re.compile(r'^[A-Za-z_][\w-]*$')
+
+
+def load_template_settings():
+    """从 references/config.json 读取 listing_templates 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/listing_templates.db',
+        'min_items': 5,
+        'min_yield_ratio': 0.5,
+        'max_containers': 5,
+        'max_depth': 4
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('listing_templates', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def element_selector(element):
+    """单个元素的选择器：tag#id 或 tag.class1.class2"""
+    element_id = element.get('id')
+    if element_id and CSS_IDENT.match(element_id):
+        return f"{element.name}#{element_id}"
+    classes = [name for name in element.get('class', []) if CSS_IDENT.match(name)]
+    return element.name + ''.join(f'.{name}' for name in classes)
+
+
+def css_path(element, max_depth=4):
+    """从元素向上（遇到带 id 的祖先或到达 max_depth 为止）拼出 CSS 路径"""
+    parts = []
+    node = element
+    while node is not None and node.name not in (None, '[document]', 'html', 'body') and len(parts) < max_depth:
+        selector = element_selector(node)
+        parts.append(selector)
+        if '#' in selector:
+            break
+        node = node.parent
+    return ' > '.join(reversed(parts))
+
+
+def date_selector(parent, date_text):
+    """日期在链接父元素中的位置：子元素选择器，'parent'（父元素自身的文字）或 None"""
+    if not parent or not date_text:
+        return None
+    found = parent.find(string=lambda text: text and date_text in text)
+    if found is None or found.parent is parent:
+        return 'parent'
+    return element_selector(found.parent)
+
+
+def build_template(soup, container_counts, date_position, expected=None, max_containers=5, max_depth=4):
+    """
+    由自动识别的结果生成模板
+    
+    Args:
+        container_counts: [(容器元素, 产出的新闻数), ...]
+        date_position: 日期位置（见 date_selector）
+        expected: 完整识别到的新闻总数，默认为各容器产出之和
+    
+    Returns:
+        dict 或 None（有新闻不在容器中、容器超过 max_containers 个，或路径选不回原容器）
+    """
+    total = sum(count for _, count in container_counts)
+    if not total or total < (total if expected is None else expected):
+        return None
+    
+    paths = []
+    for container, _ in sorted(container_counts, key=lambda pair: -pair[1]):
+        path = css_path(container, max_depth)
+        if not path or container not in soup.select(path):
+            return None
+        if path not in paths:
+            paths.append(path)
+    if len(paths) > max_containers:
+        return None
+    return {'containers': paths, 'date': date_position, 'yield': total}
+
+
+def apply_template(soup, template):
+    """
+    按模板取链接
+    
+    Returns:
+        [(链接元素, 日期所在元素或 None), ...]
+    """
+    date = template.get('date')
+    pairs = []
+    for link in soup.select(', '.join(f'{path} a[href]' for path in template['containers'])):
+        parent = link.parent
+        if date == 'parent':
+            pairs.append((link, parent))
+        elif date and parent is not None:
+            pairs.append((link, parent.select_one(date) or parent))
+        else:
+            pairs.append((link, None))
+    return pairs
+
+
+class ListingTemplateStore:
+    """按列表页 URL 保存模板"""
+    
+    def __init__(self, db_path=None, enabled=None):
+        """
+        初始化
+        
+        Args:
+            db_path: SQLite文件路径，默认 data/cache/listing_templates.db
+            enabled: 是否启用；关闭后每页都完整自动识别
+        """
+        settings = load_template_settings()
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, settings['db_path'])
+        self.min_items = settings['min_items']
+        self.min_yield_ratio = settings['min_yield_ratio']
+        self.max_containers = settings['max_containers']
+        self.max_depth = settings['max_depth']
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.stats = {'hits': 0, 'learned': 0, 'rejected': 0, 'invalidated': 0, 'detected': 0}
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS listing_templates (
+                    source TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    learned_at REAL NOT NULL
+                );
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def get(self, source):
+        """列表页的模板，没有时返回 None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            if source not in self.memory:
+                try:
+                    row = self.connect().execute(
+                        'SELECT template FROM listing_templates WHERE source = ?', (source,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"  ⚠️  列表页模板不可用: {e}")
+                    row = None
+                self.memory[source] = json.loads(row[0]) if row else None
+            return self.memory[source]
+    
+    def is_valid(self, template, count):
+        """按模板取到的新闻数是否正常（低于学习时的 min_yield_ratio 或 min_items 即作废）"""
+        return count >= max(self.min_items, template['yield'] * self.min_yield_ratio)
+    
+    def learn(self, source, soup, container_counts, date_position, expected=None, check=None):
+        """
+        自动识别成功后生成并保存模板
+        
+        Args:
+            expected: 完整识别到的新闻总数（容器产出之和不足时不保存）
+            check: 校验函数 check(模板)，在同一页面上按模板取到的结果与完整识别相同时返回 True
+        
+        Returns:
+            模板或 None（新闻不足 min_items、不能覆盖全部新闻或校验不通过时不保存）
+        """
+        if not self.enabled:
+            return None
+        template = build_template(soup, container_counts, date_position, expected,
+                                  self.max_containers, self.max_depth)
+        if template is not None and template['yield'] < self.min_items:
+            return None
+        if template is None or (check is not None and not check(template)):
+            self.count('rejected')
+            return None
+        with self.lock:
+            self.memory[source] = template
+            self.stats['learned'] += 1
+            try:
+                conn = self.connect()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO listing_templates (source, domain, template, learned_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        (source, domain_of(source), json.dumps(template, ensure_ascii=False), time.time())
+                    )
+            except sqlite3.Error as e:
+                print(f"  ⚠️  列表页模板写入失败: {e}")
+        return template
+    
+    def invalidate(self, source):
+        """删除列表页的模板"""
+        with self.lock:
+            self.memory[source] = None
+            self.stats['invalidated'] += 1
+            try:
+                conn = self.connect()
+                with conn:
+                    return conn.execute('DELETE FROM listing_templates WHERE source = ?', (source,)).rowcount
+            except sqlite3.Error as e:
+                print(f"  ⚠️  列表页模板删除失败: {e}")
+                return 0
+    
+    def count(self, key):
+        """统计本次运行：hits 按模板提取 / detected 完整自动识别 / rejected 模板不能覆盖全部新闻"""
+        with self.lock:
+            self.stats[key] += 1
+    
+    def print_stats(self):
+        """打印本次运行的模板使用情况"""
+        stats = self.stats
+        if not stats['hits'] and not stats['detected']:
+            return
+        print(f"\n🧩 列表页模板: 按模板提取 {stats['hits']} 页, 完整识别 {stats['detected']} 页, "
+              f"新学习 {stats['learned']} 个, 不能覆盖全部新闻 {stats['rejected']} 个, 作废 {stats['invalidated']} 个")
+    
+    def rows(self):
+        """全部模板 [(列表页, 模板, 学习时间), ...]"""
+        with self.lock:
+            return [(source, json.loads(template), learned_at) for source, template, learned_at in
+                    self.connect().execute(
+                        'SELECT source, template, learned_at FROM listing_templates ORDER BY domain, source'
+                    )]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_template_store():
+    """获取进程内共享的模板存储"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ListingTemplateStore()
+        return _store
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='列表页模板')
+    parser.add_argument('--stats', action='store_true', help='显示所有模板')
+    parser.add_argument('--forget', nargs='*', default=[], help='删除这些列表页的模板')
+    args = parser.parse_args()
+    
+    store = ListingTemplateStore()
+    for source in args.forget:
+        print(f"🧹 {source}: 删除 {store.invalidate(source)} 个模板")
+    
+    if args.stats or not args.forget:
+        rows = store.rows()
+        print(f"\n🧩 列表页模板: {len(rows)} 个")
+        for source, template, learned_at in rows:
+            print(f"  {source}")
+            print(f"    容器: {' | '.join(template['containers'])}")
+            print(f"    日期: {template['date']}  学习时新闻数: {template['yield']}  "
+                  f"{time.strftime('%Y-%m-%d', time.localtime(learned_at))}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型批量调度器 - 并发批次 + 限速 + 重试 + 截断结果抢救
+
+替代 LLMFilter.filter_all 中固定50条、逐批串行的调用方式：
+- 按估算的 token 预算打包批次（标题长短不一，固定条数容易超出输出上限被截断）
+- 多个批次并发请求，令牌桶限制每秒请求数
+- 429 / 5xx / 网络错误按指数退避重试（遵守 Retry-After）
+- 返回的 JSON 数组被截断时，保留已完整输出的条目，只把缺失的 id 重新打包提交
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from http_client import TokenBucket
+
+# 可重试的状态码（529 为服务过载）
+RETRYABLE_STATUS = {429, 500, 502, 503, 504, 529}
+
+
+class LLMAPIError(Exception):
+    """大模型接口调用失败"""
+    
+    def __init__(self, status, message='', retry_after=None):
+        """
+        Args:
+            status: HTTP状态码，网络错误/超时为 None
+            message: 错误信息
+            retry_after: 服务器要求的等待秒数（Retry-After）
+        """
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.retry_after = retry_after
+    
+    @property
+    def retryable(self):
+        """是否值得重试"""
+        return self.status is None or self.status in RETRYABLE_STATUS
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符约1字1个，其余约4字符1个"""
+    if not text:
+        return 0
+    wide = sum(1 for char in text if char >= '\u2e80')
+    return wide + (len(text) - wide + 3) // 4
+
+
+def pack_batches(items, token_budget, max_items, cost, overhead=0):
+    """
+    按 token 预算顺序打包批次
+    
+    Args:
+        items: 待打包的条目列表
+        token_budget: 每批的估算 token 上限（含 overhead）
+        max_items: 每批最多条数
+        cost: 计算单个条目 token 数的函数
+        overhead: 每批固定开销（系统提示词、说明文字）
+    
+    Returns:
+        批次列表（单个条目超出预算时独占一批）
+    """
+    batches = []
+    batch = []
+    used = overhead
+    for item in items:
+        item_cost = cost(item)
+        if batch and (used + item_cost > token_budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch = []
+            used = overhead
+        batch.append(item)
+        used += item_cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def strip_code_fence(text):
+    """去除 markdown 代码块标记"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```[^\n]*\n?', '', text)
+        text = re.sub(r'\n?```\s*$', '', text)
+    return text.strip()
+
+
+def salvage_json_array(text):
+    """
+    解析 JSON 数组，被截断时抢救已完整输出的元素
+    
+    Returns:
+        (元素列表, 是否完整)
+    """
+    text = strip_code_fence(text)
+    try:
+        data = json.loads(text)
+        if isinstance(data, list):
+            return data, True
+        return [], False
+    except ValueError:
+        pass
+    
+    start = text.find('[')
+    if start < 0:
+        return [], False
+    
+    decoder = json.JSONDecoder()
+    items = []
+    pos = start + 1
+    while True:
+        # 跳过空白和逗号
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            break
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            break
+        items.append(item)
+    return items, False
+
+
+class LLMDispatcher:
+    """大模型批量调度器"""
+    
+    def __init__(self, request_func, workers=4, rate=1.0, max_retries=4, backoff=2.0,
+                 max_backoff=60, salvage_rounds=2):
+        """
+        初始化调度器
+        
+        Args:
+            request_func: 处理一批的函数，参数为 [(下标, 新闻), ...]，
+                          返回 {下标: 结论}（可以只包含部分下标），失败时抛出 LLMAPIError
+            workers: 并发批次数
+            rate: 每秒最多发起的请求数
+            max_retries: 单个请求的最大重试次数
+            backoff: 退避基数（秒），第 n 次重试等待 backoff * 2^n（加随机抖动）
+            max_backoff: 单次退避上限（秒）
+            salvage_rounds: 缺失条目重新提交的最多轮数
+        """
+        self.request_func = request_func
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate, max(1, int(rate)))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.salvage_rounds = salvage_rounds
+        self.lock = threading.Lock()
+        self.stats = {}
+    
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+    
+    def _call(self, batch):
+        """带限速和重试地处理一批"""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._count('requests')
+            try:
+                return self.request_func(batch)
+            except LLMAPIError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = e.retry_after
+                if delay is None:
+                    delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                    delay += random.uniform(0, delay / 2)
+                attempt += 1
+                self._count('retries')
+                print(f"  🔁 请求失败（{e}），{delay:.1f}秒后第{attempt}次重试")
+                time.sleep(delay)
+    
+    def run(self, batches, on_verdicts=None):
+        """
+        并发处理所有批次
+        
+        Args:
+            batches: 批次列表，每批为 [(下标, 新闻), ...]
+            on_verdicts: 每批完成时在调用线程中回调 on_verdicts({下标: 结论})
+        
+        Returns:
+            (结论 {下标: 结论}, 未能得到结论的下标集合)
+        """
+        self.stats = {'batches': 0, 'requests': 0, 'retries': 0, 'partial': 0,
+                      'resubmitted': 0, 'failed_batches': 0}
+        start = time.perf_counter()
+        verdicts = {}
+        unanswered = set()
+        
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = {}
+        try:
+            for batch in batches:
+                pending[executor.submit(self._call, batch)] = (batch, 0)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, round_num = pending.pop(future)
+                    self._count('batches')
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"  ✗ 批次失败（{len(batch)}条）: {e}")
+                        self._count('failed_batches')
+                        unanswered.update(index for index, _ in batch)
+                        continue
+                    
+                    indexes = {index for index, _ in batch}
+                    result = {index: verdict for index, verdict in result.items()
+                              if index in indexes}
+                    verdicts.update(result)
+                    if on_verdicts and result:
+                        on_verdicts(result)
+                    
+                    missing = [(index, news) for index, news in batch if index not in result]
+                    if not missing:
+                        continue
+                    self._count('partial')
+                    if round_num < self.salvage_rounds:
+                        print(f"  🩹 批次缺少{len(missing)}条结论，重新提交缺失部分")
+                        self._count('resubmitted', len(missing))
+                        pending[executor.submit(self._call, missing)] = (missing, round_num + 1)
+                    else:
+                        unanswered.update(index for index, _ in missing)
+        finally:
+            executor.shutdown(wait=False)
+        
+        self.stats['elapsed'] = time.perf_counter() - start
+        return verdicts, unanswered
+    
+    def print_stats(self):
+        """打印调度统计"""
+        stats = self.stats
+        if not stats:
+            return
+        print(f"\n🚦 调度统计: {stats['batches']} 批次, {stats['requests']} 次请求, "
+              f"重试 {stats['retries']} 次, 截断/缺失 {stats['partial']} 批, "
+              f"重新提交 {stats['resubmitted']} 条, 失败 {stats['failed_batches']} 批, "
+              f"耗时 {stats.get('elapsed', 0):.1f}秒")
@@ -5,17 +5,72 @@
 """
 
 import json
+import os
+import queue
+import threading
+import time
 import requests
 
+from llm_dispatcher import LLMAPIError, LLMDispatcher, estimate_tokens, pack_batches, salvage_json_array
+from llm_stream import IncrementalArrayParser, iter_sse_events
+from title_classifier import ClassifierCascade
+from verdict_cache import VerdictCache
+
+# 调度默认值，可在 references/config.json 的 ai_settings.dispatcher 中覆盖
+DEFAULT_DISPATCH_SETTINGS = {
+    'workers': 4,
+    'requests_per_second': 1.0,
+    'token_budget': 6000,
+    'max_batch_items': 50,
+    'max_tokens': 8192,
+    'output_tokens_per_item': 40,
+    'max_retries': 4,
+    'backoff': 2.0,
+    'salvage_rounds': 2,
+    'timeout': 180,
+    'stream': False
+}
+
+
+def load_dispatch_settings():
+    """读取 ai_settings.dispatcher 配置"""
+    settings = dict(DEFAULT_DISPATCH_SETTINGS)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('ai_settings', {}).get('dispatcher', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
 class LLMFilter:
     """大模型筛选器"""
     
-    def __init__(self, model="claude-opus-4-5"):
-        """初始化"""
+    def __init__(self, model="claude-opus-4-5", use_cache=True, api_url=None, api_key=None,
+                 use_classifier=True):
+        """
+        初始化
+        
+        Args:
+            model: 模型名称
+            use_cache: 是否使用结论缓存（data/cache/llm_verdicts.db）
+            api_url: 接口地址，默认读取环境变量 LLM_API_URL
+            api_key: 接口密钥，默认读取环境变量 LLM_API_KEY
+            use_classifier: 是否启用本地预分类（需先运行 title_classifier.py --train）
+        """
         self.model = model
         self.api_url = "https://code.newcli.com/claude/droid/v1/messages"
         self.api_key = "sk-ant-REDACTED"
         
+        api_url = api_url or os.environ.get('LLM_API_URL')
+        api_key = api_key or os.environ.get('LLM_API_KEY')
+        if api_url:
+            self.api_url = api_url
+        if api_key:
+            self.api_key = api_key
+        self.settings = load_dispatch_settings()
+        
         print(f"初始化LLM客户端:")
         print(f"  模型: {self.model}")
         print(f"  API URL: {self.api_url}")
@@ -42,32 +97,159 @@ class LLMFilter:
 - 宁可多保留，不要漏掉重要信息
 - 有疑问时倾向于保留
 - 理由简短明确（5-10字）"""
+        
+        # 结论缓存（按模型和提示词版本区分，提示词变更后自动失效）
+        self.cache = VerdictCache(self.model, self.system_prompt, enabled=use_cache)
+        
+        # 本地预分类：高置信度的标题不再调用大模型
+        self.cascade = ClassifierCascade.from_config() if use_classifier else None
+        if self.cascade is not None:
+            print(f"  预分类: 保留≥{self.cascade.keep_threshold} / 排除≤{self.cascade.reject_threshold}")
     
-    def filter_all(self, news_list, batch_size=50):
-        """分批处理所有新闻"""
+    def filter_all(self, news_list, batch_size=None, workers=None, token_budget=None,
+                   stream=None, on_keep=None):
+        """
+        分批处理所有新闻
+        
+        先查结论缓存，再由本地预分类判定高置信度的新闻，只把剩下的新闻按 token 预算
+        重新打包成批，由调度器并发发给大模型；
+        大模型给出的结论写回缓存。返回的结果 id 为新闻在 news_list 中的序号（从1开始）。
+        
+        Args:
+            news_list: 新闻列表
+            batch_size: 每批最多条数（默认 ai_settings.dispatcher.max_batch_items）
+            workers: 并发批次数
+            token_budget: 每批估算 token 上限
+            stream: 是否使用流式响应（默认 ai_settings.dispatcher.stream），
+                    每条结论生成后立即生效，不必等整批返回
+            on_keep: 判断保留时立即回调 on_keep(新闻)（流式时在工作线程中调用），
+                     缓存命中的保留新闻最先回调；每条新闻最多回调一次
+        """
+        settings = self.settings
+        stream = settings['stream'] if stream is None else stream
+        batch_size = batch_size or settings['max_batch_items']
+        workers = workers or settings['workers']
+        token_budget = token_budget or settings['token_budget']
         total = len(news_list)
-        all_filtered = []
-        all_results = []
         
-        print(f"\n将分{(total + batch_size - 1) // batch_size}批处理，每批{batch_size}条")
+        # 下标 → {'keep', 'reason'}；缓存命中的直接复用
+        self.cache.reset_stats()
+        verdicts = self.cache.lookup(news_list)
+        misses = [i for i in range(total) if i not in verdicts]
+        cached = set(verdicts)
+        
+        # 预分类：高置信度的本地判定（不写入结论缓存，避免用分类器的输出再训练分类器）
+        local = {}
+        if self.cascade is not None:
+            for i in misses:
+                decision = self.cascade.decide(news_list[i])
+                if decision is not None:
+                    local[i] = {'keep': decision['keep'], 'reason': decision['reason']}
+            verdicts.update(local)
+        pending = [i for i in misses if i not in local]
+        decided = cached | set(local)
+        
+        if decided:
+            print(f"\n结论缓存命中{len(cached)}条，预分类判定{len(local)}条，需大模型判断{len(pending)}条")
         
-        for batch_idx in range(0, total, batch_size):
-            batch = news_list[batch_idx:batch_idx + batch_size]
-            batch_num = batch_idx // batch_size + 1
-            total_batches = (total + batch_size - 1) // batch_size
-            
-            print(f"\n处理第{batch_num}/{total_batches}批（{len(batch)}条）...")
-            
-            filtered, stats, results = self._filter_batch(batch, batch_idx)
-            all_filtered.extend(filtered)
-            all_results.extend(results)
+        # 保留的新闻尽早交给下游（缓存命中的先交）
+        emitted = set()
+        emit_lock = threading.Lock()
+        first_verdict = []
+        
+        def emit(index, verdict):
+            with emit_lock:
+                if not first_verdict and index not in decided:
+                    first_verdict.append(time.perf_counter() - dispatch_start)
+                if index in emitted:
+                    return
+                emitted.add(index)
+            if on_keep and verdict['keep']:
+                on_keep(news_list[index])
+        
+        for index in sorted(decided):
+            emit(index, verdicts[index])
+        
+        # 输出上限也限制每批条数（每条结论约 output_tokens_per_item 个 token）
+        max_items = min(batch_size, max(1, int(settings['max_tokens'] * 0.8)
+                                        // settings['output_tokens_per_item']))
+        batches = pack_batches(
+            [(i, news_list[i]) for i in pending],
+            token_budget,
+            max_items,
+            self.estimate_item_tokens,
+            overhead=estimate_tokens(self.system_prompt) + estimate_tokens(self.build_user_prompt([]))
+        )
+        mode = '流式' if stream else '整批'
+        print(f"\n将分{len(batches)}批处理（每批约{token_budget} token、最多{max_items}条，"
+              f"并发{workers}，{mode}）")
+        
+        def on_verdicts(new_verdicts):
+            for index, verdict in new_verdicts.items():
+                emit(index, verdict)
+            self.cache.store([(news_list[i], verdict) for i, verdict in new_verdicts.items()])
+        
+        if stream:
+            def request_func(batch):
+                return self.stream_verdicts(batch, emit)
+        else:
+            request_func = self.request_verdicts
+        
+        dispatch_start = time.perf_counter()
+        dispatcher = LLMDispatcher(
+            request_func,
+            workers=workers,
+            rate=settings['requests_per_second'],
+            max_retries=settings['max_retries'],
+            backoff=settings['backoff'],
+            salvage_rounds=settings['salvage_rounds']
+        )
+        new_verdicts, failed = dispatcher.run(batches, on_verdicts)
+        verdicts.update(new_verdicts)
+        
+        # 没有得到结论的新闻按保留处理，同样交给下游
+        if on_keep:
+            for index in sorted(failed - emitted):
+                on_keep(news_list[index])
+        
+        # 按原顺序汇总；调用失败、始终没有结论的新闻保留（宁可多保留），不写缓存
+        all_filtered = []
+        all_results = []
+        for i, news in enumerate(news_list):
+            verdict = verdicts.get(i)
+            if verdict is None:
+                if i in failed:
+                    all_filtered.append(news)
+                continue
+            if verdict['keep']:
+                all_filtered.append(news)
+            all_results.append({
+                'id': i + 1,
+                'keep': verdict['keep'],
+                'reason': verdict['reason'],
+                'cached': i in cached,
+                'local': i in local
+            })
         
         # 汇总统计
         final_stats = {
             'total': total,
             'kept': len(all_filtered),
             'excluded': total - len(all_filtered),
-            'reasons': {}
+            'unanswered': len(failed),
+            'reasons': {},
+            'cache': {
+                'hits': len(cached),
+                'misses': len(misses),
+                'hit_rate': len(cached) / total if total else 0.0
+            },
+            'pre_classifier': {
+                'kept': sum(1 for verdict in local.values() if verdict['keep']),
+                'rejected': sum(1 for verdict in local.values() if not verdict['keep']),
+                'llm_calls_avoided': len(local) / len(misses) if misses else 0.0
+            },
+            'dispatch': dict(dispatcher.stats),
+            'first_verdict': first_verdict[0] if first_verdict else None
         }
         
         for result in all_results:
@@ -79,22 +261,70 @@ class LLMFilter:
         print(f"  原始数量: {final_stats['total']}")
         print(f"  保留: {final_stats['kept']}")
         print(f"  排除: {final_stats['excluded']}")
+        if failed:
+            print(f"  未得到结论（保留）: {len(failed)}")
+        if final_stats['reasons']:
+            print(f"  排除原因分布:")
+            for reason, count in final_stats['reasons'].items():
+                print(f"    - {reason}: {count}")
+        dispatcher.print_stats()
+        if first_verdict:
+            print(f"⏱️  首条结论耗时: {first_verdict[0]:.1f}秒")
+        self.cache.print_stats()
         
         return all_filtered, final_stats, all_results
     
-    def _filter_batch(self, news_list, offset=0):
-        """处理单批新闻"""
-        # 构造输入数据
+    def iter_kept(self, news_list, **kwargs):
+        """
+        流式筛选：边判断边产出保留的新闻
+        
+        下游（如正文提取）可以在整批判断结束前开始处理。参数同 filter_all。
+        """
+        results = queue.Queue()
+        done = object()
+        errors = []
+        
+        def worker():
+            try:
+                self.filter_all(news_list, stream=True, on_keep=results.put, **kwargs)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                results.put(done)
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+        thread.join()
+        if errors:
+            raise errors[0]
+    
+    def estimate_item_tokens(self, item):
+        """估算一条新闻的 token 数（输入 + 输出）"""
+        _, news = item
+        return (estimate_tokens(news.get('title', '')) + estimate_tokens(news.get('source', ''))
+                + 20 + self.settings['output_tokens_per_item'])
+    
+    def build_user_prompt(self, batch):
+        """
+        构造用户提示词
+        
+        Args:
+            batch: [(下标, 新闻), ...]，id 为下标 + 1
+        """
         input_data = []
-        for i, news in enumerate(news_list):
+        for index, news in batch:
             input_data.append({
-                "id": offset + i + 1,
+                "id": index + 1,
                 "title": news.get('title', ''),
                 "source": news.get('source', '')
             })
         
-        # 构造用户提示词
-        user_prompt = f"""请判断以下新闻列表中每条新闻是否值得保留。
+        return f"""请判断以下新闻列表中每条新闻是否值得保留。
 
 新闻列表：
 {json.dumps(input_data, ensure_ascii=False, indent=2)}
@@ -111,8 +341,86 @@ class LLMFilter:
 2. id必须与输入一致
 3. reason简短说明（5-10字）
 4. 只返回JSON数组，不要其他内容"""
+    
+    def request_verdicts(self, batch):
+        """
+        请求一批新闻的结论（在调度器的工作线程中运行）
+        
+        Args:
+            batch: [(下标, 新闻), ...]
+        
+        Returns:
+            {下标: {'keep': bool, 'reason': str}}；返回被截断时只包含完整输出的条目
+        
+        Raises:
+            LLMAPIError: 网络错误或接口返回非200
+        """
+        response = self._post(batch)
+        
+        try:
+            result_text = response.json()['content'][0]['text']
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMAPIError(None, f"响应格式错误: {e}")
+        
+        return self.parse_verdicts(result_text, batch)
+    
+    def stream_verdicts(self, batch, on_verdict=None):
+        """
+        流式请求一批新闻的结论（SSE），每条结论一生成就回调
+        
+        Args:
+            batch: [(下标, 新闻), ...]
+            on_verdict: 回调 on_verdict(下标, 结论)，在工作线程中调用
+        
+        Returns:
+            {下标: 结论}；流中断时返回已收到的部分，由调度器重新提交缺失的新闻
+        
+        Raises:
+            LLMAPIError: 一条结论都没收到就失败
+        """
+        response = self._post(batch, stream=True)
+        indexes = {index for index, _ in batch}
+        parser = IncrementalArrayParser()
+        verdicts = {}
+        stop_reason = None
         
-        # 调用大模型
+        try:
+            for event, data in iter_sse_events(response.iter_lines()):
+                message = json.loads(data)
+                kind = message.get('type', event)
+                if kind == 'content_block_delta':
+                    delta = message.get('delta', {})
+                    if delta.get('type') != 'text_delta':
+                        continue
+                    for item in parser.feed(delta.get('text', '')):
+                        index, verdict = self._to_verdict(item, indexes)
+                        if index is not None and index not in verdicts:
+                            verdicts[index] = verdict
+                            if on_verdict:
+                                on_verdict(index, verdict)
+                elif kind == 'message_delta':
+                    stop_reason = message.get('delta', {}).get('stop_reason')
+                elif kind == 'error':
+                    error = message.get('error', {})
+                    status = 529 if error.get('type') == 'overloaded_error' else None
+                    raise LLMAPIError(status, error.get('message', '流式响应错误'))
+                elif kind == 'message_stop':
+                    break
+        except (requests.RequestException, ValueError, LLMAPIError) as e:
+            if not verdicts:
+                if isinstance(e, LLMAPIError):
+                    raise
+                raise LLMAPIError(None, f"流式响应中断: {e}")
+            print(f"  ⚠️  流式响应中断（已收到{len(verdicts)}/{len(batch)}条）: {e}")
+        finally:
+            response.close()
+        
+        if stop_reason == 'max_tokens' and len(verdicts) < len(batch):
+            print(f"  ⚠️  输出达到上限，已收到{len(verdicts)}/{len(batch)}条")
+        return verdicts
+    
+    def _post(self, batch, stream=False):
+        """发送请求，非200时抛出 LLMAPIError"""
         headers = {
             "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01",
@@ -121,66 +429,59 @@ class LLMFilter:
         
         payload = {
             "model": self.model,
-            "max_tokens": 8192,
+            "max_tokens": self.settings['max_tokens'],
             "system": self.system_prompt,
-            "messages": [{"role": "user", "content": user_prompt}]
+            "messages": [{"role": "user", "content": self.build_user_prompt(batch)}]
         }
+        if stream:
+            payload["stream"] = True
         
-        response = requests.post(self.api_url, headers=headers, json=payload, timeout=180)
+        try:
+            response = requests.post(self.api_url, headers=headers, json=payload,
+                                     timeout=self.settings['timeout'], stream=stream)
+        except requests.RequestException as e:
+            raise LLMAPIError(None, str(e))
         
         if response.status_code != 200:
-            print(f"API调用失败: {response.status_code}")
-            print(f"错误信息: {response.text}")
-            return news_list, {}, []
-        
-        result = response.json()
-        result_text = result['content'][0]['text']
+            retry_after = response.headers.get('retry-after')
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            message = response.text[:200]
+            response.close()
+            raise LLMAPIError(response.status_code, message, retry_after)
         
-        # 解析结果
-        return self.parse_result(result_text, news_list)
+        return response
     
-    def parse_result(self, result_text, news_list):
-        """解析大模型返回的结果"""
+    def _to_verdict(self, item, indexes):
+        """把一条返回结果转换为 (下标, 结论)，id 不在本批内时返回 (None, None)"""
         try:
-            # 提取JSON数组
-            result_text = result_text.strip()
-            if result_text.startswith('```'):
-                # 移除markdown代码块标记
-                lines = result_text.split('\n')
-                result_text = '\n'.join(lines[1:-1])
-            
-            results = json.loads(result_text)
-            
-            # 统计
-            filtered = []
-            stats = {
-                'total': len(news_list),
-                'kept': 0,
-                'excluded': 0,
-                'reasons': {}
-            }
-            
-            for result in results:
-                idx = result['id'] - 1
-                if result['keep']:
-                    filtered.append(news_list[idx])
-                    stats['kept'] += 1
-                else:
-                    stats['excluded'] += 1
-                    reason = result['reason']
-                    stats['reasons'][reason] = stats['reasons'].get(reason, 0) + 1
-            
-            print(f"\n大模型筛选结果:")
-            print(f"  原始数量: {stats['total']}")
-            print(f"  保留: {stats['kept']}")
-            print(f"  排除: {stats['excluded']}")
-            print(f"  排除原因分布:")
-            for reason, count in stats['reasons'].items():
-                print(f"    - {reason}: {count}")
-            
-            return filtered, stats, results
-            
-        except Exception as e:
-            print(f"解析结果失败: {e}")
-            print(f"原始返回: {result_text[:500]}")
-            return news_list, {}, []
+            index = int(item['id']) - 1
+            keep = item['keep']
+        except (KeyError, TypeError, ValueError):
+            return None, None
+        if index not in indexes:
+            return None, None
+        return index, {'keep': bool(keep), 'reason': item.get('reason', '')}
+    
+    def parse_verdicts(self, result_text, batch):
+        """
+        解析大模型返回的结果（截断的JSON数组只取完整的条目）
+        
+        Returns:
+            {下标: {'keep': bool, 'reason': str}}
+        """
+        results, complete = salvage_json_array(result_text)
+        if not complete:
+            print(f"  ⚠️  返回结果不完整，抢救出{len(results)}/{len(batch)}条")
+            if not results:
+                print(f"  原始返回: {result_text[:500]}")
+        
+        indexes = {index for index, _ in batch}
+        verdicts = {}
+        for result in results:
+            index, verdict = self._to_verdict(result, indexes)
+            if index is not None:
+                verdicts[index] = verdict
+        return verdicts
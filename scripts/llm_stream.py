@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型流式响应解析 - SSE 事件 + 增量 JSON 数组解析
+
+messages API 开启 stream 后按 SSE 逐段返回文本。IncrementalArrayParser 边接收边扫描，
+数组中的每个对象（如 {"id": 3, "keep": true, "reason": "..."}）一闭合就返回，
+不必等整批生成完再 json.loads，下游可以提前开始处理已判断保留的新闻。
+"""
+
+import json
+
+
+def iter_sse_events(lines):
+    """
+    解析 SSE 流
+    
+    Args:
+        lines: 逐行迭代器（bytes 或 str，如 response.iter_lines()）
+    
+    Yields:
+        (事件名, data 文本)
+    """
+    event = None
+    data = []
+    for line in lines:
+        if line is None:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line:
+            # 空行表示一个事件结束
+            if data:
+                yield event, '\n'.join(data)
+            event = None
+            data = []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event = value
+        elif field == 'data':
+            data.append(value)
+    if data:
+        yield event, '\n'.join(data)
+
+
+class IncrementalArrayParser:
+    """增量解析 JSON 数组：每个元素一闭合就返回"""
+    
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0              # 下一个待扫描字符
+        self.started = False      # 是否已遇到数组的 '['
+        self.finished = False     # 是否已遇到数组的 ']'
+        self.depth = 0            # 元素内部的括号深度
+        self.in_string = False
+        self.escape = False
+        self.item_start = None    # 当前元素在 buffer 中的起点
+    
+    def feed(self, chunk):
+        """
+        追加一段文本
+        
+        Returns:
+            本段文本中闭合的元素列表（解析失败的元素被跳过）
+        """
+        if self.finished:
+            return []
+        self.buffer += chunk
+        buffer = self.buffer
+        items = []
+        i = self.pos
+        while i < len(buffer):
+            char = buffer[i]
+            if not self.started:
+                # 跳过 markdown 代码块标记等前缀
+                if char == '[':
+                    self.started = True
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                if self.depth == 0:
+                    self.item_start = i
+                self.depth += 1
+            elif char in '}]':
+                if self.depth == 0:
+                    self.finished = True
+                    break
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        items.append(json.loads(buffer[self.item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self.item_start = None
+            i += 1
+        
+        # 丢弃已处理完的文本，只保留未闭合的元素
+        keep_from = self.item_start if self.item_start is not None else i
+        self.buffer = buffer[keep_from:]
+        self.pos = i - keep_from
+        if self.item_start is not None:
+            self.item_start = 0
+        return items
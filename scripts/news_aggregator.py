@@ -7,11 +7,155 @@
 import json
 import os
 import subprocess
+import time
 from datetime import datetime
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from content_extractor import NewsContentExtractor
+from crawl_orchestrator import (CrawlOrchestrator, GoogleNewsPlugin, NewspaperPlugin, UniversalPlugin,
+                                MultiSectorGooglePlugin, MultiSectorNewspaperPlugin, MultiSectorUniversalPlugin)
 from deduplicator import NewsDeduplicator
+from http_client import get_http_client
+from render_probe import get_render_memory
+from listing_templates import get_template_store
+from seen_index import SeenStoryIndex
+
+# Google 新闻检索关键词（扩充版检索策略）
+GOOGLE_NEWS_KEYWORDS = {
+    'healthcare': [
+        # 核心产业词（6个）
+        "医药产业 发展",
+        "生物医药 创新",
+        "医疗健康 政策",
+        "医保 改革",
+        "中医药 产业",
+        "医疗器械 创新",
+        # 政策改革词（5个）
+        "药监 改革",
+        "健康产业 建设",
+        "医疗保障 体系",
+        "卫生健康 事业",
+        "医改 政策",
+        # 创新技术词（5个）
+        "医养结合",
+        "互联网医疗",
+        "智慧医疗",
+        "医疗AI",
+        "数字健康",
+        # 地域产业词（4个）
+        "医药产业 北京",
+        "生物医药 上海",
+        "医疗健康 江苏",
+        "医药产业 广东"
+    ],
+    'strategic_emerging': [
+        # 核心产业词（6个）
+        "战略新兴产业 发展",
+        "新能源 产业",
+        "光伏产业 发展",
+        "风电 产业",
+        "新能源汽车 产业",
+        "储能 技术",
+        # 高端制造词（5个）
+        "半导体 产业",
+        "芯片 制造",
+        "新材料 产业",
+        "高端装备 制造",
+        "智能制造 发展",
+        # 创新技术词（5个）
+        "人工智能 产业",
+        "大数据 产业",
+        "云计算 发展",
+        "物联网 应用",
+        "区块链 技术",
+        # 生物医药词（4个）
+        "生物医药 创新",
+        "创新药 研发",
+        "医疗器械 产业",
+        "基因技术 应用"
+    ],
+    'hightech': [
+        # 核心科技词（6个）
+        "高科技产业 发展",
+        "人工智能 技术",
+        "芯片 技术",
+        "半导体 技术",
+        "集成电路 产业",
+        "5G 技术",
+        # 前沿技术词（5个）
+        "量子计算 研究",
+        "量子通信 技术",
+        "6G 研发",
+        "先进制造 技术",
+        "工业机器人 应用",
+        # 数字经济词（5个）
+        "云计算 技术",
+        "大数据 应用",
+        "物联网 技术",
+        "工业互联网 平台",
+        "数字化转型",
+        # 政策支持词（4个）
+        "科技创新 政策",
+        "高新技术 支持",
+        "科技产业 投资",
+        "技术突破 成果"
+    ],
+    'education': [
+        # 核心人才词（6个）
+        "人才政策 发展",
+        "教育改革 创新",
+        "人才培养 产业",
+        "职业教育 发展",
+        "高校 人才",
+        "技能人才 培养",
+        # 引进支持词（5个）
+        "科技人才 引进",
+        "青年人才 政策",
+        "人才引进 支持",
+        "高层次人才",
+        "人才战略",
+        # 教育创新词（5个）
+        "人工智能 教育",
+        "数字人才 培养",
+        "产教融合",
+        "校企合作",
+        "双一流 建设",
+        # 地域人才词（4个）
+        "人才政策 北京",
+        "人才引进 上海",
+        "人才培养 江苏",
+        "人才政策 广东"
+    ]
+}
+
+# 通用爬虫信源
+UNIVERSAL_SOURCES = {
+    'healthcare': [
+        {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
+        {'name': '人民网财经', 'url': 'https://finance.people.com.cn/GB/70846/index.html'},
+        {'name': '中国财经医药', 'url': 'https://finance.china.com.cn/industry/medicine/live.shtml'},
+        {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'}
+    ],
+    'strategic_emerging': [
+        {'name': '人民网财经', 'url': 'https://finance.people.com.cn/GB/70846/index.html'},
+        {'name': '新华网财经', 'url': 'http://www.xinhuanet.com/fortune/'},
+        {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
+        {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'},
+        {'name': '东方财富网', 'url': 'https://finance.eastmoney.com/'}
+    ],
+    'hightech': [
+        {'name': '人民网科技', 'url': 'http://scitech.people.com.cn/'},
+        {'name': '新华网科技', 'url': 'http://www.xinhuanet.com/tech/'},
+        {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'},
+        {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
+        {'name': '东方财富网', 'url': 'https://finance.eastmoney.com/'}
+    ],
+    'education': [
+        {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
+        {'name': '中国西藏网', 'url': 'http://www.tibet.cn/cn/Instant/'},
+        {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'}
+    ]
+}
 
 class NewsAggregator:
     """统一新闻聚合器"""
@@ -34,114 +178,7 @@ class NewsAggregator:
         print("1. 运行 Google 新闻爬虫")
         print("="*60)
         
-        if self.sector == 'healthcare':
-            keywords = [
-                # 核心产业词（6个）
-                "医药产业 发展",
-                "生物医药 创新",
-                "医疗健康 政策",
-                "医保 改革",
-                "中医药 产业",
-                "医疗器械 创新",
-                # 政策改革词（5个）
-                "药监 改革",
-                "健康产业 建设",
-                "医疗保障 体系",
-                "卫生健康 事业",
-                "医改 政策",
-                # 创新技术词（5个）
-                "医养结合",
-                "互联网医疗",
-                "智慧医疗",
-                "医疗AI",
-                "数字健康",
-                # 地域产业词（4个）
-                "医药产业 北京",
-                "生物医药 上海",
-                "医疗健康 江苏",
-                "医药产业 广东"
-            ]
-        elif self.sector == 'strategic_emerging':
-            keywords = [
-                # 核心产业词（6个）
-                "战略新兴产业 发展",
-                "新能源 产业",
-                "光伏产业 发展",
-                "风电 产业",
-                "新能源汽车 产业",
-                "储能 技术",
-                # 高端制造词（5个）
-                "半导体 产业",
-                "芯片 制造",
-                "新材料 产业",
-                "高端装备 制造",
-                "智能制造 发展",
-                # 创新技术词（5个）
-                "人工智能 产业",
-                "大数据 产业",
-                "云计算 发展",
-                "物联网 应用",
-                "区块链 技术",
-                # 生物医药词（4个）
-                "生物医药 创新",
-                "创新药 研发",
-                "医疗器械 产业",
-                "基因技术 应用"
-            ]
-        elif self.sector == 'hightech':
-            keywords = [
-                # 核心科技词（6个）
-                "高科技产业 发展",
-                "人工智能 技术",
-                "芯片 技术",
-                "半导体 技术",
-                "集成电路 产业",
-                "5G 技术",
-                # 前沿技术词（5个）
-                "量子计算 研究",
-                "量子通信 技术",
-                "6G 研发",
-                "先进制造 技术",
-                "工业机器人 应用",
-                # 数字经济词（5个）
-                "云计算 技术",
-                "大数据 应用",
-                "物联网 技术",
-                "工业互联网 平台",
-                "数字化转型",
-                # 政策支持词（4个）
-                "科技创新 政策",
-                "高新技术 支持",
-                "科技产业 投资",
-                "技术突破 成果"
-            ]
-        else:  # education
-            keywords = [
-                # 核心人才词（6个）
-                "人才政策 发展",
-                "教育改革 创新",
-                "人才培养 产业",
-                "职业教育 发展",
-                "高校 人才",
-                "技能人才 培养",
-                # 引进支持词（5个）
-                "科技人才 引进",
-                "青年人才 政策",
-                "人才引进 支持",
-                "高层次人才",
-                "人才战略",
-                # 教育创新词（5个）
-                "人工智能 教育",
-                "数字人才 培养",
-                "产教融合",
-                "校企合作",
-                "双一流 建设",
-                # 地域人才词（4个）
-                "人才政策 北京",
-                "人才引进 上海",
-                "人才培养 江苏",
-                "人才政策 广东"
-            ]
+        keywords = GOOGLE_NEWS_KEYWORDS.get(self.sector, GOOGLE_NEWS_KEYWORDS['education'])
         
         cmd = [
             'python3', 'google_news_crawler.py',
@@ -176,36 +213,7 @@ class NewsAggregator:
         print("3. 运行通用新闻爬虫")
         print("="*60)
         
-        # 医疗健康板块的信源
-        if self.sector == 'healthcare':
-            sources = [
-                {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
-                {'name': '人民网财经', 'url': 'https://finance.people.com.cn/GB/70846/index.html'},
-                {'name': '中国财经医药', 'url': 'https://finance.china.com.cn/industry/medicine/live.shtml'},
-                {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'}
-            ]
-        elif self.sector == 'strategic_emerging':
-            sources = [
-                {'name': '人民网财经', 'url': 'https://finance.people.com.cn/GB/70846/index.html'},
-                {'name': '新华网财经', 'url': 'http://www.xinhuanet.com/fortune/'},
-                {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
-                {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'},
-                {'name': '东方财富网', 'url': 'https://finance.eastmoney.com/'}
-            ]
-        elif self.sector == 'hightech':
-            sources = [
-                {'name': '人民网科技', 'url': 'http://scitech.people.com.cn/'},
-                {'name': '新华网科技', 'url': 'http://www.xinhuanet.com/tech/'},
-                {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'},
-                {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
-                {'name': '东方财富网', 'url': 'https://finance.eastmoney.com/'}
-            ]
-        else:  # education
-            sources = [
-                {'name': '中国经济网', 'url': 'http://www.ce.cn/cysc/newmain/yc/jsxw/'},
-                {'name': '中国西藏网', 'url': 'http://www.tibet.cn/cn/Instant/'},
-                {'name': '中国科技网', 'url': 'https://www.stdaily.com/web/gdxw/node_324_2.html'}
-            ]
+        sources = UNIVERSAL_SOURCES.get(self.sector, UNIVERSAL_SOURCES['education'])
         
         # 使用通用爬虫爬取每个信源
         for source in sources:
@@ -268,6 +276,33 @@ class NewsAggregator:
         
         print(f"\n并行任务完成: {sum(results.values())}/{len(results)} 成功")
     
+    def run_all_crawlers_in_process(self):
+        """在当前进程内异步并发运行所有爬虫（共享HTTP会话，结果直接在内存中合并）"""
+        print("\n" + "="*60)
+        print("进程内异步新闻聚合")
+        print("="*60)
+        
+        session = get_http_client()
+        timeouts = self.config.get('crawler_settings', {}).get('plugin_timeouts', {})
+        plugins = [
+            GoogleNewsPlugin(self.sector, self.hours, session, timeouts.get('google'),
+                             keywords=GOOGLE_NEWS_KEYWORDS.get(self.sector, GOOGLE_NEWS_KEYWORDS['education'])),
+            UniversalPlugin(self.sector, self.hours, session, timeouts.get('universal'),
+                            sources=UNIVERSAL_SOURCES.get(self.sector, UNIVERSAL_SOURCES['education'])),
+            NewspaperPlugin(self.sector, self.hours, session, timeouts.get('newspaper'))
+        ]
+        
+        orchestrator = CrawlOrchestrator(plugins)
+        self.all_news = orchestrator.run()
+        
+        orchestrator.print_report()
+        session.print_stats()
+        get_render_memory().print_stats()
+        get_template_store().print_stats()
+        succeeded = sum(1 for item in orchestrator.report if item['status'] == '完成')
+        print(f"\n并行任务完成: {succeeded}/{len(plugins)} 成功")
+        print(f"📊 内存中合并: {len(self.all_news)} 条新闻")
+    
     def load_all_news(self):
         """加载所有爬取的新闻"""
         print("\n" + "="*60)
@@ -304,6 +339,9 @@ class NewsAggregator:
         print("5. 去重和排序")
         print("="*60)
         
+        # 跨天去重：丢弃以前运行中已经处理过的新闻（URL + 标题指纹）
+        self.all_news = SeenStoryIndex(self.sector).filter_new(self.all_news)
+        
         # 使用智能去重器（相似度阈值80%）
         deduplicator = NewsDeduplicator(similarity_threshold=0.8)
         self.all_news = deduplicator.deduplicate(self.all_news)
@@ -332,48 +370,179 @@ class NewsAggregator:
         for i, news in enumerate(self.all_news[:10], 1):
             print(f"{i}. {news.get('title', '无标题')}")
     
-    def run(self, parallel=True):
-        """运行完整流程"""
+    def run(self, parallel=True, in_process=True):
+        """
+        运行完整流程
+        
+        Args:
+            parallel: 是否并行运行爬虫
+            in_process: 并行时是否在当前进程内运行（否则为每个爬虫启动子进程）
+        """
         print("\n" + "🚀"*30)
         print(f"开始新闻聚合 - {self.config['sectors'][self.sector]['name']}")
         print(f"时间范围: 最近 {self.hours} 小时")
         print("🚀"*30)
         
-        if parallel:
-            # 并行执行所有爬虫
-            self.run_all_crawlers_parallel()
-        else:
-            # 顺序执行（保留旧版本）
-            self.run_google_news_crawler()
-            self.run_rolling_news_crawler()
-            self.run_newspaper_crawler()
+        stage_times = []
+        start = time.perf_counter()
         
-        # 加载所有新闻
-        self.load_all_news()
+        if parallel and in_process:
+            # 进程内异步执行所有爬虫，结果直接在内存中传递
+            self.run_all_crawlers_in_process()
+            stage_times.append(('爬虫（进程内）', time.perf_counter() - start))
+        else:
+            if parallel:
+                # 并行执行所有爬虫（子进程）
+                self.run_all_crawlers_parallel()
+            else:
+                # 顺序执行（保留旧版本）
+                self.run_google_news_crawler()
+                self.run_rolling_news_crawler()
+                self.run_newspaper_crawler()
+            stage_times.append(('爬虫（子进程）', time.perf_counter() - start))
+            
+            # 加载所有新闻
+            start = time.perf_counter()
+            self.load_all_news()
+            stage_times.append(('加载数据文件', time.perf_counter() - start))
         
         # 去重和排序
+        start = time.perf_counter()
         self.deduplicate_and_sort()
+        stage_times.append(('去重排序', time.perf_counter() - start))
         
         # 保存聚合结果（不提取内容）
+        start = time.perf_counter()
         self.save_aggregated_results()
+        stage_times.append(('保存结果', time.perf_counter() - start))
+        
+        print("\n⏱️  各阶段耗时：")
+        for stage, elapsed in stage_times:
+            print(f"  {stage}: {elapsed:.1f}秒")
+        print(f"  总计: {sum(elapsed for _, elapsed in stage_times):.1f}秒")
         
         print("\n" + "✅"*30)
         print("新闻聚合完成！")
         print("✅"*30)
 
+class MultiSectorAggregator:
+    """
+    多板块聚合器 - 一次运行处理多个板块
+    
+    所有板块的 Google 检索词、通用爬虫列表页和 Newspaper4k 新闻源合并去重后
+    每个只抓取一次，结果再分发给需要它的板块（列表页新闻按各板块关键词过滤），
+    最后每个板块单独去重并保存聚合结果，输出与逐个板块运行一致。
+    抓取由 CrawlOrchestrator 的多板块插件完成（每个插件独立超时、可取消、输出分阶段耗时）。
+    """
+    
+    def __init__(self, sectors, hours=24, pages=5):
+        self.sectors = list(dict.fromkeys(sectors))
+        self.hours = hours
+        self.pages = pages
+        self.fetch_stats = {}
+        self.sector_news = {sector: [] for sector in self.sectors}
+        
+        # 加载配置
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        config_path = os.path.join(script_dir, '../references/config.json')
+        with open(config_path, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+    
+    def _record_fetches(self, name, owners):
+        """记录去重前后的抓取次数"""
+        self.fetch_stats[name] = {
+            'unique': len(owners),
+            'per_sector': sum(len(sectors) for sectors in owners.values())
+        }
+    
+    def build_plugins(self, session):
+        """创建多板块爬虫插件"""
+        timeouts = self.config.get('crawler_settings', {}).get('plugin_timeouts', {})
+        return [
+            MultiSectorGooglePlugin(self.sectors, self.hours, session, timeouts.get('google'), keywords={
+                sector: GOOGLE_NEWS_KEYWORDS.get(sector, GOOGLE_NEWS_KEYWORDS['education'])
+                for sector in self.sectors
+            }),
+            MultiSectorUniversalPlugin(self.sectors, self.hours, session, timeouts.get('universal'), sources={
+                sector: UNIVERSAL_SOURCES.get(sector, UNIVERSAL_SOURCES['education'])
+                for sector in self.sectors
+            }, pages=self.pages),
+            MultiSectorNewspaperPlugin(self.sectors, self.hours, session, timeouts.get('newspaper'))
+        ]
+    
+    def print_fetch_summary(self):
+        """打印共享抓取节省的次数"""
+        print("\n" + "="*60)
+        print("📉 跨板块共享抓取")
+        print("="*60)
+        total_saved = 0
+        for name, item in self.fetch_stats.items():
+            saved = item['per_sector'] - item['unique']
+            total_saved += saved
+            print(f"  {name}: 实际抓取 {item['unique']} 个（逐板块运行需 {item['per_sector']} 个），节省 {saved} 次")
+        print(f"  合计节省: {total_saved} 次抓取")
+    
+    def run(self):
+        """运行多板块聚合"""
+        print("\n" + "🚀"*30)
+        print(f"开始多板块新闻聚合: {', '.join(self.sectors)}")
+        print(f"时间范围: 最近 {self.hours} 小时")
+        print("🚀"*30)
+        
+        session = get_http_client()
+        plugins = self.build_plugins(session)
+        orchestrator = CrawlOrchestrator(plugins)
+        for sector, news in orchestrator.run():
+            self.sector_news[sector].append(news)
+        orchestrator.print_report()
+        
+        labels = ('Google检索词', '通用爬虫列表页', 'Newspaper4k新闻源')
+        for label, plugin in zip(labels, plugins):
+            self._record_fetches(label, plugin.owners)
+        succeeded = sum(1 for item in orchestrator.report if item['status'] == '完成')
+        print(f"\n并行任务完成: {succeeded}/{len(plugins)} 成功")
+        
+        # 每个板块单独去重并保存
+        for sector in self.sectors:
+            print("\n" + "#"*60)
+            print(f"板块: {sector}")
+            print("#"*60)
+            aggregator = NewsAggregator(sector, self.hours)
+            aggregator.all_news = self.sector_news[sector]
+            aggregator.deduplicate_and_sort()
+            aggregator.save_aggregated_results()
+        
+        self.print_fetch_summary()
+        session.print_stats()
+        get_render_memory().print_stats()
+        get_template_store().print_stats()
+        
+        print("\n" + "✅"*30)
+        print("多板块新闻聚合完成！")
+        print("✅"*30)
+
 if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='统一新闻聚合器')
-    parser.add_argument('--sector', required=True, 
-                        choices=['healthcare', 'education', 'strategic_emerging', 'hightech'], 
-                        help='板块: healthcare, education, strategic_emerging 或 hightech')
+    sector_group = parser.add_mutually_exclusive_group(required=True)
+    sector_group.add_argument('--sector', 
+                              choices=['healthcare', 'education', 'strategic_emerging', 'hightech'], 
+                              help='板块: healthcare, education, strategic_emerging 或 hightech')
+    sector_group.add_argument('--sectors', nargs='+',
+                              choices=['healthcare', 'education', 'strategic_emerging', 'hightech'],
+                              help='多板块模式：一次运行处理多个板块，相同检索词和网页只抓取一次')
     parser.add_argument('--hours', type=int, default=24, help='时间范围（小时）')
+    parser.add_argument('--subprocess', action='store_true',
+                        help='为每个爬虫启动子进程（旧版方式）')
     
     args = parser.parse_args()
     
-    aggregator = NewsAggregator(args.sector, args.hours)
-    aggregator.run()
+    if args.sectors:
+        MultiSectorAggregator(args.sectors, args.hours).run()
+    else:
+        aggregator = NewsAggregator(args.sector, args.hours)
+        aggregator.run(in_process=not args.subprocess)
 
 
 
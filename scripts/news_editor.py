@@ -8,14 +8,46 @@
 import argparse
 import json
 import os
-from anthropic import Anthropic
+from anthropic import Anthropic, APIConnectionError, APIStatusError
+
+from edit_cache import EditCache
+from llm_dispatcher import LLMAPIError, LLMDispatcher, estimate_tokens, pack_batches, salvage_json_array
+
+# 批量编辑默认值，可在 references/config.json 的 ai_settings.editor 中覆盖
+DEFAULT_EDITOR_SETTINGS = {
+    'batched': True,
+    'workers': 4,
+    'requests_per_second': 1.0,
+    'token_budget': 12000,
+    'max_batch_items': 10,
+    'max_tokens': 8192,
+    'output_tokens_per_item': 300,
+    'content_chars': 1000,
+    'max_retries': 4,
+    'backoff': 2.0,
+    'salvage_rounds': 2,
+    'timeout': 180
+}
+
+# 批量编辑的系统提示词（其哈希是编辑缓存的提示词版本，修改后旧结果自动失效）
+BATCH_SYSTEM_PROMPT = """你是新闻编辑，负责对新闻列表逐条进行编辑：
+1. 重写标题：去除渲染性词汇，改为准确、简练的陈述性标题
+2. 提取关键词：3-5个专有名词，不使用短语
+3. 生成摘要：保留核心信息，删除冗余和宣传性内容
+
+正文只给出开头部分，摘要以标题和正文开头为依据，不要编造原文没有的信息。"""
 
 class NewsEditor:
-    def __init__(self, input_file):
+    def __init__(self, input_file, use_cache=True):
         self.input_file = input_file
         self.config = self.load_config()
         self.client = Anthropic()
-        
+        self.settings = dict(DEFAULT_EDITOR_SETTINGS)
+        self.settings.update(self.config.get('ai_settings', {}).get('editor', {}))
+        self.model = self.config['ai_settings']['model']
+        self.cache = EditCache(self.model, BATCH_SYSTEM_PROMPT, enabled=False if not use_cache else None,
+                               prompt_settings={'content_chars': self.settings['content_chars']})
+    
     def load_config(self):
         """加载配置"""
         config_path = os.path.join(os.path.dirname(__file__), '../references/config.json')
@@ -52,38 +84,223 @@ class NewsEditor:
             
             result = json.loads(response.content[0].text)
             return result
-            
+        
         except Exception as e:
             print(f"✗ 编辑失败: {e}")
             return None
     
-    def process_all(self):
-        """处理所有新闻"""
+    def process_all(self, batched=None, checkpoint_path=None):
+        """
+        处理所有新闻
+        
+        Args:
+            batched: 是否批量并发编辑（默认 ai_settings.editor.batched），False 时逐条串行
+            checkpoint_path: 断点文件路径（仅批量模式），中断后重跑从断点继续
+        """
         with open(self.input_file, 'r', encoding='utf-8') as f:
             news_list = json.load(f)
         
+        if batched is None:
+            batched = self.settings['batched']
+        if batched:
+            return self.process_batched(news_list, checkpoint_path)
+        
         edited_list = []
         for i, news in enumerate(news_list, 1):
             print(f"处理中 {i}/{len(news_list)}...")
             edited = self.edit_news(news)
             if edited:
-                edited['source'] = news.get('source', '')
-                edited['url'] = news.get('url', '')
-                edited['date'] = news.get('date', '')
-                edited_list.append(edited)
+                edited_list.append(self._merge(news, edited))
         
         return edited_list
+    
+    def process_batched(self, news_list, checkpoint_path=None):
+        """
+        批量并发编辑：多条新闻打包成一次请求，按 token 预算分批，并发 + 限速 + 重试
+        
+        已编辑的结果先从断点文件和编辑缓存中取，只为剩下的新闻调用大模型；
+        每批完成后立即写入缓存和断点文件。
+        """
+        edits = {}
+        # 断点与编辑缓存使用同一个键（原文内容哈希 + 模型 + 提示词版本），
+        # 换模型或修改提示词/content_chars 后断点里的旧结果不再复用
+        checkpoint = self.load_checkpoint(checkpoint_path)
+        keys = [self.cache.make_key(news) for news in news_list]
+        for i, key in enumerate(keys):
+            if key in checkpoint:
+                edits[i] = checkpoint[key]
+        if edits:
+            print(f"⏯️  从断点恢复 {len(edits)} 条")
+        
+        remaining = [i for i in range(len(news_list)) if i not in edits]
+        self.cache.reset_stats()
+        cached = self.cache.lookup([news_list[i] for i in remaining])
+        for position, edit in cached.items():
+            edits[remaining[position]] = edit
+        
+        pending = [(i, news_list[i]) for i in range(len(news_list)) if i not in edits]
+        overhead = estimate_tokens(BATCH_SYSTEM_PROMPT) + 200
+        batches = pack_batches(pending, self.settings['token_budget'],
+                               self.settings['max_batch_items'], self.estimate_item_tokens, overhead)
+        print(f"📝 共 {len(news_list)} 条，已有结果 {len(edits)} 条，"
+              f"待编辑 {len(pending)} 条（{len(batches)} 批）")
+        
+        def on_edits(new_edits):
+            edits.update(new_edits)
+            self.cache.store([(news_list[i], edit) for i, edit in new_edits.items()])
+            for i, edit in new_edits.items():
+                checkpoint[keys[i]] = edit
+            self.save_checkpoint(checkpoint_path, checkpoint)
+            print(f"处理中 {len(edits)}/{len(news_list)}...")
+        
+        dispatcher = LLMDispatcher(
+            self.request_edits,
+            workers=self.settings['workers'],
+            rate=self.settings['requests_per_second'],
+            max_retries=self.settings['max_retries'],
+            backoff=self.settings['backoff'],
+            salvage_rounds=self.settings['salvage_rounds']
+        )
+        _, failed = dispatcher.run(batches, on_edits)
+        
+        self.cache.print_stats()
+        dispatcher.print_stats()
+        if failed:
+            print(f"⚠️  {len(failed)} 条编辑失败，断点已保留，重跑时只处理失败的新闻")
+        elif checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        
+        return [self._merge(news, edits[i]) for i, news in enumerate(news_list) if i in edits]
+    
+    def _merge(self, news, edited):
+        """编辑结果附上原新闻的来源、链接和日期"""
+        edited = dict(edited)
+        edited['source'] = news.get('source', '')
+        edited['url'] = news.get('url', '')
+        edited['date'] = news.get('date', '')
+        return edited
+    
+    def estimate_item_tokens(self, item):
+        """估算一条新闻的 token 数（输入 + 输出）"""
+        _, news = item
+        content = (news.get('content') or '')[:self.settings['content_chars']]
+        return (estimate_tokens(news.get('title', '')) + estimate_tokens(content)
+                + 20 + self.settings['output_tokens_per_item'])
+    
+    def build_batch_prompt(self, batch):
+        """
+        构造批量编辑的用户提示词（正文只取开头 content_chars 个字符）
+        
+        Args:
+            batch: [(下标, 新闻), ...]，id 为下标 + 1
+        """
+        input_data = []
+        for index, news in batch:
+            input_data.append({
+                "id": index + 1,
+                "title": news.get('title', ''),
+                "content": (news.get('content') or '')[:self.settings['content_chars']]
+            })
+        
+        return f"""请编辑以下新闻列表中的每条新闻。
+
+新闻列表：
+{json.dumps(input_data, ensure_ascii=False, indent=2)}
+
+请返回JSON数组，格式如下：
+[
+  {{"id": 1, "title": "重写后的标题", "keywords": ["关键词1", "关键词2", "关键词3"], "summary": "摘要内容"}},
+  ...
+]
+
+要求：
+1. 必须返回所有新闻的编辑结果
+2. id必须与输入一致
+3. 只返回JSON数组，不要其他内容"""
+    
+    def request_edits(self, batch):
+        """
+        请求一批新闻的编辑结果（在调度器的工作线程中运行）
+        
+        Returns:
+            {下标: {'title', 'keywords', 'summary'}}；返回被截断时只包含完整输出的条目
+        
+        Raises:
+            LLMAPIError: 网络错误或接口返回错误
+        """
+        client = self.client.with_options(max_retries=0, timeout=self.settings['timeout'])
+        try:
+            response = client.messages.create(
+                model=self.model,
+                max_tokens=self.settings['max_tokens'],
+                system=BATCH_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": self.build_batch_prompt(batch)}]
+            )
+        except APIStatusError as e:
+            retry_after = e.response.headers.get('retry-after')
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise LLMAPIError(e.status_code, str(e)[:200], retry_after)
+        except APIConnectionError as e:
+            raise LLMAPIError(None, str(e))
+        
+        result_text = response.content[0].text if response.content else ''
+        results, complete = salvage_json_array(result_text)
+        if not complete:
+            print(f"  ⚠️  返回结果不完整，抢救出{len(results)}/{len(batch)}条")
+        
+        indexes = {index for index, _ in batch}
+        edits = {}
+        for result in results:
+            try:
+                index = int(result['id']) - 1
+                edit = {
+                    'title': str(result['title']).strip(),
+                    'keywords': [str(keyword) for keyword in result['keywords']],
+                    'summary': str(result['summary']).strip()
+                }
+            except (KeyError, TypeError, ValueError):
+                continue
+            if index in indexes and edit['title']:
+                edits[index] = edit
+        return edits
+    
+    def load_checkpoint(self, checkpoint_path):
+        """读取断点文件：{编辑缓存键: 编辑结果}"""
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return {}
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  断点文件无法读取，从头开始: {e}")
+            return {}
+    
+    def save_checkpoint(self, checkpoint_path, checkpoint):
+        """写入断点文件（先写临时文件再替换，中途崩溃不会损坏）"""
+        if not checkpoint_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+        tmp_path = checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, checkpoint_path)
 
 def main():
     parser = argparse.ArgumentParser(description='新闻编辑器')
     parser.add_argument('--input', required=True, help='输入文件路径')
+    parser.add_argument('--serial', action='store_true', help='逐条串行编辑（不打包、不缓存）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用编辑缓存')
     args = parser.parse_args()
     
-    editor = NewsEditor(args.input)
-    results = editor.process_all()
+    output_file = args.input.replace('raw', 'edited')
+    editor = NewsEditor(args.input, use_cache=not args.no_cache)
+    results = editor.process_all(batched=False if args.serial else None,
+                                 checkpoint_path=output_file + '.checkpoint')
     
     # 保存结果
-    output_file = args.input.replace('raw', 'edited')
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻处理流水线 - 声明式阶段 + 正文延迟提取
+
+以前在聚合阶段就为 700+ 条新闻提取正文（5-10分钟），其中大部分随后被筛掉
+（见 docs/ASYNC_OPTIMIZATION_PLAN.md）。这里把整个流程定义为有序的阶段：
+
+    crawl → dedup → keyword → quality → extract → llm
+
+- 新闻进入流水线时包装为 LazyNewsItem，content / actual_url / has_content
+  只有在某个阶段真正读取时才解码链接、下载提取正文
+- 阶段声明是否需要正文（reads_content）；不需要正文的阶段读取时看到的是未提取状态，
+  不会触发下载（例如质量筛选的“内容过短”检查只对已有正文的新闻生效，与以前一致）
+- extract 阶段对到达该阶段的新闻批量预取正文（下载线程 + 提取进程池）；阶段顺序可在配置 pipeline.stages 中调整
+- 运行报告给出每个阶段的进出条数、耗时、正文提取次数和避免的提取次数
+
+用法:
+    python3 news_pipeline.py --sector healthcare
+    python3 news_pipeline.py --sector healthcare --input ../data/raw/healthcare_aggregated_20260211.json
+    python3 news_pipeline.py --sector education --stages crawl dedup keyword quality llm
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_STAGES = ['crawl', 'dedup', 'keyword', 'quality', 'extract', 'llm']
+
+
+def load_pipeline_settings():
+    """读取 pipeline 配置"""
+    settings = {
+        'stages': list(DEFAULT_STAGES),
+        'extract_workers': 10
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('pipeline', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+class ContentFetcher:
+    """正文提取器的共享状态：是否允许提取、提取统计"""
+    
+    def __init__(self, extractor=None):
+        self._extractor = extractor
+        self.allow_fetch = True
+        self.lock = threading.Lock()
+        self.stats = {'wrapped': 0, 'preloaded': 0, 'fetched': 0, 'succeeded': 0, 'seconds': 0.0}
+    
+    @property
+    def extractor(self):
+        """延迟创建 NewsContentExtractor（只跑筛选阶段时不必导入 trafilatura）"""
+        if self._extractor is None:
+            from content_extractor import NewsContentExtractor
+            self._extractor = NewsContentExtractor()
+        return self._extractor
+    
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+    
+    def wrap(self, news_list):
+        """把新闻包装为 LazyNewsItem（已包装的保持不变）"""
+        wrapped = []
+        for news in news_list:
+            if not isinstance(news, LazyNewsItem):
+                news = LazyNewsItem(news, self)
+                self._count('wrapped')
+                if news.content_handle.fetched:
+                    self._count('preloaded')
+            wrapped.append(news)
+        return wrapped
+    
+    def prefetch(self, news_list, workers=10):
+        """批量提取这些新闻的正文（下载线程 + 提取进程池，已提取的跳过）"""
+        pending = [news for news in news_list
+                   if isinstance(news, LazyNewsItem) and not news.content_handle.fetched]
+        if not pending:
+            return
+        print(f"\n📥 批量提取正文: {len(pending)} 条（下载 {workers} 线程）")
+        self.extractor.max_workers = workers
+        start = time.perf_counter()
+        self.extractor.process_news_list_async(pending)
+        self._count('seconds', time.perf_counter() - start)
+        for news in pending:
+            news.content_handle.mark_fetched()
+    
+    def avoided(self):
+        """避免的正文提取次数（包装过但始终没被读取正文的新闻）"""
+        return self.stats['wrapped'] - self.stats['preloaded'] - self.stats['fetched']
+
+
+class LazyContent:
+    """正文的延迟句柄：第一次读取时才解码链接、下载提取正文，每条新闻最多提取一次"""
+    
+    def __init__(self, news_item, fetcher):
+        self.news_item = news_item
+        self.fetcher = fetcher
+        self.lock = threading.Lock()
+        self.fetched = dict.__contains__(news_item, 'content')
+    
+    def fetch(self):
+        """提取正文并写回新闻（已提取时直接返回）"""
+        if self.fetched:
+            return
+        with self.lock:
+            if self.fetched:
+                return
+            start = time.perf_counter()
+            # process_single_news 会写入 actual_url / content / has_content
+            self.fetcher.extractor.process_single_news(self.news_item)
+            self.fetcher._count('seconds', time.perf_counter() - start)
+            self.mark_fetched()
+    
+    def mark_fetched(self):
+        """记录已提取（批量提取后由 ContentFetcher.prefetch 调用）"""
+        if self.fetched:
+            return
+        self.fetcher._count('fetched')
+        if dict.get(self.news_item, 'has_content'):
+            self.fetcher._count('succeeded')
+        self.fetched = True
+
+
+class LazyNewsItem(dict):
+    """
+    正文延迟加载的新闻
+    
+    行为与普通 dict 相同；读取 content / actual_url / has_content 时，
+    如果还没有提取过且当前阶段允许，先提取正文。json.dump 只输出已有的字段。
+    """
+    
+    LAZY_FIELDS = ('content', 'actual_url', 'has_content')
+    
+    def __init__(self, news, fetcher):
+        super().__init__(news)
+        if not dict.get(self, 'content'):
+            # 空正文占位视为未提取
+            for key in self.LAZY_FIELDS:
+                dict.pop(self, key, None)
+        self.content_handle = LazyContent(self, fetcher)
+    
+    def _resolve(self, key):
+        if (key in self.LAZY_FIELDS and not dict.__contains__(self, key)
+                and self.content_handle.fetcher.allow_fetch):
+            self.content_handle.fetch()
+    
+    def __missing__(self, key):
+        self._resolve(key)
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        self._resolve(key)
+        return dict.get(self, key, default)
+
+
+class Stage:
+    """流水线阶段：新闻列表 → 新闻列表"""
+    
+    def __init__(self, name, label, func, reads_content=False):
+        """
+        Args:
+            name: 阶段标识（配置 pipeline.stages 中使用）
+            label: 显示名称
+            func: 处理函数 func(新闻列表) → 新闻列表
+            reads_content: 是否需要正文；为 False 时阶段内读取正文不会触发提取
+        """
+        self.name = name
+        self.label = label
+        self.func = func
+        self.reads_content = reads_content
+
+
+class NewsPipeline:
+    """按顺序执行阶段，记录每个阶段的进出条数和耗时"""
+    
+    def __init__(self, stages, fetcher=None):
+        self.stages = stages
+        self.fetcher = fetcher or ContentFetcher()
+        self.report = []
+    
+    def run(self, news_list=None):
+        """执行所有阶段，返回最后一个阶段的输出"""
+        news_list = self.fetcher.wrap(news_list or [])
+        self.report = []
+        
+        for stage in self.stages:
+            print("\n" + "="*60)
+            print(f"阶段: {stage.label}（{len(news_list)} 条）")
+            print("="*60)
+            
+            fetched_before = self.fetcher.stats['fetched']
+            self.fetcher.allow_fetch = stage.reads_content
+            start = time.perf_counter()
+            try:
+                output = stage.func(news_list)
+            finally:
+                self.fetcher.allow_fetch = True
+            elapsed = time.perf_counter() - start
+            
+            output = self.fetcher.wrap(output)
+            self.report.append({
+                'stage': stage.label,
+                'input': len(news_list),
+                'output': len(output),
+                'fetched': self.fetcher.stats['fetched'] - fetched_before,
+                'elapsed': elapsed
+            })
+            news_list = output
+        
+        return news_list
+    
+    def print_report(self):
+        """打印各阶段统计和正文提取情况"""
+        print("\n" + "="*60)
+        print("📊 流水线报告")
+        print("="*60)
+        print(f"{'阶段':<10} {'输入':>6} {'输出':>6} {'正文提取':>8} {'耗时':>8}")
+        for item in self.report:
+            print(f"{item['stage']:<10} {item['input']:>6} {item['output']:>6} "
+                  f"{item['fetched']:>8} {item['elapsed']:>7.1f}秒")
+        
+        stats = self.fetcher.stats
+        print(f"\n📝 正文提取: {stats['fetched']} 次（成功 {stats['succeeded']}，"
+              f"累计 {stats['seconds']:.1f}秒），自带正文 {stats['preloaded']} 条")
+        print(f"💡 避免提取: {self.fetcher.avoided()} 次"
+              f"（共 {stats['wrapped']} 条新闻进入流水线）")
+
+
+def build_stages(sector, hours=24, names=None, input_file=None, fetcher=None, extract_workers=10):
+    """
+    按阶段标识创建阶段列表
+    
+    Args:
+        sector: 板块
+        hours: 爬取时间范围（小时）
+        names: 阶段标识列表，默认读取配置 pipeline.stages
+        input_file: 指定时 crawl 阶段改为读取该文件（如已保存的聚合结果），dedup 阶段不做跨天去重
+        fetcher: ContentFetcher（extract 阶段使用）
+        extract_workers: extract 阶段的下载线程数
+    """
+    # 各阶段依赖的模块在用到时才导入（只跑部分阶段时不必安装全部依赖）
+    def crawl(news_list):
+        if input_file:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            print(f"  ✓ 加载 {input_file}: {len(loaded)} 条")
+            return list(news_list) + loaded
+        from news_aggregator import NewsAggregator
+        aggregator = NewsAggregator(sector, hours)
+        aggregator.run_all_crawlers_in_process()
+        return list(news_list) + aggregator.all_news
+    
+    def dedup(news_list):
+        from deduplicator import NewsDeduplicator
+        # 从文件读入（如重跑以前的原始数据）时不做跨天去重，也不写入索引
+        if not input_file:
+            from seen_index import SeenStoryIndex
+            news_list = SeenStoryIndex(sector).filter_new(news_list)
+        return NewsDeduplicator(similarity_threshold=0.8).deduplicate(news_list)
+    
+    # 关键词、质量筛选共用一个按本板块编译的规则引擎：
+    # 每条标题在关键词阶段扫描一次，质量阶段直接复用命中结果
+    shared = {}
+    
+    def rules():
+        if 'engine' not in shared:
+            from rule_engine import RuleEngine
+            shared['engine'] = RuleEngine.from_config(sector)
+        return shared['engine']
+    
+    def keyword(news_list):
+        filtered, _ = rules().keyword_filter.filter_news_list(news_list)
+        return filtered
+    
+    def quality(news_list):
+        filtered, _ = rules().quality_filter.filter_news_list(news_list)
+        return filtered
+    
+    def extract(news_list):
+        fetcher.prefetch(news_list, extract_workers)
+        return news_list
+    
+    def llm(news_list):
+        from llm_filter import LLMFilter
+        filtered, _, _ = LLMFilter().filter_all(news_list)
+        return filtered
+    
+    available = {
+        'crawl': Stage('crawl', '爬取', crawl),
+        'dedup': Stage('dedup', '去重', dedup),
+        'keyword': Stage('keyword', '关键词筛选', keyword),
+        'quality': Stage('quality', '质量筛选', quality),
+        'extract': Stage('extract', '正文提取', extract, reads_content=True),
+        'llm': Stage('llm', '大模型筛选', llm)
+    }
+    
+    names = names or load_pipeline_settings()['stages']
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"未知阶段: {', '.join(unknown)}（可选: {', '.join(available)}）")
+    return [available[name] for name in names]
+
+
+def main():
+    settings = load_pipeline_settings()
+    
+    parser = argparse.ArgumentParser(description='新闻处理流水线')
+    parser.add_argument('--sector', required=True,
+                        choices=['healthcare', 'education', 'strategic_emerging', 'hightech'],
+                        help='板块')
+    parser.add_argument('--hours', type=int, default=24, help='时间范围（小时）')
+    parser.add_argument('--input', help='跳过爬取，从聚合结果文件开始')
+    parser.add_argument('--stages', nargs='+', help=f"阶段顺序（默认: {' '.join(settings['stages'])}）")
+    parser.add_argument('--output', help='输出文件路径（默认 data/filtered/<板块>_pipeline_<日期>.json）')
+    args = parser.parse_args()
+    
+    fetcher = ContentFetcher()
+    stages = build_stages(args.sector, args.hours, args.stages, args.input, fetcher,
+                          settings['extract_workers'])
+    pipeline = NewsPipeline(stages, fetcher)
+    
+    start = time.perf_counter()
+    results = pipeline.run()
+    pipeline.print_report()
+    print(f"⏱️  总耗时: {time.perf_counter() - start:.1f}秒")
+    
+    output_file = args.output or os.path.join(
+        SCRIPT_DIR, '../data/filtered',
+        f"{args.sector}_pipeline_{datetime.now().strftime('%Y%m%d')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump([dict(news) for news in results], f, ensure_ascii=False, indent=2)
+    print(f"💾 已保存 {len(results)} 条到: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,9 @@
 新闻搜索爬虫 - 从新闻聚合网站搜索新闻
 """
 
-import requests
-from bs4 import BeautifulSoup
+from html_parser import parse_html
+from http_client import get_http_client
 import json
-import time
 from datetime import datetime
 import os
 
@@ -18,13 +17,8 @@ class NewsSearchCrawler:
         self.sector = sector
         self.config = self.load_config()
         self.results = []
-        self.session = requests.Session()
-        
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
     
     def load_config(self):
         """加载配置文件"""
@@ -47,9 +41,9 @@ class NewsSearchCrawler:
         search_url = f"https://www.baidu.com/s?tn=news&word={keyword}"
         
         try:
-            response = self.session.get(search_url, timeout=10)
+            response = self.session.get(search_url)
             response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, ('div', {'class': 'result'}))
             
             # 查找新闻结果
             news_items = []
@@ -100,9 +94,9 @@ class NewsSearchCrawler:
         search_url = f"https://news.sogou.com/news?query={keyword}"
         
         try:
-            response = self.session.get(search_url, timeout=10)
+            response = self.session.get(search_url)
             response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, ('div', {'class': 'news-box'}))
             
             # 查找新闻结果
             news_items = []
@@ -156,13 +150,9 @@ class NewsSearchCrawler:
             baidu_results = self.search_baidu_news(keyword, max_results_per_keyword)
             self.results.extend(baidu_results)
             
-            time.sleep(2)  # 礼貌延迟
-            
             # 搜索搜狗新闻
             sogou_results = self.search_sogou_news(keyword, max_results_per_keyword)
             self.results.extend(sogou_results)
-            
-            time.sleep(2)  # 礼貌延迟
         
         # 去重
         self.deduplicate()
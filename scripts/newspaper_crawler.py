@@ -9,6 +9,9 @@ import json
 import os
 from datetime import datetime, timedelta
 
+from seen_index import SeenStoryIndex
+from snapshot_store import get_snapshot_store
+
 class Newspaper4kCrawler:
     """Newspaper4k 新闻提取器"""
     
@@ -52,11 +55,17 @@ class Newspaper4kCrawler:
             
             news_items = []
             cutoff_time = datetime.now() - timedelta(hours=self.hours)
+            store = get_snapshot_store()
             
-            # 遍历文章
+            # 遍历文章（有网页快照的不再下载）
             for article in source.articles[:50]:  # 限制50篇
                 try:
-                    article.download()
+                    html = store.get(article.url)
+                    if html is not None:
+                        article.download(input_html=html)
+                    else:
+                        article.download()
+                        store.put(article.url, article.html)
                     article.parse()
                     
                     # 检查发布时间
@@ -116,6 +125,9 @@ class Newspaper4kCrawler:
     
     def save_results(self):
         """保存结果"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         if not self.results:
             print("\n⚠️  没有找到任何新闻")
             return
@@ -7,6 +7,8 @@
 import json
 import os
 
+from rule_engine import RuleEngine
+
 class QualityFilter:
     """质量筛选器"""
     
@@ -27,6 +29,15 @@ class QualityFilter:
         self.clickbait_keywords = config.get('标题党特征词', [])
         self.quality_thresholds = config.get('低质量特征', {})
         self.exclude_sources = config.get('排除来源', [])
+        
+        # 丢弃按旧规则表编译的引擎，下次调用 rules() 时按新规则表编译
+        self._engine = None
+    
+    def rules(self):
+        """编译后的规则引擎（首次使用时编译；直接修改规则列表不会触发重新编译，需重新调用 load_rules）"""
+        if self._engine is None:
+            self._engine = RuleEngine(quality_filter=self)
+        return self._engine
     
     def check_soft_ad(self, title):
         """检测软文特征"""
@@ -72,24 +83,9 @@ class QualityFilter:
         Returns:
             (bool, str): (是否保留, 原因)
         """
-        title = news_item.get('title', '')
-        
-        # 检查软文
-        is_soft_ad, reason = self.check_soft_ad(title)
-        if is_soft_ad:
-            return False, reason
-        
-        # 检查标题党
-        is_clickbait, reason = self.check_clickbait(title)
-        if is_clickbait:
-            return False, reason
-        
-        # 检查质量
-        is_quality, reason = self.check_quality(news_item)
-        if not is_quality:
-            return False, reason
-        
-        return True, "通过质量检查"
+        # 软文词、标题党词一次扫描完成，再做长度等检查，
+        # 结论与依次调用 check_soft_ad / check_clickbait / check_quality 相同
+        return self.rules().check_quality(news_item)
     
     def filter_news_list(self, news_list):
         """批量筛选新闻"""
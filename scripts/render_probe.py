@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态 / JS 渲染探测 - 列表页先用普通 HTTP 抓取，链接太少时才交给浏览器，按域名记住结论
+
+有的信源用 Playwright 渲染其实普通 HTML 就够了，有的信源在 UniversalNewsCrawler 中
+因为需要 JS 而抓不到内容，以前只能靠 test_multiple_sites.py 这类脚本手工试。这里：
+1. 先静态抓取列表页，统计取到的新闻链接数（标题像新闻的链接）
+2. 新闻链接数低于 min_links 时用浏览器池渲染同一页面再取一次
+3. 浏览器取到的链接更多时记为 browser，否则记为 static，保存在 data/cache/render_modes.db
+4. 以后的运行中 browser 域名直接渲染，不再白白静态抓取；static 域名链接数掉到阈值以下时重新探测；
+   结论超过 recheck_days 后重新探测
+
+用法:
+    python3 render_probe.py --stats
+    python3 render_probe.py --probe https://www.cls.cn/depth?id=1000 --links a
+    python3 render_probe.py --forget cls.cn
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from extractor_registry import domain_of
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATIC = 'static'
+BROWSER = 'browser'
+
+
+def load_probe_settings():
+    """从 references/config.json 读取 render_probe 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/render_modes.db',
+        'min_links': 10,
+        'recheck_days': 30
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('render_probe', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def static_links(source):
+    """
+    静态抓取列表页，按 source 的选择器取链接（与 browser_pool.crawl_listing 取法相同）
+    
+    Returns:
+        [(标题, 链接), ...]
+    """
+    from urllib.parse import urljoin
+    from html_parser import parse_html
+    from http_client import get_http_client
+    
+    response = get_http_client().get(source['url'], verify=False)
+    response.encoding = response.apparent_encoding or 'utf-8'
+    soup = parse_html(response.text)
+    links = []
+    title_attr = source.get('title_attr')
+    for link in soup.select(source['links'])[:source.get('limit', 50)]:
+        title = ((title_attr and link.get(title_attr)) or link.get_text(strip=True) or '').strip()
+        href = link.get('href') or ''
+        links.append((title, urljoin(response.url, href) if href else href))
+    return links
+
+
+def link_yield(links):
+    """像新闻标题的链接数（标题超过10个字，与爬虫的过滤条件相同）"""
+    return sum(1 for title, _ in links if title and len(title) > 10)
+
+
+class RenderModeMemory:
+    """按域名记住列表页是否需要浏览器渲染"""
+    
+    def __init__(self, db_path=None, min_links=None, recheck_days=None, enabled=None):
+        """
+        初始化
+        
+        Args:
+            db_path: SQLite文件路径，默认 data/cache/render_modes.db
+            min_links: 静态抓取的链接数达到该值即认为不需要浏览器
+            recheck_days: 结论保留天数，过期后重新探测
+            enabled: 是否启用；关闭后总是静态抓取，不探测
+        """
+        settings = load_probe_settings()
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, settings['db_path'])
+        self.min_links = settings['min_links'] if min_links is None else min_links
+        self.recheck_days = settings['recheck_days'] if recheck_days is None else recheck_days
+        self.lock = threading.Lock()
+        self.stats = {'static': 0, 'browser': 0, 'probed': 0, 'escalated': 0}
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS render_modes (
+                    domain TEXT PRIMARY KEY,
+                    mode TEXT NOT NULL,
+                    static_links INTEGER,
+                    browser_links INTEGER,
+                    decided_at REAL NOT NULL
+                );
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def lookup(self, url):
+        """域名未过期的记录 (方式, 静态链接数, 浏览器链接数)，没有时返回 None"""
+        cutoff = time.time() - self.recheck_days * 86400
+        with self.lock:
+            try:
+                return self.connect().execute(
+                    'SELECT mode, static_links, browser_links FROM render_modes '
+                    'WHERE domain = ? AND decided_at >= ?',
+                    (domain_of(url), cutoff)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"  ⚠️  渲染方式记录不可用: {e}")
+                return None
+    
+    def mode(self, url):
+        """域名的已知结论（static / browser），未探测或已过期时返回 None"""
+        if not self.enabled:
+            return STATIC
+        record = self.lookup(url)
+        return record[0] if record else None
+    
+    def remember(self, url, mode, static_count=None, browser_count=None):
+        """保存域名的结论"""
+        if not self.enabled:
+            return
+        with self.lock:
+            try:
+                conn = self.connect()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO render_modes '
+                        '(domain, mode, static_links, browser_links, decided_at) VALUES (?, ?, ?, ?, ?)',
+                        (domain_of(url), mode, static_count, browser_count, time.time())
+                    )
+            except sqlite3.Error as e:
+                print(f"  ⚠️  渲染方式记录写入失败: {e}")
+    
+    def needs_probe(self, url, static_count):
+        """
+        静态抓取的链接数不足，需要用浏览器再试一次
+        
+        已探测过、结论为 static 的域名（浏览器也不比静态多），链接数没有低于上次时不再重复探测。
+        """
+        if not self.enabled or static_count >= self.min_links:
+            return False
+        record = self.lookup(url)
+        if record and record[0] == STATIC and record[2] is not None and static_count >= (record[1] or 0):
+            return False
+        return True
+    
+    def decide(self, url, static_count, browser_count):
+        """比较两种方式的链接数，保存并返回结论"""
+        mode = BROWSER if browser_count > static_count else STATIC
+        with self.lock:
+            self.stats['probed'] += 1
+            if mode == BROWSER:
+                self.stats['escalated'] += 1
+        self.remember(url, mode, static_count, browser_count)
+        print(f"     🔬 {domain_of(url)}: 静态 {static_count} 个链接, 浏览器 {browser_count} 个 → {mode}")
+        return mode
+    
+    def count(self, mode):
+        """统计本次运行各方式抓取的页面数"""
+        with self.lock:
+            self.stats[mode] += 1
+    
+    def print_stats(self):
+        """打印本次运行的抓取方式统计"""
+        stats = self.stats
+        if not stats['static'] and not stats['browser']:
+            return
+        print(f"\n🔬 渲染方式: 静态 {stats['static']} 页, 浏览器 {stats['browser']} 页, "
+              f"探测 {stats['probed']} 次（升级为浏览器 {stats['escalated']} 个）")
+    
+    def forget(self, domain):
+        """删除某个域名的结论"""
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                return conn.execute('DELETE FROM render_modes WHERE domain = ?', (domain,)).rowcount
+    
+    def rows(self):
+        """全部结论 [(域名, 方式, 静态链接数, 浏览器链接数, 时间), ...]"""
+        with self.lock:
+            return self.connect().execute(
+                'SELECT domain, mode, static_links, browser_links, decided_at FROM render_modes ORDER BY domain'
+            ).fetchall()
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_render_memory():
+    """获取进程内共享的渲染方式记录"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = RenderModeMemory()
+        return _memory
+
+
+def main():
+    import argparse
+    import asyncio
+    from browser_pool import BrowserPool, crawl_listing
+    
+    parser = argparse.ArgumentParser(description='静态 / JS 渲染探测')
+    parser.add_argument('--stats', action='store_true', help='显示各域名的结论')
+    parser.add_argument('--probe', nargs='*', default=[], help='探测这些列表页（忽略已有结论）')
+    parser.add_argument('--links', default='a', help='探测时的链接选择器')
+    parser.add_argument('--forget', nargs='*', default=[], help='删除这些域名的结论')
+    args = parser.parse_args()
+    
+    memory = RenderModeMemory()
+    
+    for domain in args.forget:
+        print(f"🧹 {domain}: 删除 {memory.forget(domain)} 条")
+    
+    async def probe_browser(sources):
+        async with BrowserPool() as pool:
+            return await asyncio.gather(*(crawl_listing(pool, source) for source in sources),
+                                        return_exceptions=True)
+    
+    if args.probe:
+        sources = [{'url': url, 'links': args.links} for url in args.probe]
+        static_counts = []
+        for source in sources:
+            try:
+                static_counts.append(link_yield(static_links(source)))
+            except Exception as e:
+                print(f"  ✗ {source['url']} 静态抓取失败: {e}")
+                static_counts.append(0)
+        for source, static_count, links in zip(sources, static_counts, asyncio.run(probe_browser(sources))):
+            browser_count = 0 if isinstance(links, Exception) else link_yield(links)
+            memory.decide(source['url'], static_count, browser_count)
+    
+    if args.stats or not (args.probe or args.forget):
+        rows = memory.rows()
+        print(f"\n🔬 渲染方式记录: {len(rows)} 个域名")
+        for domain, mode, static_count, browser_count, decided_at in rows:
+            print(f"  {domain:<30} {mode:<8} 静态 {static_count if static_count is not None else '-':>4}  "
+                  f"浏览器 {browser_count if browser_count is not None else '-':>4}  "
+                  f"{time.strftime('%Y-%m-%d', time.localtime(decided_at))}")
+    memory.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,11 @@
 import json
 import os
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import time
+from html_parser import parse_html, ANCHORS
+from http_client import get_http_client
 import re
+from seen_index import SeenStoryIndex
+from keyword_matcher import get_sector_matcher
 
 class RollingNewsCrawler:
     """滚动新闻爬虫 - 关键词过滤版"""
@@ -19,17 +20,12 @@ class RollingNewsCrawler:
         self.sector = sector
         self.config = self.load_config()
         self.results = []
-        self.session = requests.Session()
-        
-        # 设置请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
         
         # 获取关键词
         self.keywords = self.config['sectors'][sector]['keywords']
+        self.matcher = get_sector_matcher(sector, self.keywords)
     
     def load_config(self):
         """加载配置文件"""
@@ -39,11 +35,8 @@ class RollingNewsCrawler:
             return json.load(f)
     
     def match_keywords(self, title):
-        """检查标题是否包含关键词"""
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        return False
+        """检查标题是否包含关键词（多模式自动机，一次扫描）"""
+        return self.matcher.search(title)
     
     def crawl_rolling_news(self, url, max_pages=3):
         """
@@ -62,18 +55,28 @@ class RollingNewsCrawler:
             page_url = self.build_page_url(url, page)
             
             try:
-                response = self.session.get(page_url, timeout=10)
+                response = self.session.get_conditional(page_url, source=url)
                 
-                # 根据网站设置编码
-                if 'people.com.cn' in page_url:
-                    response.encoding = 'gb2312'
+                # 页面自上次运行以来未变化（304）：取回上次从这份响应体解析出的新闻，不再解析；
+                # 同一天其他领域的运行或中断后重跑也照常拿到这些新闻
+                news_items = self.session.cached_items('rolling', page_url, response)
+                if news_items is not None:
+                    print(f"     🗄️  页面未变化，跳过解析")
+                    today = datetime.now().strftime('%Y-%m-%d')
+                    news_items = [dict(item, date=today) for item in news_items]
                 else:
-                    response.encoding = 'utf-8'
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 查找新闻列表
-                news_items = self.extract_news_list(soup, url)
+                    # 根据网站设置编码
+                    if 'people.com.cn' in page_url:
+                        response.encoding = 'gb2312'
+                    else:
+                        response.encoding = 'utf-8'
+                    
+                    # 只解析该网站提取时用到的部分
+                    soup = parse_html(response.text, self.parse_only_for(url))
+                    
+                    # 查找新闻列表
+                    news_items = self.extract_news_list(soup, url)
+                    self.session.store_items('rolling', page_url, response, news_items)
                 
                 # 过滤关键词
                 matched_count = 0
@@ -84,8 +87,6 @@ class RollingNewsCrawler:
                 
                 print(f"     ✓ 找到 {len(news_items)} 条新闻，匹配 {matched_count} 条")
                 
-                time.sleep(1)  # 礼貌延迟
-                
             except Exception as e:
                 print(f"     ✗ 爬取失败: {e}")
                 break
@@ -110,6 +111,15 @@ class RollingNewsCrawler:
             separator = '&' if '?' in base_url else '?'
             return f"{base_url}{separator}page={page}"
     
+    def parse_only_for(self, base_url):
+        """各网站提取时用到的部分（与 extract_news_list 的策略对应），None 表示完整解析"""
+        if 'people.com.cn' in base_url:
+            return ('ul', {'class': 'list_16'})
+        if 'ce.cn' in base_url or 'stdaily.com' in base_url or 'tibet.cn' in base_url:
+            return ANCHORS
+        # 通用方法按 ul/div 上下文选择链接，需要完整解析
+        return None
+    
     def extract_news_list(self, soup, base_url):
         """从HTML中提取新闻列表"""
         news_items = []
@@ -302,6 +312,9 @@ class RollingNewsCrawler:
     
     def save_results(self):
         """保存结果（追加模式）"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         script_dir = os.path.dirname(os.path.abspath(__file__))
         data_dir = os.path.join(script_dir, '../data/raw')
         os.makedirs(data_dir, exist_ok=True)
@@ -361,7 +374,6 @@ def main():
         for source in news_sources:
             print(f"\n📰 爬取: {source['name']}")
             crawler.crawl_rolling_news(source['url'], args.pages)
-            time.sleep(2)  # 避免请求过快
     elif args.url:
         # 单个URL爬取
         crawler.crawl_rolling_news(args.url, args.pages)
@@ -369,6 +381,7 @@ def main():
         parser.error('请指定 --url 或 --all 参数')
     
     crawler.save_results()
+    crawler.session.print_stats()
 
 
 if __name__ == '__main__':
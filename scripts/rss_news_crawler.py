@@ -4,12 +4,12 @@
 RSS 新闻聚合器 - 从 RSS 源获取新闻
 """
 
-import requests
 from bs4 import BeautifulSoup
+from http_client import get_http_client
 import json
-import time
 from datetime import datetime
 import os
+from seen_index import SeenStoryIndex
 
 class RSSNewsCrawler:
     """RSS 新闻聚合器"""
@@ -17,11 +17,8 @@ class RSSNewsCrawler:
     def __init__(self, sector):
         self.sector = sector
         self.results = []
-        self.session = requests.Session()
-        
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
         
         # RSS 新闻源列表
         self.rss_sources = {
@@ -58,7 +55,7 @@ class RSSNewsCrawler:
         print(f"\n🔍 获取 RSS: {source_name}")
         
         try:
-            response = self.session.get(rss_url, timeout=10)
+            response = self.session.get(rss_url)
             response.encoding = 'utf-8'
             
             soup = BeautifulSoup(response.text, 'xml')
@@ -101,7 +98,6 @@ class RSSNewsCrawler:
         for source in sources:
             news_items = self.fetch_rss(source['url'], source['name'])
             self.results.extend(news_items)
-            time.sleep(1)
         
         # 去重
         self.deduplicate()
@@ -125,6 +121,9 @@ class RSSNewsCrawler:
     
     def save_results(self):
         """保存结果"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         if not self.results:
             print("\n⚠️  没有找到任何新闻")
             return
@@ -4,13 +4,13 @@
 RSS 新闻聚合器 V2 - 从 RSS 源获取新闻（改进版：添加时间过滤）
 """
 
-import requests
 from bs4 import BeautifulSoup
+from http_client import get_http_client
 import json
-import time
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
 import os
+from seen_index import SeenStoryIndex
 
 class RSSNewsCrawler:
     """RSS 新闻聚合器"""
@@ -19,11 +19,8 @@ class RSSNewsCrawler:
         self.sector = sector
         self.hours = hours  # 时间范围（小时）
         self.results = []
-        self.session = requests.Session()
-        
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
         
         # RSS 新闻源列表（扩充版）
         self.rss_sources = {
@@ -122,36 +119,47 @@ class RSSNewsCrawler:
         print(f"\n🔍 获取 RSS: {source_name}")
         
         try:
-            response = self.session.get(rss_url, timeout=10)
-            response.encoding = 'utf-8'
+            response = self.session.get_conditional(rss_url, source=source_name)
             
-            soup = BeautifulSoup(response.text, 'xml')
-            items = soup.find_all('item')
+            # RSS 自上次运行以来未更新（304）：取回上次从这份响应体解析出的条目，不再解析
+            entries = self.session.cached_items('rss', rss_url, response)
+            if entries is not None:
+                print(f"  🗄️  RSS 未更新，跳过解析")
+            else:
+                response.encoding = 'utf-8'
+                
+                soup = BeautifulSoup(response.text, 'xml')
+                entries = []
+                for item in soup.find_all('item'):
+                    title_tag = item.find('title')
+                    link_tag = item.find('link')
+                    pubdate_tag = item.find('pubDate')
+                    
+                    if title_tag and link_tag:
+                        entries.append({
+                            'title': title_tag.get_text().strip(),
+                            'url': link_tag.get_text().strip(),
+                            'pubdate': pubdate_tag.get_text().strip() if pubdate_tag else ''
+                        })
+                self.session.store_items('rss', rss_url, response, entries)
             
             news_items = []
             filtered_count = 0
             
-            for item in items:
-                title_tag = item.find('title')
-                link_tag = item.find('link')
-                pubdate_tag = item.find('pubDate')
+            for entry in entries:
+                pubdate = entry['pubdate']
                 
-                if title_tag and link_tag:
-                    title = title_tag.get_text().strip()
-                    url = link_tag.get_text().strip()
-                    pubdate = pubdate_tag.get_text().strip() if pubdate_tag else ''
-                    
-                    # 时间过滤：只保留最近的新闻
-                    if pubdate and self.is_recent_news(pubdate):
-                        news_items.append({
-                            'title': title,
-                            'url': url,
-                            'source': source_name,
-                            'pubdate': pubdate,
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                    else:
-                        filtered_count += 1
+                # 时间过滤：只保留最近的新闻（每次运行按当前时间重新判断）
+                if pubdate and self.is_recent_news(pubdate):
+                    news_items.append({
+                        'title': entry['title'],
+                        'url': entry['url'],
+                        'source': source_name,
+                        'pubdate': pubdate,
+                        'date': datetime.now().strftime('%Y-%m-%d')
+                    })
+                else:
+                    filtered_count += 1
             
             print(f"  ✓ 找到 {len(news_items)} 条最近新闻（过滤掉 {filtered_count} 条旧新闻）")
             return news_items
@@ -171,7 +179,6 @@ class RSSNewsCrawler:
         for source in sources:
             news_items = self.fetch_rss(source['url'], source['name'])
             self.results.extend(news_items)
-            time.sleep(1)
         
         # 去重
         self.deduplicate()
@@ -195,6 +202,9 @@ class RSSNewsCrawler:
     
     def save_results(self):
         """保存结果"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         if not self.results:
             print("\n⚠️  没有找到任何新闻")
             return
@@ -234,4 +244,5 @@ if __name__ == '__main__':
     crawler = RSSNewsCrawler(args.sector, args.hours)
     crawler.crawl_all_sources()
     crawler.save_results()
+    crawler.session.print_stats()
 
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则引擎 - 把关键词筛选、质量筛选、质量评分的规则表编译成一个自动机
+
+以前每个标题要被 KeywordFilter（排除词 / 排除领域 / 必选词）、QualityFilter
+（软文词 / 标题党词）和 NewsFilter（排除词 / 必选词 / 措施词 / 省份正则）
+分别逐个关键词扫描一遍。这里把所有规则表编译进同一个 Aho-Corasick 自动机，
+每条关键词带上（规则组, 在原列表中的位置）标签，标题只扫描一遍即可得到全部命中；
+各筛选器再按原列表顺序取第一个命中，得到与原实现完全相同的结论和原因。
+
+大小写：KeywordFilter 的排除词和必选词在小写标题上匹配，其余规则匹配原标题。
+纯中文标题小写后不变，只需扫描一次；含英文字母时再扫描一次小写标题（只取小写规则组）。
+
+传给引擎的筛选器共用这一个引擎（各自的 rules() 直接返回它），同一 (标题, 来源) 的命中结果
+会缓存下来：流水线中关键词筛选扫描过的标题，到质量筛选、评分时不再重复扫描。
+"""
+
+from keyword_matcher import KeywordMatcher
+
+# 规则组 → 匹配的文本（'lower' 为小写后的标题，'title' 为原标题，'source' 为来源）
+RULE_GROUPS = {
+    'exclude': 'lower',            # KeywordFilter.exclude_keywords
+    'exclude_domain': 'title',     # KeywordFilter.exclude_domains
+    'include': 'lower',            # KeywordFilter.include_keywords（关键词转小写）
+    'soft_ad': 'title',            # QualityFilter.soft_ad_keywords
+    'clickbait': 'title',          # QualityFilter.clickbait_keywords
+    'news_exclude': 'title',       # NewsFilter.exclude_keywords
+    'measure': 'title',            # NewsFilter.measure_words
+    'province': 'title',           # NewsFilter.provinces
+    'authority': 'source',         # NewsFilter.authority_sources
+    'official': 'source',          # NewsFilter.official_keywords
+}
+
+
+class RuleEngine:
+    """单遍规则引擎"""
+    
+    # 命中结果缓存的最大条数（超过后清空重新缓存）
+    CACHE_SIZE = 100000
+    
+    def __init__(self, keyword_filter=None, quality_filter=None, news_filter=None, sector=None):
+        """
+        编译规则
+        
+        Args:
+            keyword_filter: KeywordFilter 实例（提供排除词、排除领域、必选词）
+            quality_filter: QualityFilter 实例（提供软文词、标题党词、质量阈值）
+            news_filter: NewsFilter 实例（提供评分用的各类词表）
+            sector: 只编译该板块的评分必选词（默认全部板块）
+        
+        未提供的筛选器对应的规则组为空，相应的判定方法不可用。
+        提供的筛选器改用本引擎，不再各自编译单表引擎。
+        """
+        self.keyword_filter = keyword_filter
+        self.quality_filter = quality_filter
+        self.news_filter = news_filter
+        self.sector = sector
+        self.cache = {}
+        
+        # 规则组 → 原始关键词列表（用于按位置还原原因中的关键词）
+        self.tables = {}
+        if keyword_filter is not None:
+            self.tables['exclude'] = list(keyword_filter.exclude_keywords)
+            self.tables['exclude_domain'] = list(keyword_filter.exclude_domains)
+            self.tables['include'] = list(keyword_filter.include_keywords)
+        if quality_filter is not None:
+            self.tables['soft_ad'] = list(quality_filter.soft_ad_keywords)
+            self.tables['clickbait'] = list(quality_filter.clickbait_keywords)
+        if news_filter is not None:
+            self.tables['news_exclude'] = list(news_filter.exclude_keywords)
+            self.tables['measure'] = list(news_filter.measure_words)
+            self.tables['province'] = list(news_filter.provinces)
+            self.tables['authority'] = list(news_filter.authority_sources)
+            self.tables['official'] = list(news_filter.official_keywords)
+            for name, keywords in news_filter.must_include_keywords.items():
+                if sector is None or name == sector:
+                    self.tables[f'must_include:{name}'] = list(keywords)
+        
+        # 模式串 → [(规则组, 位置)]，按匹配的文本分开
+        patterns = {'title': {}, 'lower': {}, 'source': {}}
+        # 空关键词在原实现中总是命中
+        self.always = {'title': [], 'lower': [], 'source': []}
+        for group, keywords in self.tables.items():
+            text_kind = RULE_GROUPS.get(group, 'title')
+            for index, keyword in enumerate(keywords):
+                pattern = keyword.lower() if group == 'include' else keyword
+                if pattern:
+                    patterns[text_kind].setdefault(pattern, []).append((group, index))
+                else:
+                    self.always[text_kind].append((group, index))
+        
+        # 标题自动机同时包含原标题规则和小写规则，标题本身就是小写时一次扫描全部命中
+        self.title_tags = {}
+        for text_kind in ('title', 'lower'):
+            for pattern, tags in patterns[text_kind].items():
+                for group, index in tags:
+                    self.title_tags.setdefault(pattern, []).append((group, index, text_kind))
+        self.title_matcher = KeywordMatcher(list(self.title_tags))
+        self.lower_tags = patterns['lower']
+        self.lower_matcher = KeywordMatcher(list(self.lower_tags))
+        self.source_tags = patterns['source']
+        self.source_matcher = KeywordMatcher(list(self.source_tags))
+        
+        for rule_filter in (keyword_filter, quality_filter, news_filter):
+            if rule_filter is not None:
+                rule_filter._engine = self
+    
+    def evaluate(self, title, source=''):
+        """
+        单遍评估一条标题（及来源）
+        
+        Returns:
+            dict: 规则组 → 命中关键词在原列表中的位置（升序），另含 'data'（标题是否包含数据）；
+                  结果会被缓存共用，调用方不要修改
+        """
+        key = (title, source)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        hits = {}
+        lowered = title.lower()
+        same_case = lowered == title
+        
+        for pattern in self.title_matcher.find_all(title):
+            for group, index, text_kind in self.title_tags[pattern]:
+                if text_kind == 'title' or same_case:
+                    hits.setdefault(group, set()).add(index)
+        if not same_case:
+            for pattern in self.lower_matcher.find_all(lowered):
+                for group, index in self.lower_tags[pattern]:
+                    hits.setdefault(group, set()).add(index)
+        for pattern in self.source_matcher.find_all(source):
+            for group, index in self.source_tags[pattern]:
+                hits.setdefault(group, set()).add(index)
+        
+        for text_kind in ('title', 'lower'):
+            for group, index in self.always[text_kind]:
+                hits.setdefault(group, set()).add(index)
+        for group, index in self.always['source']:
+            hits.setdefault(group, set()).add(index)
+        
+        hits = {group: sorted(indexes) for group, indexes in hits.items()}
+        if self.news_filter is not None and self.news_filter.data_pattern.search(title):
+            hits['data'] = [0]
+        
+        if len(self.cache) >= self.CACHE_SIZE:
+            self.cache.clear()
+        self.cache[key] = hits
+        return hits
+    
+    def hits_for(self, news_item):
+        """一条新闻（标题 + 来源）的命中结果"""
+        return self.evaluate(news_item.get('title', ''), news_item.get('source') or '')
+    
+    def first(self, hits, group):
+        """规则组中按原列表顺序的第一个命中关键词（未命中返回 None）"""
+        indexes = hits.get(group)
+        return self.tables[group][indexes[0]] if indexes else None
+    
+    def matched(self, hits, group):
+        """规则组中的全部命中关键词（按原列表顺序）"""
+        return [self.tables[group][index] for index in hits.get(group, [])]
+    
+    def check_keywords(self, title, hits=None):
+        """与 KeywordFilter.filter_news 相同的结论和原因"""
+        hits = self.evaluate(title) if hits is None else hits
+        
+        keyword = self.first(hits, 'exclude')
+        if keyword is not None:
+            return False, f"包含排除关键词: {keyword}"
+        domain = self.first(hits, 'exclude_domain')
+        if domain is not None:
+            return False, f"属于排除领域: {domain}"
+        
+        keyword = self.first(hits, 'include')
+        if keyword is not None:
+            return True, f"匹配关键词: {keyword}"
+        return False, "未匹配任何关键词"
+    
+    def check_quality(self, news_item, hits=None):
+        """与 QualityFilter.filter_news 相同的结论和原因"""
+        hits = self.hits_for(news_item) if hits is None else hits
+        
+        keyword = self.first(hits, 'soft_ad')
+        if keyword is not None:
+            return False, f"包含软文特征词: {keyword}"
+        keyword = self.first(hits, 'clickbait')
+        if keyword is not None:
+            return False, f"包含标题党特征词: {keyword}"
+        
+        # 长度、感叹号等检查不涉及词表，沿用原实现
+        is_quality, reason = self.quality_filter.check_quality(news_item)
+        if not is_quality:
+            return False, reason
+        return True, "通过质量检查"
+    
+    def score(self, news_item, sector, hits=None):
+        """与 NewsFilter.calculate_score 相同的分数和原因"""
+        if self.sector is not None and sector != self.sector:
+            raise ValueError(f"规则引擎只编译了 {self.sector} 板块的必选词，不能给 {sector} 评分")
+        if hits is None:
+            hits = self.hits_for(news_item)
+        
+        # 1. 排除关键词（直接淘汰）
+        keyword = self.first(hits, 'news_exclude')
+        if keyword is not None:
+            return 0, [f"包含排除关键词: {keyword}"]
+        
+        # 2. 相关性（30分）
+        matched_keywords = self.matched(hits, f'must_include:{sector}')
+        if not matched_keywords:
+            return 0, ["相关性不足"]
+        relevance_score = min(30, len(matched_keywords) * 10)
+        score = relevance_score
+        reasons = [f"相关性: {relevance_score}分 (匹配: {', '.join(matched_keywords[:3])})"]
+        
+        # 3. 权威性（25分）
+        if hits.get('authority'):
+            authority_score = 25
+            reasons.append(f"权威来源: {authority_score}分")
+        elif hits.get('official'):
+            authority_score = 20
+            reasons.append(f"官方来源: {authority_score}分")
+        else:
+            authority_score = 10
+            reasons.append(f"一般来源: {authority_score}分")
+        score += authority_score
+        
+        # 4. 时效性（20分，默认都在24小时内）
+        time_score = 20
+        score += time_score
+        reasons.append(f"时效性: {time_score}分")
+        
+        # 5. 价值性（25分）
+        if hits.get('data'):
+            score += 10
+            reasons.append("包含数据")
+        if hits.get('province'):
+            score += 10
+            reasons.append("包含地区")
+        if hits.get('measure'):
+            score += 5
+            reasons.append("包含具体措施")
+        
+        return score, reasons
+    
+    def score_batch(self, news_list, sector):
+        """批量评分，返回与 news_list 一一对应的 (分数, 原因列表)"""
+        return [self.score(news, sector) for news in news_list]
+    
+    def evaluate_batch(self, news_list, sector=None):
+        """
+        批量评估：每条新闻扫描一次，同时给出三个筛选器的结论
+        
+        Returns:
+            list: 每条新闻一个 dict，包含 hits 以及已配置筛选器的结论
+                  （keyword / quality 为 (是否保留, 原因)，score 为 (分数, 原因列表)）
+        """
+        results = []
+        for news in news_list:
+            hits = self.hits_for(news)
+            result = {'hits': hits}
+            if self.keyword_filter is not None:
+                result['keyword'] = self.check_keywords(news.get('title', ''), hits)
+            if self.quality_filter is not None:
+                result['quality'] = self.check_quality(news, hits)
+            if self.news_filter is not None and sector is not None:
+                result['score'] = self.score(news, sector, hits)
+            results.append(result)
+        return results
+    
+    def evaluate_columns(self, titles, sources, groups):
+        """
+        批量评估，按规则组返回命中数列
+        
+        Returns:
+            dict: 规则组 → 与 titles 一一对应的命中关键词个数列表
+        """
+        hits_list = [self.evaluate(title or '', source or '') for title, source in zip(titles, sources)]
+        return {group: [len(hits.get(group, ())) for hits in hits_list] for group in groups}
+    
+    @classmethod
+    def from_config(cls, sector=None):
+        """
+        按默认配置（config/keywords_config.json、config/quality_rules.json）创建引擎
+        
+        三个筛选器可通过 engine.keyword_filter / quality_filter / news_filter 使用，
+        它们共用本引擎。
+        """
+        from keyword_filter import KeywordFilter
+        from quality_filter import QualityFilter
+        from filter_quality_news import NewsFilter
+        return cls(KeywordFilter(), QualityFilter(), NewsFilter(), sector)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨天已见新闻索引 - 基于URL和标题SimHash指纹的持久化去重
+
+每条新闻记录首次出现日期（first_seen）和最近出现时间（last_seen）。
+以前的运行中已经出现过的新闻（URL相同，或标题SimHash海明距离很小）
+会在爬虫保存和聚合去重阶段直接丢弃，不再进入后续的评分、提取和大模型筛选。
+
+记录按使用方（scope，通常是领域）分开：同一条新闻昨天进入了 healthcare 的结果，
+今天 education 的运行仍然要处理它。
+
+用法:
+    python3 seen_index.py --stats
+    python3 seen_index.py --compact
+    python3 seen_index.py --compact --ttl-days 3
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+from deduplicator import NewsDeduplicator
+
+# SimHash 分段数（64位分4段，每段16位）：海明距离 <= 3 的指纹至少有一段完全相同
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = 64 // SIMHASH_BANDS
+
+
+def load_index_settings():
+    """从 references/config.json 读取 seen_index 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/seen_stories.db',
+        'ttl_days': 7,
+        'max_distance': 3,
+        'max_entries': 200000
+    }
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('seen_index', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def canonical_url(url):
+    """URL规范化：去掉首尾空白、锚点，主机名转小写"""
+    if not url:
+        return ''
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+
+def title_simhash(title, normalizer=None):
+    """
+    计算标题的64位SimHash（基于字符二元组）
+    
+    返回有符号64位整数（便于存入SQLite INTEGER），标题为空时返回 None
+    """
+    normalizer = normalizer or NewsDeduplicator()
+    text = re.sub(r'\s+', '', normalizer.normalize_title(title))
+    if not text:
+        return None
+    
+    shingles = [text[i:i + 2] for i in range(len(text) - 1)] or [text]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'
+        )
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    
+    fingerprint = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    return _to_signed(fingerprint)
+
+
+def _to_signed(value):
+    """无符号64位整数转有符号"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(fingerprint):
+    """把指纹切成若干段，用于近似查找"""
+    unsigned = fingerprint & ((1 << 64) - 1)
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return [unsigned >> (i * SIMHASH_BAND_BITS) & mask for i in range(SIMHASH_BANDS)]
+
+
+def _hamming(a, b):
+    """两个指纹的海明距离"""
+    return bin((a ^ b) & ((1 << 64) - 1)).count('1')
+
+
+class SeenStoryIndex:
+    """跨天已见新闻索引"""
+    
+    def __init__(self, scope='', db_path=None, ttl_days=None, max_distance=None, enabled=None):
+        """
+        初始化索引
+        
+        Args:
+            scope: 使用方（通常是领域，如 healthcare），只在同一使用方的记录中查找
+            db_path: SQLite文件路径，默认 data/cache/seen_stories.db
+            ttl_days: 记录保留天数（按最近出现时间计算）
+            max_distance: 标题SimHash判定为同一新闻的最大海明距离（<=3）
+            enabled: 是否启用；关闭后 filter_new 原样返回
+        """
+        settings = load_index_settings()
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        
+        self.scope = scope or ''
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(script_dir, settings['db_path'])
+        self.ttl_days = settings['ttl_days'] if ttl_days is None else ttl_days
+        self.max_distance = min(
+            settings['max_distance'] if max_distance is None else max_distance,
+            SIMHASH_BANDS - 1
+        )
+        self.max_entries = settings['max_entries']
+        self.normalizer = NewsDeduplicator()
+        self.today = datetime.now().strftime('%Y-%m-%d')
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            # 多个爬虫进程可能同时写入，等待锁而不是直接失败
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # 旧版索引没有 scope 列（不区分领域），无法迁移，直接重建
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(seen_urls)')]
+            if columns and 'scope' not in columns:
+                self._conn.executescript('DROP TABLE seen_urls; DROP TABLE IF EXISTS seen_titles;')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS seen_urls (
+                    scope TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (scope, url)
+                );
+                CREATE TABLE IF NOT EXISTS seen_titles (
+                    scope TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    band0 INTEGER NOT NULL,
+                    band1 INTEGER NOT NULL,
+                    band2 INTEGER NOT NULL,
+                    band3 INTEGER NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (scope, fingerprint)
+                );
+                CREATE INDEX IF NOT EXISTS idx_titles_band0 ON seen_titles(scope, band0);
+                CREATE INDEX IF NOT EXISTS idx_titles_band1 ON seen_titles(scope, band1);
+                CREATE INDEX IF NOT EXISTS idx_titles_band2 ON seen_titles(scope, band2);
+                CREATE INDEX IF NOT EXISTS idx_titles_band3 ON seen_titles(scope, band3);
+                CREATE INDEX IF NOT EXISTS idx_urls_last_seen ON seen_urls(last_seen);
+                CREATE INDEX IF NOT EXISTS idx_titles_last_seen ON seen_titles(last_seen);
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _url_first_seen(self, url):
+        """查询URL首次出现日期"""
+        row = self.connect().execute(
+            'SELECT first_seen FROM seen_urls WHERE scope = ? AND url = ?', (self.scope, url)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def _title_first_seen(self, fingerprint):
+        """查询相似标题（海明距离 <= max_distance）的最早出现日期"""
+        bands = _bands(fingerprint)
+        rows = self.connect().execute(
+            'SELECT fingerprint, first_seen FROM seen_titles '
+            'WHERE (scope = ? AND band0 = ?) OR (scope = ? AND band1 = ?) '
+            'OR (scope = ? AND band2 = ?) OR (scope = ? AND band3 = ?)',
+            [value for band in bands for value in (self.scope, band)]
+        ).fetchall()
+        
+        first_seen = None
+        for stored, stored_first_seen in rows:
+            if _hamming(stored, fingerprint) <= self.max_distance:
+                if first_seen is None or stored_first_seen < first_seen:
+                    first_seen = stored_first_seen
+        return first_seen
+    
+    def is_seen(self, news_item):
+        """判断新闻是否在以前（今天之前）的运行中出现过"""
+        url = canonical_url(news_item.get('url', ''))
+        if url:
+            first_seen = self._url_first_seen(url)
+            if first_seen and first_seen < self.today:
+                return True
+        
+        fingerprint = title_simhash(news_item.get('title', ''), self.normalizer)
+        if fingerprint is not None:
+            first_seen = self._title_first_seen(fingerprint)
+            if first_seen and first_seen < self.today:
+                return True
+        
+        return False
+    
+    def record(self, news_list):
+        """记录新闻（已存在则只刷新最近出现时间，保留首次出现日期）"""
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            for news in news_list:
+                url = canonical_url(news.get('url', ''))
+                if url:
+                    conn.execute(
+                        'INSERT INTO seen_urls (scope, url, first_seen, last_seen) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(scope, url) DO UPDATE SET last_seen = excluded.last_seen',
+                        (self.scope, url, self.today, now)
+                    )
+                
+                fingerprint = title_simhash(news.get('title', ''), self.normalizer)
+                if fingerprint is not None:
+                    conn.execute(
+                        'INSERT INTO seen_titles '
+                        '(scope, fingerprint, band0, band1, band2, band3, first_seen, last_seen) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                        'ON CONFLICT(scope, fingerprint) DO UPDATE SET last_seen = excluded.last_seen',
+                        [self.scope, fingerprint] + _bands(fingerprint) + [self.today, now]
+                    )
+    
+    def filter_new(self, news_list, record=True):
+        """
+        过滤掉以前已经处理过的新闻
+        
+        Args:
+            news_list: 新闻列表
+            record: 是否把本次看到的新闻写入索引（已见新闻会刷新有效期）
+        
+        Returns:
+            只包含新新闻的列表
+        """
+        if not self.enabled or not news_list:
+            return news_list
+        
+        try:
+            new_items = [news for news in news_list if not self.is_seen(news)]
+            if record:
+                self.record(news_list)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  已见新闻索引不可用，跳过跨天去重: {e}")
+            return news_list
+        
+        removed = len(news_list) - len(new_items)
+        if removed > 0:
+            print(f"  🗂️  跨天去重: 移除 {removed} 条以前已处理的新闻")
+        
+        return new_items
+    
+    def compact(self, ttl_days=None):
+        """
+        清理过期记录并压缩数据库
+        
+        Args:
+            ttl_days: 保留天数，默认使用配置中的 ttl_days
+        
+        Returns:
+            删除的记录数
+        """
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = time.time() - ttl_days * 86400
+        conn = self.connect()
+        
+        removed = 0
+        with conn:
+            for table in ('seen_urls', 'seen_titles'):
+                removed += conn.execute(
+                    f'DELETE FROM {table} WHERE last_seen < ?', (cutoff,)
+                ).rowcount
+                
+                # 超出容量上限时淘汰最久未出现的记录
+                count = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    removed += conn.execute(
+                        f'DELETE FROM {table} WHERE rowid IN '
+                        f'(SELECT rowid FROM {table} ORDER BY last_seen LIMIT ?)',
+                        (overflow,)
+                    ).rowcount
+        
+        conn.execute('VACUUM')
+        return removed
+    
+    def stats(self):
+        """索引统计信息"""
+        conn = self.connect()
+        return {
+            'scopes': conn.execute('SELECT COUNT(DISTINCT scope) FROM seen_urls').fetchone()[0],
+            'urls': conn.execute('SELECT COUNT(*) FROM seen_urls').fetchone()[0],
+            'titles': conn.execute('SELECT COUNT(*) FROM seen_titles').fetchone()[0],
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        }
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='跨天已见新闻索引维护')
+    parser.add_argument('--compact', action='store_true', help='清理过期记录并压缩数据库')
+    parser.add_argument('--ttl-days', type=int, help='保留天数（默认读取配置）')
+    parser.add_argument('--stats', action='store_true', help='显示索引统计')
+    args = parser.parse_args()
+    
+    index = SeenStoryIndex()
+    
+    if args.compact:
+        removed = index.compact(args.ttl_days)
+        print(f"🧹 已清理 {removed} 条过期记录")
+    
+    stats = index.stats()
+    print(f"📊 使用方: {stats['scopes']} 个 | URL: {stats['urls']} 条 | 标题指纹: {stats['titles']} 条 | "
+          f"文件大小: {stats['size_bytes'] / 1024:.1f} KB")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
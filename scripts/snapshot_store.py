@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网页快照存储 - 原始 HTML 按内容哈希压缩保存，调整提取方式时不必重新下载
+
+- 对象文件：data/snapshots/objects/<哈希前2位>/<sha256>.zst（内容相同的网页只存一份）
+- 索引：data/snapshots/index.db，记录 规范化URL → 哈希、抓取时间、压缩方式
+- 压缩：优先 zstd（需要 pip install zstandard），未安装时用 zlib；读取时按索引中记录的方式解压
+
+NewsContentExtractor、Newspaper4kCrawler、AdvancedNewsCrawler.fetch_article_content
+下载前先查快照，下载后写入快照。修改提取参数或换用 newspaper4k 后，
+用 --reextract 对某个日期范围内的快照离线重新提取正文。
+
+用法:
+    python3 snapshot_store.py --stats
+    python3 snapshot_store.py --reextract --since 2026-02-01 --until 2026-02-10
+    python3 snapshot_store.py --reextract --since 2026-02-10 --files ../data/raw/healthcare_aggregated_20260210.json
+    python3 snapshot_store.py --reextract --since 2026-02-10 --extractor newspaper
+    python3 snapshot_store.py --reextract --since 2026-02-10 --extractor auto
+    python3 snapshot_store.py --compact --ttl-days 60
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from seen_index import canonical_url
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CODEC_SUFFIX = {'zstd': '.zst', 'zlib': '.zz'}
+
+
+def load_snapshot_settings():
+    """从 references/config.json 读取 snapshot_store 配置"""
+    settings = {
+        'enabled': True,
+        'root': '../data/snapshots',
+        'codec': 'zstd',
+        'level': 10,
+        'max_age_days': 30,
+        'ttl_days': 90
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('snapshot_store', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+class SnapshotStore:
+    """网页快照存储"""
+    
+    def __init__(self, root=None, codec=None, level=None, max_age_days=None, ttl_days=None, enabled=None):
+        """
+        初始化快照存储
+        
+        Args:
+            root: 存储目录，默认 data/snapshots
+            codec: 'zstd' 或 'zlib'（zstandard 未安装时自动退回 zlib）
+            level: 压缩级别
+            max_age_days: get() 默认只返回这么多天内抓取的快照
+            ttl_days: compact() 清理的快照天数
+            enabled: 是否启用；关闭后 get 全部未命中、put 不写入
+        """
+        settings = load_snapshot_settings()
+        
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.root = root or os.path.join(SCRIPT_DIR, settings['root'])
+        self.codec = codec or settings['codec']
+        if self.codec == 'zstd' and zstandard is None:
+            self.codec = 'zlib'
+        self.level = settings['level'] if level is None else level
+        self.max_age_days = settings['max_age_days'] if max_age_days is None else max_age_days
+        self.ttl_days = settings['ttl_days'] if ttl_days is None else ttl_days
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'deduplicated': 0,
+                      'raw_bytes': 0, 'compressed_bytes': 0}
+        self._conn = None
+    
+    def connect(self):
+        """打开索引数据库（按需创建表）"""
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            # 下载线程也会读写，连接在锁保护下跨线程使用
+            self._conn = sqlite3.connect(os.path.join(self.root, 'index.db'), timeout=30,
+                                         check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    url TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    digest TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (url, fetched_at)
+                );
+                CREATE INDEX IF NOT EXISTS idx_snapshots_fetched_at ON snapshots(fetched_at);
+                CREATE INDEX IF NOT EXISTS idx_snapshots_digest ON snapshots(digest);
+            ''')
+        return self._conn
+    
+    def close(self):
+        """关闭索引数据库"""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _object_path(self, digest, codec):
+        return os.path.join(self.root, 'objects', digest[:2], digest + CODEC_SUFFIX[codec])
+    
+    def _compress(self, data):
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return zlib.compress(data, min(self.level, 9))
+    
+    def _decompress(self, data, codec):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise ValueError("快照为 zstd 压缩，需要 pip install zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+    
+    def put(self, url, html, fetched_at=None):
+        """
+        保存一个网页
+        
+        Args:
+            url: 网页链接（按规范化URL索引）
+            html: HTML 文本
+            fetched_at: 抓取时间戳，默认当前时间
+        
+        Returns:
+            内容哈希；未启用或 HTML 为空时返回 None
+        """
+        if not self.enabled or not url or not html:
+            return None
+        
+        data = html.encode('utf-8') if isinstance(html, str) else html
+        digest = hashlib.sha256(data).hexdigest()
+        fetched_at = fetched_at or time.time()
+        path = self._object_path(digest, self.codec)
+        try:
+            # 压缩在锁外进行；同一对象被并发写入时 os.replace 保证文件完整
+            compressed = None
+            if not os.path.exists(path):
+                compressed = self._compress(data)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+            
+            with self.lock:
+                conn = self.connect()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO snapshots (url, fetched_at, digest, codec, size) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (canonical_url(url), fetched_at, digest, self.codec, len(data))
+                    )
+                self.stats['stored'] += 1
+                if compressed is None:
+                    self.stats['deduplicated'] += 1
+                else:
+                    self.stats['raw_bytes'] += len(data)
+                    self.stats['compressed_bytes'] += len(compressed)
+        except (OSError, sqlite3.Error) as e:
+            print(f"  ⚠️  快照写入失败: {e}")
+            return None
+        return digest
+    
+    def _read(self, digest, codec):
+        with open(self._object_path(digest, codec), 'rb') as f:
+            return self._decompress(f.read(), codec).decode('utf-8', errors='replace')
+    
+    def get(self, url, max_age_days=None):
+        """
+        读取网页最近一次的快照
+        
+        Args:
+            url: 网页链接
+            max_age_days: 只返回这么多天内抓取的快照（默认读取配置，0 表示不限）
+        
+        Returns:
+            HTML 文本；没有快照时返回 None
+        """
+        if not self.enabled or not url:
+            return None
+        
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        cutoff = time.time() - max_age_days * 86400 if max_age_days else 0
+        html = None
+        try:
+            with self.lock:
+                row = self.connect().execute(
+                    'SELECT digest, codec FROM snapshots WHERE url = ? AND fetched_at >= ? '
+                    'ORDER BY fetched_at DESC LIMIT 1',
+                    (canonical_url(url), cutoff)
+                ).fetchone()
+            if row:
+                html = self._read(*row)
+        except (OSError, ValueError, sqlite3.Error, zlib.error) as e:
+            print(f"  ⚠️  快照读取失败: {e}")
+            html = None
+        
+        with self.lock:
+            self.stats['hits' if html is not None else 'misses'] += 1
+        return html
+    
+    def iter_range(self, since, until):
+        """
+        遍历抓取时间在 [since, until) 内的快照（每个URL取最近一次）
+        
+        Yields:
+            (规范化URL, 抓取时间戳, HTML)
+        """
+        with self.lock:
+            rows = self.connect().execute(
+                'SELECT url, MAX(fetched_at), digest, codec FROM snapshots '
+                'WHERE fetched_at >= ? AND fetched_at < ? GROUP BY url ORDER BY url',
+                (since, until)
+            ).fetchall()
+        for url, fetched_at, digest, codec in rows:
+            try:
+                yield url, fetched_at, self._read(digest, codec)
+            except (OSError, ValueError, zlib.error) as e:
+                print(f"  ⚠️  快照读取失败 {url}: {e}")
+    
+    def compact(self, ttl_days=None):
+        """删除过期的索引记录和不再被引用的对象文件，返回 (删除记录数, 删除文件数)"""
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = time.time() - ttl_days * 86400
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                removed = conn.execute('DELETE FROM snapshots WHERE fetched_at < ?', (cutoff,)).rowcount
+            referenced = {
+                os.path.basename(self._object_path(digest, codec))
+                for digest, codec in conn.execute('SELECT DISTINCT digest, codec FROM snapshots')
+            }
+            conn.execute('VACUUM')
+        
+        deleted = 0
+        objects_dir = os.path.join(self.root, 'objects')
+        for directory, _, files in os.walk(objects_dir):
+            for name in files:
+                if name not in referenced:
+                    os.remove(os.path.join(directory, name))
+                    deleted += 1
+        return removed, deleted
+    
+    def size(self):
+        """快照条数、对象数和占用空间"""
+        with self.lock:
+            conn = self.connect()
+            snapshots, urls, raw = conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT url), COALESCE(SUM(size), 0) FROM snapshots'
+            ).fetchone()
+        objects = 0
+        stored = 0
+        for directory, _, files in os.walk(os.path.join(self.root, 'objects')):
+            for name in files:
+                objects += 1
+                stored += os.path.getsize(os.path.join(directory, name))
+        return {'snapshots': snapshots, 'urls': urls, 'objects': objects,
+                'raw_bytes': raw, 'stored_bytes': stored}
+    
+    def print_stats(self):
+        """打印本次运行的快照统计"""
+        stats = self.stats
+        ratio = stats['compressed_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 0
+        print(f"\n🗃️  网页快照: 命中 {stats['hits']} 个, 未命中 {stats['misses']} 个, "
+              f"新写入 {stats['stored']} 个（内容重复 {stats['deduplicated']} 个）, "
+              f"压缩率 {ratio:.1%}（{self.codec}）")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """获取进程内共享的快照存储"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore()
+        return _store
+
+
+def reextract(store, since, until, files=(), extractor='trafilatura', output=None, processes=None,
+              chunk_size=256):
+    """
+    离线重新提取正文（只读快照，不联网）
+    
+    Args:
+        store: SnapshotStore
+        since, until: 抓取日期范围（datetime，含 since 不含 until）
+        files: 新闻 JSON 文件；指定时按 actual_url / url 找快照，原地更新 content / has_content
+        extractor: 'trafilatura' / 'newspaper' / 'selectors'，或 'auto'（按提取器注册表的域名统计选择）
+        output: 未指定 files 时的输出文件
+        processes: 提取进程数（默认 CPU 核数）
+        chunk_size: 每次从快照库读出交给进程池的快照数（内存中最多同时保留这么多个 HTML）
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+    from extractor_registry import extract_with, get_extractor_registry, run_plan
+    
+    print(f"📦 读取 {since:%Y-%m-%d} ~ {until - timedelta(days=1):%Y-%m-%d} 的快照")
+    snapshots = store.iter_range(since.timestamp(), until.timestamp())
+    registry = get_extractor_registry() if extractor == 'auto' else None
+    
+    # 分块流式处理：HTML 读出一块、提取一块，只保留 URL → 正文
+    content_by_url = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+        while True:
+            chunk = list(islice(snapshots, chunk_size))
+            if not chunk:
+                break
+            urls = [url for url, _, _ in chunk]
+            htmls = [html for _, _, html in chunk]
+            del chunk
+            if registry:
+                plans = [registry.plan(url) for url in urls]
+                results = pool.map(run_plan, urls, htmls, plans, [registry.min_chars] * len(urls), chunksize=4)
+                for url, (content, _, attempts) in zip(urls, results):
+                    registry.record(url, attempts)
+                    content_by_url[url] = content
+            else:
+                contents = pool.map(extract_with, [extractor] * len(urls), urls, htmls, chunksize=4)
+                content_by_url.update(zip(urls, contents))
+            del htmls
+    if registry:
+        registry.flush()
+    print(f"📝 提取完成: {sum(1 for c in content_by_url.values() if c)}/{len(content_by_url)} 个快照有正文，"
+          f"耗时 {time.perf_counter() - start:.1f}秒（{extractor}）")
+    
+    if files:
+        for path in files:
+            with open(path, 'r', encoding='utf-8') as f:
+                news_list = json.load(f)
+            updated = 0
+            for news in news_list:
+                url = canonical_url(news.get('actual_url') or news.get('url', ''))
+                if url in content_by_url:
+                    content = content_by_url[url]
+                    news['content'] = content or ''
+                    news['has_content'] = bool(content)
+                    updated += 1
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(news_list, f, ensure_ascii=False, indent=2)
+            print(f"  ✓ {path}: 更新 {updated}/{len(news_list)} 条")
+        return
+    
+    output = output or os.path.join(
+        SCRIPT_DIR, '../data/reextracted',
+        f"reextract_{since:%Y%m%d}_{until - timedelta(days=1):%Y%m%d}_{extractor}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump([
+            {'url': url, 'content': content_by_url[url] or '', 'has_content': bool(content_by_url[url])}
+            for url in content_by_url
+        ], f, ensure_ascii=False, indent=2)
+    print(f"💾 已保存到: {output}")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='网页快照存储')
+    parser.add_argument('--stats', action='store_true', help='显示存储统计')
+    parser.add_argument('--compact', action='store_true', help='清理过期快照和无引用的对象文件')
+    parser.add_argument('--ttl-days', type=int, help='保留天数（默认读取配置）')
+    parser.add_argument('--reextract', action='store_true', help='离线重新提取正文')
+    parser.add_argument('--since', help='开始日期 YYYY-MM-DD（默认今天）')
+    parser.add_argument('--until', help='结束日期 YYYY-MM-DD（含，默认与开始日期相同）')
+    parser.add_argument('--files', nargs='*', default=[], help='原地更新这些新闻 JSON 文件的正文')
+    parser.add_argument('--extractor', choices=['trafilatura', 'newspaper', 'selectors', 'auto'], default='trafilatura',
+                        help='提取方式')
+    parser.add_argument('--output', help='重新提取结果的输出文件')
+    args = parser.parse_args()
+    
+    store = SnapshotStore()
+    
+    if args.reextract:
+        since = datetime.strptime(args.since, '%Y-%m-%d') if args.since else \
+            datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        until = datetime.strptime(args.until, '%Y-%m-%d') if args.until else since
+        reextract(store, since, until + timedelta(days=1), args.files, args.extractor, args.output)
+    
+    if args.compact:
+        removed, deleted = store.compact(args.ttl_days)
+        print(f"🧹 已清理 {removed} 条过期快照，删除 {deleted} 个对象文件")
+    
+    size = store.size()
+    print(f"📊 快照: {size['snapshots']} 个（{size['urls']} 个URL，{size['objects']} 个对象）| "
+          f"原始 {size['raw_bytes'] / 1024 / 1024:.1f} MB → 存储 {size['stored_bytes'] / 1024 / 1024:.1f} MB")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+去重性能基准测试 - 候选分桶 vs 逐对比较
+
+1. 一致性：在同一批标题上比较两种模式的保留/移除结果；
+   限制记号频率（max_token_df）时报告与逐对比较结果不同的条数
+2. 扩展性：候选分桶模式（精确 / 限制记号频率）从 1k 到 100k 条标题的每条耗时
+
+用法:
+    python3 test_dedup_benchmark.py
+    python3 test_dedup_benchmark.py --sizes 1000 10000 100000 --check-size 2000 --max-token-df 30
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+from collections import Counter
+
+from bench_fixtures import load_seed_titles
+from deduplicator import NewsDeduplicator
+
+
+def generate_titles(count, seed_titles, dup_rate=0.15, seed=42):
+    """
+    生成合成标题
+    
+    新标题由真实标题中随机截取的2-6字片段拼接而成（保留真实的字/词频分布）；
+    约 dup_rate 比例的标题是对已有标题的轻微改写（替换/删除个别字符、
+    追加来源后缀），模拟多源转载。
+    """
+    rng = random.Random(seed)
+    chars = list(Counter(''.join(seed_titles)))
+    suffixes = [' - 新浪网', ' - 搜狐', ' - 人民网', ' - 新华网', '_中国经济网']
+    
+    titles = list(seed_titles[:count])
+    while len(titles) < count:
+        if titles and rng.random() < dup_rate:
+            base = list(rng.choice(titles))
+            for _ in range(rng.randint(1, 3)):
+                pos = rng.randrange(len(base))
+                if rng.random() < 0.5:
+                    base[pos] = rng.choice(chars)
+                elif len(base) > 8:
+                    del base[pos]
+            title = ''.join(base)
+            if rng.random() < 0.3:
+                title += rng.choice(suffixes)
+        else:
+            target = rng.randint(12, 40)
+            title = ''
+            while len(title) < target:
+                source = rng.choice(seed_titles)
+                size = rng.randint(2, 6)
+                start = rng.randrange(max(1, len(source) - size))
+                title += source[start:start + size]
+        titles.append(title)
+    
+    rng.shuffle(titles)
+    return [{'title': t} for t in titles]
+
+
+def run_dedup(news_list, use_blocking, max_token_df=None):
+    """运行一次去重，返回 (结果, 耗时, 比较次数)"""
+    deduplicator = NewsDeduplicator(similarity_threshold=0.8, use_blocking=use_blocking,
+                                    max_token_df=max_token_df)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        unique = deduplicator.deduplicate(news_list)
+    elapsed = time.perf_counter() - start
+    return unique, elapsed, deduplicator.last_stats.get('comparisons', 0)
+
+
+def count_differences(unique_a, unique_b):
+    """两次去重结果中只被其中一次保留的新闻条数"""
+    return len({id(n) for n in unique_a} ^ {id(n) for n in unique_b})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='去重性能基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='候选分桶模式测试的标题数量')
+    parser.add_argument('--check-size', type=int, default=2000,
+                        help='一致性校验（含逐对比较）的标题数量')
+    parser.add_argument('--max-token-df', type=int, default=30,
+                        help='限制记号频率模式的 max_token_df')
+    args = parser.parse_args()
+    
+    seed_titles = load_seed_titles()
+    print(f"种子标题: {len(seed_titles)} 条")
+    
+    print("\n" + "=" * 70)
+    print(f"一致性校验（{args.check_size} 条）")
+    print("=" * 70)
+    news_list = generate_titles(args.check_size, seed_titles)
+    pairwise, pairwise_time, pairwise_cmp = run_dedup(news_list, use_blocking=False)
+    blocked, blocked_time, blocked_cmp = run_dedup(news_list, use_blocking=True)
+    capped, capped_time, capped_cmp = run_dedup(news_list, use_blocking=True, max_token_df=args.max_token_df)
+    
+    same = [id(n) for n in pairwise] == [id(n) for n in blocked]
+    print(f"逐对比较: 保留 {len(pairwise)} 条, {pairwise_time:.2f}秒, 比较 {pairwise_cmp} 次")
+    print(f"候选分桶: 保留 {len(blocked)} 条, {blocked_time:.2f}秒, 比较 {blocked_cmp} 次")
+    print(f"结果一致: {'✅ 是' if same else '❌ 否'}")
+    print(f"限制记号频率（{args.max_token_df}）: 保留 {len(capped)} 条, {capped_time:.2f}秒, "
+          f"比较 {capped_cmp} 次, 与逐对比较不同 {count_differences(pairwise, capped)} 条")
+    
+    print("\n" + "=" * 70)
+    print(f"扩展性（候选分桶：精确 / 限制记号频率 {args.max_token_df}）")
+    print("=" * 70)
+    print(f"{'标题数':>10} {'保留数':>10} {'精确 微秒/条':>14} {'限频 保留数':>12} {'限频 微秒/条':>14} {'结果不同':>10}")
+    for size in args.sizes:
+        news_list = generate_titles(size, seed_titles)
+        unique, elapsed, _ = run_dedup(news_list, use_blocking=True)
+        capped, capped_time, _ = run_dedup(news_list, use_blocking=True, max_token_df=args.max_token_df)
+        print(f"{size:>10} {len(unique):>10} {elapsed / size * 1e6:>14.1f} {len(capped):>12} "
+              f"{capped_time / size * 1e6:>14.1f} {count_differences(unique, capped):>10}")
+    
+    print("\n测试完成！")
+
+
+if __name__ == '__main__':
+    main()
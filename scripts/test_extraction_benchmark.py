@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取性能基准测试 - 线程池 vs 进程池，在录制的 HTML 上运行（不联网）
+
+1. 纯提取：同一批 HTML 分别用 N 个线程、1..N 个进程做 trafilatura 提取，
+   对比每秒处理的网页数（线程受 GIL 限制，进程随核数增长）
+2. 端到端：模拟下载延迟，对比旧版（每个线程既下载又提取）和
+   分级处理（下载线程 → 有界队列 → 提取进程池），并校验提取结果一致
+
+用法:
+    python3 test_extraction_benchmark.py
+    python3 test_extraction_benchmark.py --html ../chinaso_page.html page2.html --docs 200 --latency 0.2
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from content_extractor import NewsContentExtractor
+from extractor_registry import ExtractorRegistry, extract_with
+
+
+class RecordedExtractor(NewsContentExtractor):
+    """用录制的 HTML 代替下载，按 latency 模拟网络等待"""
+    
+    def __init__(self, pages, latency, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.latency = latency
+    
+    def decode_google_news_url(self, url):
+        return url
+    
+    def download(self, url):
+        time.sleep(self.latency)
+        return self.pages[int(url.rsplit('/', 1)[1]) % len(self.pages)]
+
+
+def load_pages(paths):
+    """读取录制的 HTML"""
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            pages.append(f.read())
+    return pages
+
+
+def make_documents(pages, count):
+    """复制成 count 个文档（每份加不同注释，避免完全相同）"""
+    return [pages[i % len(pages)] + f'\n<!-- doc {i} -->' for i in range(count)]
+
+
+def run_pool(executor_class, workers, documents):
+    """用给定的执行器提取所有文档，返回 (结果, 耗时)"""
+    start = time.perf_counter()
+    with executor_class(max_workers=workers) as executor:
+        # 与正式提取相同的 trafilatura 参数（extractor_registry.extract_with_trafilatura）
+        results = list(executor.map(partial(extract_with, 'trafilatura', ''), documents, chunksize=1))
+    return results, time.perf_counter() - start
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='正文提取性能基准测试')
+    parser.add_argument('--html', nargs='+', default=[os.path.join(script_dir, '../chinaso_page.html')],
+                        help='录制的 HTML 文件')
+    parser.add_argument('--docs', type=int, default=100, help='文档数量')
+    parser.add_argument('--latency', type=float, default=0.1, help='模拟下载延迟（秒）')
+    parser.add_argument('--threads', type=int, default=10, help='下载线程数')
+    args = parser.parse_args()
+    
+    pages = load_pages(args.html)
+    documents = make_documents(pages, args.docs)
+    cpus = os.cpu_count() or 1
+    print(f"📄 录制网页 {len(pages)} 个，文档 {len(documents)} 个，CPU {cpus} 核")
+    
+    # 1. 纯提取
+    print("\n" + "=" * 60)
+    print("纯提取吞吐量")
+    print("=" * 60)
+    reference, elapsed = run_pool(ThreadPoolExecutor, 1, documents)
+    baseline = len(documents) / elapsed
+    print(f"{'单线程':<12} {baseline:>8.1f} 页/秒")
+    
+    results, elapsed = run_pool(ThreadPoolExecutor, cpus, documents)
+    assert results == reference
+    print(f"{f'{cpus}线程':<12} {len(documents) / elapsed:>8.1f} 页/秒  "
+          f"{len(documents) / elapsed / baseline:.1f}x")
+    
+    process_counts = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    for count in process_counts:
+        results, elapsed = run_pool(ProcessPoolExecutor, count, documents)
+        assert results == reference
+        print(f"{f'{count}进程':<12} {len(documents) / elapsed:>8.1f} 页/秒  "
+              f"{len(documents) / elapsed / baseline:.1f}x")
+    
+    # 2. 端到端（模拟下载延迟）
+    print("\n" + "=" * 60)
+    print(f"端到端（下载延迟 {args.latency}秒，下载线程 {args.threads} 个）")
+    print("=" * 60)
+    timings = {}
+    contents = {}
+    for name, use_processes in (('旧版线程池', False), ('分级处理', True)):
+        # 关闭统计：录制的网页不写入域名统计，两种方式按相同顺序提取
+        extractor = RecordedExtractor(pages, args.latency, max_workers=args.threads,
+                                      registry=ExtractorRegistry(enabled=False))
+        news_list = [{'title': f'文档{i}', 'url': f'http://recorded/{i}'} for i in range(args.docs)]
+        start = time.perf_counter()
+        extractor.process_news_list_async(news_list, use_processes=use_processes)
+        timings[name] = time.perf_counter() - start
+        contents[name] = [news['content'] for news in news_list]
+    
+    assert contents['旧版线程池'] == contents['分级处理']
+    print(f"\n一致性校验: ✅ 提取结果相同")
+    for name, elapsed in timings.items():
+        print(f"  {name}: {elapsed:.2f}秒（{args.docs / elapsed:.1f} 页/秒）")
+    print(f"  加速比: {timings['旧版线程池'] / timings['分级处理']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
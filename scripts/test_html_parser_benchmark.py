@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 解析对比测试 - 在保存的网页上比较各解析方式的耗时、峰值内存和取到的链接
+
+对每个网页依次测量：
+- html.parser 完整解析（原来各爬虫的做法）
+- lxml 完整解析
+- html.parser / lxml 只解析链接（parse_only=ANCHORS）
+耗时取 repeat 次中的最小值和平均值，峰值内存用 tracemalloc 统计（解析期间 Python 对象分配，
+lxml 内部 C 结构不计入，但最终 BeautifulSoup 树都是 Python 对象），
+并检查各方式取到的 (标题, 链接) 是否与 html.parser 完整解析一致。
+
+用法:
+    python3 test_html_parser_benchmark.py
+    python3 test_html_parser_benchmark.py --pages ../chinaso_page.html --repeat 20
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from html_parser import parse_html, resolve_backend, ANCHORS
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (名称, 解析器, parse_only)
+MODES = [
+    ('html.parser 完整', 'html.parser', None),
+    ('lxml 完整', 'lxml', None),
+    ('html.parser 链接', 'html.parser', ANCHORS),
+    ('lxml 链接', 'lxml', ANCHORS),
+]
+
+
+def anchor_pairs(soup):
+    """页面上全部 (标题, 链接)"""
+    return [(link.get_text().strip(), link.get('href', '')) for link in soup.find_all('a', href=True)]
+
+
+def measure(html, backend, parse_only, repeat):
+    """返回 (最短秒数, 平均秒数, 峰值KB, 链接列表)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_html(html, parse_only, backend)
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    soup = parse_html(html, parse_only, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), sum(times) / len(times), peak / 1024, anchor_pairs(soup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 解析对比测试')
+    parser.add_argument('--pages', nargs='*', default=[os.path.join(SCRIPT_DIR, '../chinaso_page.html')],
+                        help='保存的网页文件')
+    parser.add_argument('--repeat', type=int, default=10, help='每种方式重复次数')
+    args = parser.parse_args()
+    
+    modes = MODES
+    if resolve_backend('lxml') != 'lxml':
+        print("⚠️  未安装 lxml（pip install lxml），只测试 html.parser")
+        modes = [mode for mode in MODES if mode[1] != 'lxml']
+    
+    for path in args.pages:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            html = f.read()
+        print(f"\n📄 {os.path.basename(path)}（{len(html) / 1024:.0f} KB），每种方式 {args.repeat} 次")
+        print("=" * 84)
+        print(f"{'方式':<18} {'最短毫秒':>9} {'平均毫秒':>9} {'加速':>7} {'峰值内存KB':>11} {'链接数':>7} {'与原做法一致':>10}")
+        print("=" * 84)
+        
+        baseline = None
+        for name, backend, parse_only in modes:
+            best, mean, peak, pairs = measure(html, backend, parse_only, args.repeat)
+            if baseline is None:
+                baseline = (best, pairs)
+            same = '✓' if pairs == baseline[1] else f'✗ 差 {len(set(pairs) ^ set(baseline[1]))}'
+            print(f"{name:<18} {best * 1000:>9.1f} {mean * 1000:>9.1f} {baseline[0] / best:>6.1f}x "
+                  f"{peak:>11.0f} {len(pairs):>7} {same:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词匹配性能基准测试 - Aho-Corasick 自动机 vs 逐个关键词 `in`
+
+1. 一致性：两种方式在真实标题上的命中结果完全相同
+2. 性能：关键词数量 50 / 200 / 500 时，每条标题的匹配耗时
+
+用法:
+    python3 test_keyword_matcher_benchmark.py
+    python3 test_keyword_matcher_benchmark.py --sizes 50 200 500 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+from bench_fixtures import load_seed_titles
+from keyword_matcher import EXTENDED_KEYWORDS, KeywordMatcher
+
+
+def build_keywords(count, seed_titles, seed=42):
+    """
+    构造关键词表：config.json 各板块关键词 + 扩展同义词，
+    不足部分从真实标题中截取2-4字片段补齐
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(script_dir, '../references/config.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    keywords = []
+    for sector in config['sectors'].values():
+        keywords.extend(sector['keywords'])
+    for words in EXTENDED_KEYWORDS.values():
+        keywords.extend(words)
+    keywords = list(dict.fromkeys(keywords))
+    
+    rng = random.Random(seed)
+    while len(keywords) < count:
+        title = rng.choice(seed_titles)
+        size = rng.randint(2, 4)
+        if len(title) <= size:
+            continue
+        start = rng.randrange(len(title) - size)
+        fragment = title[start:start + size]
+        if fragment.strip() and fragment not in keywords:
+            keywords.append(fragment)
+    return keywords[:count]
+
+
+def naive_search(keywords, title):
+    """原实现：逐个关键词判断"""
+    for keyword in keywords:
+        if keyword in title:
+            return True
+    return False
+
+
+def naive_find_all(keywords, title):
+    """逐个关键词收集所有命中"""
+    return [keyword for keyword in keywords if keyword in title]
+
+
+def timeit(func, titles, repeat):
+    """返回每条标题的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for title in titles:
+            func(title)
+    return (time.perf_counter() - start) / (repeat * len(titles)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='关键词匹配性能基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500],
+                        help='关键词数量')
+    parser.add_argument('--repeat', type=int, default=10, help='重复次数')
+    args = parser.parse_args()
+    
+    titles = load_seed_titles()
+    print(f"测试标题: {len(titles)} 条")
+    
+    print("\n" + "=" * 78)
+    print(f"{'关键词数':>8} {'命中率':>8} {'逐个in(判断)':>14} {'AC(判断)':>10} "
+          f"{'逐个in(全部)':>14} {'AC(全部)':>10} {'加速比':>8}")
+    print("=" * 78)
+    
+    for size in args.sizes:
+        keywords = build_keywords(size, titles)
+        matcher = KeywordMatcher(keywords)
+        
+        # 一致性校验
+        for title in titles:
+            assert matcher.search(title) == naive_search(keywords, title), title
+            assert set(matcher.find_all(title)) == set(naive_find_all(keywords, title)), title
+        
+        hit_rate = sum(matcher.search(t) for t in titles) / len(titles)
+        naive_bool = timeit(lambda t: naive_search(keywords, t), titles, args.repeat)
+        ac_bool = timeit(matcher.search, titles, args.repeat)
+        naive_all = timeit(lambda t: naive_find_all(keywords, t), titles, args.repeat)
+        ac_all = timeit(matcher.find_all, titles, args.repeat)
+        
+        print(f"{len(keywords):>8} {hit_rate:>8.1%} {naive_bool:>12.2f}µs {ac_bool:>8.2f}µs "
+              f"{naive_all:>12.2f}µs {ac_all:>8.2f}µs {naive_all / ac_all:>7.1f}x")
+    
+    print("\n一致性校验: ✅ 全部通过")
+    print("测试完成！")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表页模板一致性测试 - 按模板取到的新闻必须与完整自动识别相同
+
+在构造的列表页上，每页先完整识别（并学习模板），再按模板识别同一页面和结构相同的翻页，
+逐页比较 (标题, 链接, 时间) 与完整识别的结果：
+- 单个列表容器（带日期）：学习模板，之后按模板提取
+- 容器 + 带时间标记的零散链接（策略2）：模板覆盖不了，不学习
+- 容器数超过 max_containers：不学习
+- 渲染方式探测：静态页面学到的模板不套用到浏览器渲染后的页面，渲染结果总是完整识别
+
+用法:
+    python3 test_listing_templates.py
+"""
+
+import os
+import tempfile
+
+from html_parser import parse_html
+from listing_templates import ListingTemplateStore
+from render_probe import BROWSER
+from universal_crawler import UniversalNewsCrawler
+
+BASE_URL = 'https://news.example.com/list/'
+
+
+def list_page(offset, count):
+    """单个 ul.news-list 容器，每条带日期"""
+    rows = ''.join(
+        f'<li><a href="/a/{offset + i}.html">第{offset + i}条测试新闻标题内容</a>'
+        f'<span class="time">2026-02-{i % 28 + 1:02d} 10:{i % 60:02d}</span></li>'
+        for i in range(count)
+    )
+    return f'<html><body><div id="main"><ul class="news-list">{rows}</ul></div></body></html>'
+
+
+def mixed_page(offset):
+    """6 条容器内新闻 + 30 条只能按时间标记找到的 <p><a>"""
+    rows = ''.join(f'<li><a href="/a/{offset + i}.html">第{offset + i}条容器内新闻标题</a></li>'
+                   for i in range(6))
+    loose = ''.join(f'<p><a href="/b/{offset + i}.html">第{offset + i}条零散新闻标题内容</a> 2026-02-09 08:{i:02d}</p>'
+                    for i in range(30))
+    return f'<html><body><ul class="news-list">{rows}</ul>{loose}</body></html>'
+
+
+def rendered_page():
+    """浏览器渲染后的页面：静态的 ul.news-list 之外，JS 又生成了一个更长的列表"""
+    rows = ''.join(
+        f'<li><a href="/js/{i}.html">第{i}条脚本生成的新闻标题</a>'
+        f'<span class="time">2026-02-{i % 28 + 1:02d} 09:{i % 60:02d}</span></li>'
+        for i in range(40)
+    )
+    static = list_page(0, 20).replace('</body></html>', '')
+    return f'{static}<div class="js-list"><ul>{rows}</ul></div></body></html>'
+
+
+def many_containers_page(offset):
+    """7 个各有 3 条新闻的容器"""
+    blocks = ''.join(
+        f'<ul class="news-list" id="block{b}">' + ''.join(
+            f'<li><a href="/c/{offset + b * 10 + i}.html">第{offset + b * 10 + i}条分栏新闻标题</a></li>'
+            for i in range(3)
+        ) + '</ul>'
+        for b in range(7)
+    )
+    return f'<html><body>{blocks}</body></html>'
+
+
+CASES = [
+    ('单个列表容器', list_page(0, 20), list_page(100, 20), True),
+    ('容器 + 零散链接', mixed_page(0), mixed_page(100), False),
+    ('容器超过上限', many_containers_page(0), many_containers_page(100), False),
+]
+
+
+def main():
+    crawler = UniversalNewsCrawler('hightech')
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, (name, page, next_page, learnable) in enumerate(CASES):
+            crawler.templates = ListingTemplateStore(db_path=os.path.join(tmp, f'templates{index}.db'), enabled=True)
+            for html in (page, page, next_page):
+                expected = crawler._item_keys(crawler.detect_news_list(parse_html(html), BASE_URL)[0])
+                actual = crawler._item_keys(crawler.auto_detect_news_list(parse_html(html), BASE_URL))
+                assert actual == expected, f"{name}: 模板 {len(actual)} 条, 完整识别 {len(expected)} 条"
+            
+            stats = crawler.templates.stats
+            assert (crawler.templates.get(BASE_URL) is not None) == learnable, name
+            assert stats['hits'] == (2 if learnable else 0), (name, stats)
+            print(f"  ✓ {name}: {len(expected)} 条, 按模板提取 {stats['hits']} 页, "
+                  f"完整识别 {stats['detected']} 页")
+            crawler.templates.close()
+        
+        # 渲染方式探测：静态页面学到模板后，渲染结果仍然完整识别
+        crawler.templates = ListingTemplateStore(db_path=os.path.join(tmp, 'templates_probe.db'), enabled=True)
+        crawler.auto_detect_news_list(parse_html(list_page(0, 20)), BASE_URL)
+        assert crawler.templates.get(BASE_URL) is not None
+        html = rendered_page()
+        expected = crawler._item_keys(crawler.detect_news_list(parse_html(html), BASE_URL)[0])
+        actual = crawler._item_keys(crawler.auto_detect_news_list(parse_html(html), BASE_URL, BROWSER, use_template=False))
+        assert actual == expected and len(actual) > 20, (len(actual), len(expected))
+        # 套用静态模板只能取到静态的 20 条，探测会误判为不需要浏览器
+        assert len(crawler.auto_detect_news_list(parse_html(html), BASE_URL)) == 20
+        print(f"  ✓ 渲染方式探测: 静态 20 条, 渲染后完整识别 {len(actual)} 条")
+        crawler.templates.close()
+    print("一致性校验: ✅ 全部通过")
+
+
+if __name__ == '__main__':
+    main()
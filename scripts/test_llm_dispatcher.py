@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型调度器测试 - 本地模拟接口，不消耗真实调用
+
+模拟服务器按 messages API 的格式返回结论，并按批次注入故障：
+- 429（带 Retry-After）
+- 500
+- JSON 数组在中途被截断（只输出前一半结论）
+每个故障批次第二次请求时正常返回。请求带 stream 时按 SSE 逐段输出。
+
+校验：所有新闻都得到结论且与模拟结论一致；重试、截断抢救、重新提交都发生过；
+并发调度比串行快；流式模式的首条结论早于整批返回。
+
+用法:
+    python3 test_llm_dispatcher.py
+    python3 test_llm_dispatcher.py --count 400 --delay 0.3
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_fixtures import load_seed_titles
+from llm_filter import LLMFilter
+
+
+def expected_keep(title):
+    """模拟的判断结果（按标题哈希，稳定可复现）"""
+    return hashlib.md5(title.encode('utf-8')).digest()[0] % 3 != 0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """模拟 messages API"""
+    
+    seen_batches = set()
+    lock = threading.Lock()
+    delay = 0.2
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = payload['messages'][0]['content']
+        items = json.loads(re.search(r'新闻列表：\n(\[.*?\n\])', prompt, re.S).group(1))
+        
+        # 按批次到达顺序轮流注入故障（正常 / 429 / 500 / 截断），同一批次只注入一次
+        first_id = items[0]['id']
+        with self.lock:
+            first_time = first_id not in self.seen_batches
+            self.seen_batches.add(first_id)
+            fault = len(self.seen_batches) % 4 if first_time else 0
+        
+        if fault == 1:
+            self._send(429, {'error': 'rate_limited'}, {'Retry-After': '0.1'})
+            return
+        if fault == 2:
+            self._send(500, {'error': 'internal'})
+            return
+        
+        verdicts = [
+            {'id': item['id'], 'keep': expected_keep(item['title']), 'reason': '模拟判断'}
+            for item in items
+        ]
+        text = '```json\n' + json.dumps(verdicts, ensure_ascii=False, indent=2) + '\n```'
+        if fault == 3 and len(verdicts) > 1:
+            # 截断在一半处（对象中间）
+            text = text[:len(text) // 2]
+        stop_reason = 'max_tokens' if fault == 3 else 'end_turn'
+        
+        if payload.get('stream'):
+            self._send_stream(text, stop_reason)
+            return
+        time.sleep(self.delay)
+        self._send(200, {'content': [{'type': 'text', 'text': text}], 'stop_reason': stop_reason})
+    
+    def _send_stream(self, text, stop_reason, chunks=20):
+        """按 SSE 逐段输出，总耗时与整批返回相同"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        
+        def event(name, body):
+            data = json.dumps(dict(body, type=name), ensure_ascii=False)
+            self.wfile.write(f"event: {name}\ndata: {data}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        
+        event('message_start', {'message': {'model': 'stand-in'}})
+        size = max(1, len(text) // chunks)
+        for start in range(0, len(text), size):
+            time.sleep(self.delay / chunks)
+            event('content_block_delta', {'index': 0, 'delta': {
+                'type': 'text_delta', 'text': text[start:start + size]
+            }})
+        event('message_delta', {'delta': {'stop_reason': stop_reason}})
+        event('message_stop', {})
+
+
+def run_filter(url, news_list, workers, token_budget, stream=False):
+    """用模拟接口跑一遍 LLMFilter.filter_all"""
+    # 不启用本地预分类：已训练的分类器会绕过模拟接口，结论不再由模拟接口决定
+    llm_filter = LLMFilter(use_cache=False, api_url=url, api_key='test', use_classifier=False)
+    llm_filter.settings.update({'requests_per_second': 50, 'backoff': 0.05})
+    kept = []
+    start = time.perf_counter()
+    filtered, stats, results = llm_filter.filter_all(news_list, workers=workers,
+                                                     token_budget=token_budget,
+                                                     stream=stream, on_keep=kept.append)
+    assert sorted(n['title'] for n in kept) == sorted(n['title'] for n in filtered)
+    return filtered, stats, results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='大模型调度器测试（本地模拟接口）')
+    parser.add_argument('--count', type=int, default=300, help='新闻条数')
+    parser.add_argument('--delay', type=float, default=0.2, help='模拟接口每次响应耗时（秒）')
+    parser.add_argument('--token-budget', type=int, default=3000, help='每批 token 预算')
+    args = parser.parse_args()
+    
+    titles = load_seed_titles()[:args.count]
+    news_list = [{'title': title, 'source': '测试来源'} for title in titles]
+    
+    StandInHandler.delay = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/messages"
+    
+    timings = {}
+    first_verdict = {}
+    try:
+        for workers, stream in ((1, False), (4, False), (4, True)):
+            StandInHandler.seen_batches = set()
+            mode = '流式' if stream else '整批'
+            print(f"\n{'=' * 60}\n并发 {workers}（{mode}）\n{'=' * 60}")
+            filtered, stats, results, elapsed = run_filter(url, news_list, workers,
+                                                           args.token_budget, stream)
+            timings[(workers, stream)] = elapsed
+            first_verdict[(workers, stream)] = stats['first_verdict']
+            
+            # 校验
+            assert stats['unanswered'] == 0, stats
+            assert len(results) == len(news_list)
+            for result in results:
+                assert result['keep'] == expected_keep(news_list[result['id'] - 1]['title'])
+            assert [n['title'] for n in filtered] == [
+                n['title'] for n in news_list if expected_keep(n['title'])
+            ]
+            dispatch = stats['dispatch']
+            assert dispatch['retries'] > 0 and dispatch['partial'] > 0, dispatch
+            assert dispatch['resubmitted'] > 0, dispatch
+    finally:
+        server.shutdown()
+    
+    print(f"\n{'=' * 60}")
+    print("一致性校验: ✅ 全部通过")
+    print(f"串行耗时: {timings[(1, False)]:.2f}秒 | 并发4: {timings[(4, False)]:.2f}秒 | "
+          f"加速比: {timings[(1, False)] / timings[(4, False)]:.1f}x")
+    print(f"首条结论: 整批 {first_verdict[(4, False)]:.2f}秒 | 流式 {first_verdict[(4, True)]:.2f}秒 | "
+          f"流式总耗时 {timings[(4, True)]:.2f}秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+渲染配置对比测试 - 逐站测量开启/关闭资源拦截时的传输字节数、请求数和页面就绪耗时
+
+每个网站在全新的浏览器上下文（无缓存）中依次打开，不开启 / 开启渲染配置各 repeat 次，
+传输字节数取 Chrome DevTools 协议 Network.loadingFinished 的 encodedDataLength 之和，
+同时统计取到的链接数，确认拦截资源后列表仍然完整。
+
+用法:
+    python3 test_render_profile.py
+    python3 test_render_profile.py --sites 财联社 中工网 --repeat 3
+"""
+
+import argparse
+import asyncio
+
+from browser_pool import BrowserPool, collect_links
+from complete_crawler import SOURCES
+
+
+async def measure(pool, source, use_profile):
+    """打开一次列表页，返回 (传输字节数, 请求数, 就绪秒数, 链接数)"""
+    transfer = {'bytes': 0, 'requests': 0}
+    
+    def on_finished(event):
+        transfer['bytes'] += event.get('encodedDataLength', 0)
+        transfer['requests'] += 1
+    
+    async with pool.page(source['url'] if use_profile else None) as page:
+        session = await page.context.new_cdp_session(page)
+        await session.send('Network.enable')
+        session.on('Network.loadingFinished', on_finished)
+        ready = await pool.goto_ready(page, source['url'], source.get('ready', source['links']))
+        links = await collect_links(page, source['links'], source.get('limit', 50), source.get('title_attr'))
+    return transfer['bytes'], transfer['requests'], ready, len(links)
+
+
+async def run(sources, repeat):
+    results = []
+    async with BrowserPool(max_contexts=1) as pool:
+        for source in sources:
+            row = {'name': source['name']}
+            for use_profile in (False, True):
+                samples = []
+                for _ in range(repeat):
+                    try:
+                        samples.append(await measure(pool, source, use_profile))
+                    except Exception as e:
+                        print(f"  ✗ {source['name']}（{'开启' if use_profile else '关闭'}）: {e}")
+                if samples:
+                    row[use_profile] = [sum(values) / len(samples) for values in zip(*samples)]
+            results.append(row)
+            print(f"  ✓ {source['name']}")
+        print(f"\n拦截请求共 {pool.stats['blocked']} 个")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='渲染配置对比测试')
+    parser.add_argument('--sites', nargs='*', help='只测这些网站（按名称，默认 complete_crawler 的全部7个）')
+    parser.add_argument('--repeat', type=int, default=2, help='每种配置重复次数（取平均）')
+    args = parser.parse_args()
+    
+    sources = [source for source in SOURCES if not args.sites or source['name'] in args.sites]
+    print(f"🌐 {len(sources)} 个网站，每种配置 {args.repeat} 次")
+    results = asyncio.run(run(sources, args.repeat))
+    
+    print("\n" + "=" * 96)
+    print(f"{'网站':<10} {'传输KB(关)':>10} {'传输KB(开)':>10} {'节省':>7} "
+          f"{'请求(关)':>8} {'请求(开)':>8} {'就绪秒(关)':>10} {'就绪秒(开)':>10} {'链接(关/开)':>12}")
+    print("=" * 96)
+    totals = {False: [0, 0], True: [0, 0]}
+    for row in results:
+        if False not in row or True not in row:
+            print(f"{row['name']:<10} 测量失败")
+            continue
+        off, on = row[False], row[True]
+        for key, values in ((False, off), (True, on)):
+            totals[key][0] += values[0]
+            totals[key][1] += values[2]
+        saved = 1 - on[0] / off[0] if off[0] else 0
+        print(f"{row['name']:<10} {off[0] / 1024:>10.1f} {on[0] / 1024:>10.1f} {saved:>7.1%} "
+              f"{off[1]:>8.0f} {on[1]:>8.0f} {off[2]:>10.2f} {on[2]:>10.2f} "
+              f"{f'{off[3]:.0f}/{on[3]:.0f}':>12}")
+    if totals[False][0]:
+        print("-" * 96)
+        print(f"{'合计':<10} {totals[False][0] / 1024:>10.1f} {totals[True][0] / 1024:>10.1f} "
+              f"{1 - totals[True][0] / totals[False][0]:>7.1%} {'':>8} {'':>8} "
+              f"{totals[False][1]:>10.2f} {totals[True][1]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式评分一致性测试 - NewsFilter.score_columns 与逐条 calculate_score 结果相同
+
+1. 一致性：每个板块、每条新闻的分数和评分原因与 calculate_score 完全相同；
+   rank(阈值) 的顺序与 filter_news 的筛选排序相同
+2. 性能：逐条评分 vs 列式评分每条标题的耗时
+
+测试数据为 data/raw/*.csv 中的真实标题（随机来源，见 bench_fixtures.py），
+加上覆盖各评分分支的固定样例（权威/官方/一般来源、数据、地区、措施、排除词、空标题）。
+
+用法:
+    python3 test_score_columns.py
+    python3 test_score_columns.py --repeat 20
+"""
+
+import argparse
+import copy
+import time
+
+from bench_fixtures import build_news, load_seed_titles
+from filter_quality_news import NewsFilter
+
+FIXTURES = [
+    {'title': '国家医保局印发通知 推进药品集采落地', 'source': '人民网'},
+    {'title': '北京市发布人才引进政策 高校毕业生就业补贴提高20%', 'source': '市政府官网'},
+    {'title': '生物医药产业基金投资50亿 江苏启动示范平台建设', 'source': '网易新闻'},
+    {'title': '医药ETF涨停 创新药板块发展', 'source': '新华网'},
+    {'title': '教育部出台职业教育改革方案', 'source': ''},
+    {'title': '今日天气晴', 'source': '人民网'},
+    {'title': '', 'source': '新华网'},
+    {'title': '省卫健委：试点联盟平台上线', 'source': None},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列式评分一致性测试')
+    parser.add_argument('--repeat', type=int, default=5, help='性能测试重复次数')
+    parser.add_argument('--threshold', type=int, default=60, help='排名比较用的阈值')
+    args = parser.parse_args()
+    
+    news_list = FIXTURES + build_news(load_seed_titles())
+    print(f"测试新闻: {len(news_list)} 条")
+    
+    news_filter = NewsFilter()
+    titles = [news['title'] for news in news_list]
+    sources = [news['source'] for news in news_list]
+    sectors = list(news_filter.must_include_keywords)
+    
+    # 一致性校验
+    for sector in sectors:
+        matrix = news_filter.score_columns(titles, sources, sector)
+        for index, news in enumerate(news_list):
+            item = {'title': news['title'] or '', 'source': news['source'] or ''}
+            score, reasons = news_filter.calculate_score(item, sector)
+            assert int(matrix.scores[index]) == score, (sector, news['title'], int(matrix.scores[index]), score)
+            assert matrix.reasons(index) == reasons, (sector, news['title'])
+        
+        filtered = news_filter.filter_news([
+            {'title': news['title'] or '', 'source': news['source'] or '', 'index': index}
+            for index, news in enumerate(copy.deepcopy(news_list))
+        ], sector, args.threshold)
+        ranked = [int(index) for index in matrix.rank(args.threshold)]
+        assert ranked == [news['index'] for news in filtered], sector
+        assert matrix.kept_counts([args.threshold])[args.threshold] == len(filtered), sector
+        print(f"  ✓ {sector}: 阈值 {args.threshold} 保留 {len(filtered)} 条")
+    print("一致性校验: ✅ 全部通过")
+    
+    def run_items():
+        for sector in sectors:
+            for news in news_list:
+                news_filter.calculate_score({'title': news['title'] or '', 'source': news['source'] or ''}, sector)
+    
+    def run_columns():
+        for sector in sectors:
+            news_filter.score_columns(titles, sources, sector)
+    
+    timings = {}
+    for name, func in (('逐条评分', run_items), ('列式评分', run_columns)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            func()
+        timings[name] = (time.perf_counter() - start) / (args.repeat * len(news_list) * len(sectors)) * 1e6
+    
+    print("\n" + "=" * 50)
+    for name, value in timings.items():
+        print(f"{name:<10} {value:>8.2f}µs/条")
+    print(f"加速比: {timings['逐条评分'] / timings['列式评分']:.1f}x")
+    print("测试完成！")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标题预分类器评估 - 与大模型结论的一致率、可省去的大模型调用比例
+
+对训练数据做 k 折交叉验证：每折用其余数据训练，对本折标题预测，
+按不同阈值统计：
+- 自动判定比例（= 省去的大模型调用比例）
+- 自动判定部分与大模型结论的一致率（保留 / 排除分别统计）
+
+只有大模型结论（结论缓存、--labels 文件）参与评估；参考标题库和已导出结果只用于训练。
+
+用法:
+    python3 test_title_classifier_eval.py
+    python3 test_title_classifier_eval.py --folds 10 --labels data/labels.json
+"""
+
+import argparse
+import random
+
+from title_classifier import TitleClassifier, load_classifier_settings, load_training_data
+
+# (保留阈值, 排除阈值)
+THRESHOLDS = [(0.9, 0.1), (0.95, 0.05), (0.99, 0.01), (0.999, 0.001)]
+
+
+def cross_validate(titles, labels, origins, folds, settings, seed=42):
+    """k 折交叉验证，返回 [(概率, 标签)]（只含大模型结论样本）"""
+    order = list(range(len(titles)))
+    random.Random(seed).shuffle(order)
+    
+    predictions = []
+    for fold in range(folds):
+        test = set(order[fold::folds])
+        train = [i for i in order if i not in test]
+        classifier = TitleClassifier(settings['ngram_sizes'], settings['alpha']).fit(
+            [titles[i] for i in train], [labels[i] for i in train]
+        )
+        for i in test:
+            if origins[i] == '大模型结论':
+                predictions.append((classifier.predict_proba(titles[i]), labels[i]))
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标题预分类器评估')
+    parser.add_argument('--folds', type=int, default=5, help='交叉验证折数')
+    parser.add_argument('--labels', nargs='*', default=[], help='额外的标注文件（JSON）')
+    args = parser.parse_args()
+    
+    settings = load_classifier_settings()
+    titles, labels, origins = load_training_data(args.labels)
+    llm_count = origins.count('大模型结论')
+    print(f"样本: {len(titles)} 条（其中大模型结论 {llm_count} 条，"
+          f"保留 {sum(labels)} / 排除 {len(labels) - sum(labels)}）")
+    
+    if llm_count == 0 or all(labels) or not any(labels):
+        print("⚠️  缺少大模型结论或缺少排除样本，无法评估（先积累结论缓存或提供 --labels）")
+        return
+    
+    predictions = cross_validate(titles, labels, origins, args.folds, settings)
+    
+    print("\n" + "=" * 78)
+    print(f"{'保留阈值':>8} {'排除阈值':>8} {'自动判定':>8} {'省去调用':>8} "
+          f"{'一致率':>8} {'保留一致':>10} {'排除一致':>10}")
+    print("=" * 78)
+    for keep_threshold, reject_threshold in THRESHOLDS:
+        decided = agree = 0
+        keep_total = keep_agree = reject_total = reject_agree = 0
+        for probability, label in predictions:
+            if probability >= keep_threshold:
+                decision = True
+            elif probability <= reject_threshold:
+                decision = False
+            else:
+                continue
+            decided += 1
+            agree += decision == label
+            if decision:
+                keep_total += 1
+                keep_agree += label
+            else:
+                reject_total += 1
+                reject_agree += not label
+        
+        rate = decided / len(predictions)
+        agreement = agree / decided if decided else 0.0
+        keep_text = f"{keep_agree}/{keep_total}"
+        reject_text = f"{reject_agree}/{reject_total}"
+        print(f"{keep_threshold:>8} {reject_threshold:>8} {decided:>8} {rate:>8.1%} "
+              f"{agreement:>8.1%} {keep_text:>10} {reject_text:>10}")
+    
+    current = (settings['keep_threshold'], settings['reject_threshold'])
+    print(f"\n当前配置阈值: 保留≥{current[0]} / 排除≤{current[1]}")
+    print("评估完成！")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标题预分类器 - 字符 n-gram 朴素贝叶斯，放在 LLMFilter 前面减少大模型调用
+
+通过关键词筛选和质量筛选的标题以前全部交给大模型，其中有大量一眼就能判断的
+（部委政策发布 → 保留，荐股行情 → 排除）。这里离线训练一个本地分类器：
+- 训练数据：大模型的历史结论（data/cache/llm_verdicts.db）、
+  参考标题库（references/*_titles.md，均为保留）、已导出的筛选结果（data/filtered/*.csv，均为保留）
+- 推理时高置信度的标题直接判定，只有不确定区间的标题交给大模型
+- 本地判定的结论不写入大模型结论缓存，避免用分类器自己的输出再训练
+
+用法:
+    python3 title_classifier.py --train
+    python3 title_classifier.py --predict "国家医保局印发新版药品目录"
+"""
+
+import csv
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+
+from deduplicator import NewsDeduplicator
+from verdict_cache import load_cache_settings
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 聚合标题末尾的 " - 来源"
+SOURCE_SUFFIX = re.compile(r'\s+-\s+[^-]{1,30}$')
+
+
+def load_classifier_settings():
+    """读取 ai_settings.pre_classifier 配置"""
+    settings = {
+        'enabled': True,
+        'model_path': '../data/cache/title_classifier.json',
+        'keep_threshold': 0.99,
+        'reject_threshold': 0.01,
+        'ngram_sizes': [1, 2, 3],
+        'alpha': 1.0
+    }
+    config_path = os.path.join(SCRIPT_DIR, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('ai_settings', {}).get('pre_classifier', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+class TitleClassifier:
+    """字符 n-gram 朴素贝叶斯分类器（标签：1 保留 / 0 排除）"""
+    
+    def __init__(self, ngram_sizes=(1, 2, 3), alpha=1.0):
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.alpha = alpha
+        self.normalizer = NewsDeduplicator()
+        self.docs = {0: 0, 1: 0}
+        self.counts = {0: Counter(), 1: Counter()}
+        self.totals = {0: 0, 1: 0}
+        self.vocab_size = 0
+        self.meta = {}
+    
+    def features(self, title):
+        """标题 → 字符 n-gram 集合（去掉来源后缀、标准化）"""
+        title = SOURCE_SUFFIX.sub('', title or '')
+        text = re.sub(r'\s+', '', self.normalizer.normalize_title(title))
+        grams = set()
+        for size in self.ngram_sizes:
+            for i in range(len(text) - size + 1):
+                grams.add(text[i:i + size])
+        return grams
+    
+    def fit(self, titles, labels):
+        """训练"""
+        self.docs = {0: 0, 1: 0}
+        self.counts = {0: Counter(), 1: Counter()}
+        for title, label in zip(titles, labels):
+            label = 1 if label else 0
+            self.docs[label] += 1
+            self.counts[label].update(self.features(title))
+        self.totals = {label: sum(counter.values()) for label, counter in self.counts.items()}
+        self.vocab_size = len(set(self.counts[0]) | set(self.counts[1]))
+        self.meta = {
+            'trained_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'samples': {'keep': self.docs[1], 'reject': self.docs[0]}
+        }
+        return self
+    
+    @property
+    def trained(self):
+        """两类都有样本才能判定"""
+        return self.docs[0] > 0 and self.docs[1] > 0
+    
+    def predict_proba(self, title):
+        """标题应保留的概率"""
+        if not self.trained:
+            return 0.5
+        
+        alpha = self.alpha
+        log_odds = math.log(self.docs[1] / self.docs[0])
+        denominator = {
+            label: self.totals[label] + alpha * (self.vocab_size + 1) for label in (0, 1)
+        }
+        for gram in self.features(title):
+            log_odds += math.log((self.counts[1].get(gram, 0) + alpha) / denominator[1])
+            log_odds -= math.log((self.counts[0].get(gram, 0) + alpha) / denominator[0])
+        
+        if log_odds >= 0:
+            return 1 / (1 + math.exp(-log_odds))
+        odds = math.exp(log_odds)
+        return odds / (1 + odds)
+    
+    def save(self, path):
+        """保存为 JSON"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            'version': 1,
+            'ngram_sizes': list(self.ngram_sizes),
+            'alpha': self.alpha,
+            'docs': {str(label): count for label, count in self.docs.items()},
+            'counts': {str(label): dict(counter) for label, counter in self.counts.items()},
+            'meta': self.meta
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, path):
+        """从 JSON 加载"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        classifier = cls(data['ngram_sizes'], data['alpha'])
+        classifier.docs = {int(label): count for label, count in data['docs'].items()}
+        classifier.counts = {int(label): Counter(counter) for label, counter in data['counts'].items()}
+        classifier.totals = {label: sum(counter.values()) for label, counter in classifier.counts.items()}
+        classifier.vocab_size = len(set(classifier.counts[0]) | set(classifier.counts[1]))
+        classifier.meta = data.get('meta', {})
+        return classifier
+
+
+class ClassifierCascade:
+    """预分类级联：高置信度本地判定，不确定的交给大模型"""
+    
+    def __init__(self, classifier, keep_threshold=0.99, reject_threshold=0.01):
+        self.classifier = classifier
+        self.keep_threshold = keep_threshold
+        self.reject_threshold = reject_threshold
+    
+    def decide(self, news_item):
+        """
+        判定一条新闻
+        
+        Returns:
+            {'keep': bool, 'reason': str, 'probability': float}；不确定时返回 None
+        """
+        probability = self.classifier.predict_proba(news_item.get('title', ''))
+        if probability >= self.keep_threshold:
+            return {'keep': True, 'reason': f"预分类保留({probability:.2f})", 'probability': probability}
+        if probability <= self.reject_threshold:
+            return {'keep': False, 'reason': f"预分类排除({probability:.2f})", 'probability': probability}
+        return None
+    
+    @classmethod
+    def from_config(cls):
+        """按配置加载已训练的模型；未启用或未训练时返回 None"""
+        settings = load_classifier_settings()
+        if not settings['enabled']:
+            return None
+        model_path = os.path.join(SCRIPT_DIR, settings['model_path'])
+        if not os.path.exists(model_path):
+            return None
+        try:
+            classifier = TitleClassifier.load(model_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  ⚠️  预分类模型加载失败，全部交给大模型: {e}")
+            return None
+        if not classifier.trained:
+            return None
+        return cls(classifier, settings['keep_threshold'], settings['reject_threshold'])
+
+
+def load_reference_titles():
+    """参考标题库（references/*_titles.md 中的编号行）"""
+    titles = []
+    for path in sorted(glob.glob(os.path.join(SCRIPT_DIR, '../references/*_titles.md'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = re.match(r'^\s*\d+\.\s+(.+?)\s*$', line)
+                if match:
+                    titles.append(match.group(1))
+    return titles
+
+
+def load_filtered_titles():
+    """已导出的筛选结果（data/filtered/*.csv，均为大模型保留的新闻）"""
+    titles = []
+    for path in sorted(glob.glob(os.path.join(SCRIPT_DIR, '../data/filtered/*.csv'))):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                if row.get('标题'):
+                    titles.append(row['标题'])
+    return titles
+
+
+def load_cached_verdicts(db_path=None):
+    """大模型结论缓存中的 (标题, 是否保留)"""
+    db_path = db_path or os.path.join(SCRIPT_DIR, load_cache_settings()['db_path'])
+    if not os.path.exists(db_path):
+        return []
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            return [(title, bool(keep)) for title, keep in
+                    conn.execute('SELECT title, keep FROM verdicts')]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"  ⚠️  读取结论缓存失败: {e}")
+        return []
+
+
+def load_training_data(extra_label_files=()):
+    """
+    汇总训练数据（同一标准化标题以大模型结论为准）
+    
+    Args:
+        extra_label_files: 额外的标注文件（JSON 数组，元素含 title 和 keep，视为大模型结论）
+    
+    Returns:
+        (标题列表, 标签列表, 来源列表)；来源为 '参考标题库' / '已导出结果' / '大模型结论'
+    """
+    normalizer = NewsDeduplicator()
+    samples = {}
+    
+    def add(origin, title, keep, override):
+        key = normalizer.normalize_title(SOURCE_SUFFIX.sub('', title))
+        if key and (override or key not in samples):
+            samples[key] = (title, keep, origin)
+    
+    for title in load_reference_titles():
+        add('参考标题库', title, True, False)
+    for title in load_filtered_titles():
+        add('已导出结果', title, True, False)
+    for path in extra_label_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                add('大模型结论', item['title'], bool(item['keep']), True)
+    for title, keep in load_cached_verdicts():
+        add('大模型结论', title, keep, True)
+    
+    titles = [title for title, _, _ in samples.values()]
+    labels = [keep for _, keep, _ in samples.values()]
+    origins = [origin for _, _, origin in samples.values()]
+    return titles, labels, origins
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='标题预分类器')
+    parser.add_argument('--train', action='store_true', help='用历史结论训练并保存模型')
+    parser.add_argument('--labels', nargs='*', default=[], help='额外的标注文件（JSON）')
+    parser.add_argument('--predict', nargs='*', default=[], help='预测标题保留概率')
+    args = parser.parse_args()
+    
+    settings = load_classifier_settings()
+    model_path = os.path.join(SCRIPT_DIR, settings['model_path'])
+    
+    if args.train:
+        titles, labels, origins = load_training_data(args.labels)
+        for name, count in Counter(origins).items():
+            print(f"  {name}: {count} 条")
+        classifier = TitleClassifier(settings['ngram_sizes'], settings['alpha']).fit(titles, labels)
+        print(f"📚 训练样本: 保留 {classifier.docs[1]} 条, 排除 {classifier.docs[0]} 条")
+        if not classifier.trained:
+            print("⚠️  缺少排除样本（大模型结论缓存为空），模型不会自动判定任何新闻")
+        classifier.save(model_path)
+        print(f"✅ 模型已保存: {model_path}")
+    
+    if args.predict:
+        classifier = TitleClassifier.load(model_path)
+        cascade = ClassifierCascade(classifier, settings['keep_threshold'], settings['reject_threshold'])
+        for title in args.predict:
+            decision = cascade.decide({'title': title})
+            probability = classifier.predict_proba(title)
+            status = decision['reason'] if decision else '不确定 → 大模型'
+            print(f"  {probability:.3f}  {status}  {title}")
+
+
+if __name__ == '__main__':
+    main()
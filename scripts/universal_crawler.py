@@ -3,17 +3,23 @@
 """
 通用新闻爬虫 - 自动识别网页结构
 只需提供URL，自动提取新闻列表
+
+第一次识别成功后按列表页保存模板，之后的页面按模板一次定位（listing_templates.py）；
+首页静态抓取识别到的新闻太少时用浏览器渲染再识别一次，按域名记住是否需要浏览器（render_probe.py）
 """
 
 import json
 import os
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import time
+from html_parser import parse_html
+from http_client import get_http_client
 import re
 from urllib.parse import urljoin
 import urllib3
+from seen_index import SeenStoryIndex
+from keyword_matcher import get_sector_matcher
+from render_probe import BROWSER, STATIC, get_render_memory
+from listing_templates import apply_template, date_selector, get_template_store
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -24,17 +30,16 @@ class UniversalNewsCrawler:
     def __init__(self, sector):
         self.sector = sector
         self.results = []
-        self.session = requests.Session()
-        
-        # 设置请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        })
+        # 共享HTTP客户端（连接池 + 重试 + 按主机限速）
+        self.session = get_http_client()
+        # 按域名记住列表页是否需要浏览器渲染
+        self.render_memory = get_render_memory()
+        # 按列表页保存的自动识别模板
+        self.templates = get_template_store()
         
         # 加载关键词
         self.keywords = self.load_keywords()
+        self.matcher = get_sector_matcher(sector, self.keywords, extended=True)
     
     def load_keywords(self):
         """加载关键词"""
@@ -52,10 +57,77 @@ class UniversalNewsCrawler:
             else:
                 return ['教育', '人才', '高校', '培训', '就业']
     
-    def auto_detect_news_list(self, soup, base_url):
-        """自动识别新闻列表 - 增强版"""
+    def auto_detect_news_list(self, soup, base_url, mode=STATIC, use_template=True):
+        """
+        自动识别新闻列表 - 增强版（已有模板时按模板一次定位，新闻数明显下降时重新识别）
+        
+        Args:
+            soup: 页面
+            base_url: 列表页URL
+            mode: 页面的获取方式（STATIC / BROWSER），模板按 (列表页, 获取方式) 分别学习
+            use_template: 为 False 时不套用已有模板，总是完整识别（渲染方式探测时使用）
+        """
+        key = self.template_key(base_url, mode)
+        template = self.templates.get(key) if use_template else None
+        if template:
+            news_items = self.extract_with_template(soup, base_url, template)
+            if self.templates.is_valid(template, len(news_items)):
+                self.templates.count('hits')
+                return news_items
+            print(f"     🧩 模板只取到 {len(news_items)} 条（学习时 {template['yield']} 条），重新识别")
+            self.templates.invalidate(key)
+        
+        self.templates.count('detected')
+        news_items, container_counts, date_position = self.detect_news_list(soup, base_url)
+        # 按模板在同一页面上取到的新闻必须与完整识别相同，否则以后的页面会漏掉新闻
+        expected = self._item_keys(news_items)
+        self.templates.learn(
+            key, soup, container_counts, date_position, expected=len(news_items),
+            check=lambda template: self._item_keys(
+                self.extract_with_template(soup, base_url, template)) == expected
+        )
+        return news_items
+    
+    def template_key(self, base_url, mode):
+        """模板的键：静态页面学到的模板不能套用到浏览器渲染后的 DOM 上，两者分别保存"""
+        return f"{base_url}#{BROWSER}" if mode == BROWSER else base_url
+    
+    def _item_keys(self, news_items):
+        """比较两组识别结果用的 (标题, 链接, 时间) 集合"""
+        return {(item['title'], item['url'], item['published']) for item in news_items}
+    
+    def extract_with_template(self, soup, base_url, template):
+        """按模板的容器路径取链接（只在模板记录了日期位置时提取日期）"""
         news_items = []
         seen_urls = set()
+        for link, date_element in apply_template(soup, template):
+            title = link.get_text(strip=True)
+            url = urljoin(base_url, link['href'])
+            if (title and
+                len(title) >= 8 and len(title) <= 150 and
+                url not in seen_urls and
+                not self._is_invalid_link(url)):
+                
+                seen_urls.add(url)
+                news_items.append({
+                    'title': title,
+                    'url': url,
+                    'source': base_url,
+                    'published': self._extract_date(date_element)
+                })
+        return news_items
+    
+    def detect_news_list(self, soup, base_url):
+        """
+        完整自动识别
+        
+        Returns:
+            (新闻列表, [(容器, 产出的新闻数), ...], 日期位置)
+        """
+        news_items = []
+        seen_urls = set()
+        container_counts = []
+        date_position = None
         
         # 策略1: 查找常见新闻列表容器
         patterns = [
@@ -71,6 +143,7 @@ class UniversalNewsCrawler:
             for container in containers:
                 links = container.find_all('a', href=True)
                 if len(links) >= 3:  # 降低阈值到3个
+                    accepted = 0
                     for link in links[:100]:
                         title = link.get_text(strip=True)
                         url = urljoin(base_url, link['href'])
@@ -91,6 +164,11 @@ class UniversalNewsCrawler:
                                 'source': base_url,
                                 'published': published
                             })
+                            accepted += 1
+                            if published and date_position is None:
+                                date_position = date_selector(link.parent, published)
+                    if accepted:
+                        container_counts.append((container, accepted))
             
             if len(news_items) >= 20:
                 break
@@ -123,7 +201,7 @@ class UniversalNewsCrawler:
                                 'published': published
                             })
         
-        return news_items
+        return news_items, container_counts, date_position
     
     def _extract_date(self, element):
         """提取日期时间"""
@@ -158,36 +236,20 @@ class UniversalNewsCrawler:
         return any(re.search(p, url, re.I) for p in invalid_patterns)
     
     def match_keywords(self, title):
-        """关键词匹配 - 增强版"""
-        # 基础匹配
-        for keyword in self.keywords:
-            if keyword in title:
-                return True
-        
-        # 扩展匹配：同义词和相关词
-        if self.sector == 'healthcare':
-            extended_keywords = [
-                '药企', '药厂', '制药', '新药', '仿制药',
-                '医生', '护士', '患者', '病人',
-                '诊所', '卫生', '疾控', 'CDC',
-                '医学', '临床', '手术', '治疗'
-            ]
-        else:  # education
-            extended_keywords = [
-                '学生', '教师', '老师', '校长',
-                '大学生', '研究生', '博士', '硕士',
-                '招生', '考试', '升学', '毕业',
-                '科研', '学术', '论文', '课题'
-            ]
-        
-        for keyword in extended_keywords:
-            if keyword in title:
-                return True
-        
-        return False
+        """关键词匹配 - 增强版（板块关键词 + 同义词/相关词，多模式自动机一次扫描）"""
+        return self.matcher.search(title)
     
-    def crawl_url(self, url, max_pages=3):
-        """爬取单个URL（支持翻页）"""
+    def crawl_url(self, url, max_pages=3, routes=None):
+        """
+        爬取单个URL（支持翻页）
+        
+        参数:
+            url: 新闻列表页URL
+            max_pages: 最大翻页数
+            routes: 共用本次抓取结果的爬虫列表（多板块模式下每个板块一个爬虫，
+                    页面只下载解析一次，按各自的关键词分别过滤），默认只有自己
+        """
+        routes = routes or [self]
         print(f"\n🔍 爬取: {url}")
         
         for page in range(1, max_pages + 1):
@@ -197,34 +259,82 @@ class UniversalNewsCrawler:
                 
                 print(f"  📄 第 {page} 页...")
                 
-                # 禁用SSL验证
-                response = self.session.get(page_url, timeout=10, verify=False)
-                response.encoding = response.apparent_encoding or 'utf-8'
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 自动识别新闻列表
-                news_items = self.auto_detect_news_list(soup, url)
+                mode = self.render_memory.mode(page_url)
+                if mode == BROWSER:
+                    # 已知需要JS渲染的域名直接用浏览器
+                    news_items = self.render_news_list(page_url, url)
+                    self.render_memory.count(BROWSER)
+                else:
+                    # 禁用SSL验证
+                    response = self.session.get_conditional(page_url, source=url, verify=False)
+                    
+                    # 页面自上次运行以来未变化（304）：取回上次从这份响应体识别出的新闻，不再解析
+                    news_items = self.session.cached_items('universal', page_url, response)
+                    if news_items is not None:
+                        print(f"     🗄️  页面未变化，跳过解析")
+                    else:
+                        response.encoding = response.apparent_encoding or 'utf-8'
+                        # 自动识别要上溯链接的容器和父元素，需要完整解析
+                        soup = parse_html(response.text)
+                        
+                        # 自动识别新闻列表
+                        news_items = self.auto_detect_news_list(soup, url)
+                        self.session.store_items('universal', page_url, response, news_items)
+                    news_items = self.probe_render_mode(page_url, url, news_items, mode, page)
                 
                 if not news_items:
                     print(f"     ✗ 未找到新闻，停止翻页")
                     break
                 
-                # 关键词过滤
+                # 关键词过滤（分别按每个板块的关键词）
                 matched = 0
-                for item in news_items:
-                    if self.match_keywords(item['title']):
-                        item['crawled_at'] = datetime.now().isoformat()
-                        self.results.append(item)
-                        matched += 1
+                for crawler in routes:
+                    for item in news_items:
+                        if crawler.match_keywords(item['title']):
+                            item = dict(item, crawled_at=datetime.now().isoformat())
+                            crawler.results.append(item)
+                            matched += 1
                 
                 print(f"     ✓ 找到 {len(news_items)} 条新闻，匹配 {matched} 条")
                 
-                time.sleep(1)  # 礼貌延迟
-                
             except Exception as e:
                 print(f"     ✗ 第 {page} 页爬取失败: {e}")
                 break
     
+    def render_news_list(self, page_url, base_url, use_template=True):
+        """用共享浏览器渲染页面后识别新闻列表（use_template 见 auto_detect_news_list）"""
+        from browser_pool import get_browser_thread
+        html = get_browser_thread().render(page_url)
+        return self.auto_detect_news_list(parse_html(html), base_url, BROWSER, use_template)
+    
+    def probe_render_mode(self, page_url, base_url, news_items, mode, page):
+        """
+        首页静态识别到的新闻太少时用浏览器再试一次，记住该域名的结论
+        
+        Returns:
+            两种方式中新闻更多的结果
+        """
+        memory = self.render_memory
+        if page != 1 or not memory.needs_probe(page_url, len(news_items)):
+            if page == 1 and mode is None and memory.enabled:
+                memory.remember(page_url, STATIC, len(news_items))
+            memory.count(STATIC)
+            return news_items
+        
+        try:
+            # 探测时渲染结果总是完整识别，与静态结果比较的才是页面真正的新闻数
+            rendered = self.render_news_list(page_url, base_url, use_template=False)
+        except Exception as e:
+            print(f"     ⚠️  浏览器渲染失败: {e}")
+            memory.count(STATIC)
+            return news_items
+        
+        if memory.decide(page_url, len(news_items), len(rendered)) == BROWSER:
+            memory.count(BROWSER)
+            return rendered
+        memory.count(STATIC)
+        return news_items
+    
     def _build_page_url(self, base_url, page):
         """构造翻页URL - 增强版"""
         if page == 1:
@@ -258,6 +368,9 @@ class UniversalNewsCrawler:
     
     def save_results(self):
         """保存结果（追加模式 + 智能去重）"""
+        # 跨天去重：丢弃以前运行中已经处理过的新闻
+        self.results = SeenStoryIndex(self.sector).filter_new(self.results)
+        
         if not self.results:
             print("\n⚠️  没有找到匹配的新闻")
             return
@@ -333,4 +446,7 @@ if __name__ == '__main__':
     crawler = UniversalNewsCrawler(args.sector)
     crawler.crawl_url(args.url, args.pages)
     crawler.save_results()
+    crawler.session.print_stats()
+    crawler.render_memory.print_stats()
+    crawler.templates.print_stats()
 
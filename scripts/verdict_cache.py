@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型筛选结论缓存 - 按标准化标题、来源、模型和提示词版本持久化
+
+同一条新闻跨天、跨板块重复出现时直接复用上次的结论，不再重复调用大模型。
+缓存键包含系统提示词的哈希，修改提示词后旧结论自动失效（并在打开时清理）。
+
+用法:
+    python3 verdict_cache.py --stats
+    python3 verdict_cache.py --compact
+    python3 verdict_cache.py --compact --ttl-days 7
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from deduplicator import NewsDeduplicator
+
+
+def load_cache_settings():
+    """从 references/config.json 读取 llm_cache 配置"""
+    settings = {
+        'enabled': True,
+        'db_path': '../data/cache/llm_verdicts.db',
+        'ttl_days': 30
+    }
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, '../references/config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('llm_cache', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def prompt_hash(system_prompt):
+    """提示词版本（系统提示词的哈希）"""
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+
+class VerdictCache:
+    """大模型筛选结论缓存"""
+    
+    def __init__(self, model, system_prompt, db_path=None, ttl_days=None, enabled=None):
+        """
+        初始化缓存
+        
+        Args:
+            model: 模型名称（缓存键的一部分；为 None 时只用于维护，不清理旧版本）
+            system_prompt: 系统提示词（其哈希作为提示词版本）
+            db_path: SQLite文件路径，默认 data/cache/llm_verdicts.db
+            ttl_days: 结论保留天数
+            enabled: 是否启用；关闭后 lookup 全部未命中、store 不写入
+        """
+        settings = load_cache_settings()
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        
+        self.model = model
+        self.prompt_version = prompt_hash(system_prompt)
+        self.enabled = settings['enabled'] if enabled is None else enabled
+        self.db_path = db_path or os.path.join(script_dir, settings['db_path'])
+        self.ttl_days = settings['ttl_days'] if ttl_days is None else ttl_days
+        self.normalizer = NewsDeduplicator()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._conn = None
+    
+    def connect(self):
+        """打开数据库（按需创建表，清理旧提示词版本的结论）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    keep INTEGER NOT NULL,
+                    reason TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_verdicts_created_at ON verdicts(created_at);
+            ''')
+            if self.model is not None:
+                with self._conn:
+                    removed = self._conn.execute(
+                        'DELETE FROM verdicts WHERE model = ? AND prompt_version != ?',
+                        (self.model, self.prompt_version)
+                    ).rowcount
+                if removed:
+                    print(f"  🧹 提示词已变更，清理 {removed} 条旧结论缓存")
+        return self._conn
+    
+    def close(self):
+        """关闭数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def make_key(self, news_item):
+        """缓存键：标准化标题 + 来源 + 模型 + 提示词版本"""
+        title = self.normalizer.normalize_title(news_item.get('title', ''))
+        source = (news_item.get('source') or '').strip()
+        raw = '\x1f'.join([title, source, self.model, self.prompt_version])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def lookup(self, news_list):
+        """
+        批量查询缓存
+        
+        Returns:
+            dict: news_list 下标 → {'keep': bool, 'reason': str}（只包含命中的新闻）
+        """
+        if not self.enabled or not news_list:
+            self.stats['misses'] += len(news_list)
+            return {}
+        
+        cutoff = time.time() - self.ttl_days * 86400
+        verdicts = {}
+        try:
+            conn = self.connect()
+            for i, news in enumerate(news_list):
+                row = conn.execute(
+                    'SELECT keep, reason FROM verdicts WHERE key = ? AND created_at >= ?',
+                    (self.make_key(news), cutoff)
+                ).fetchone()
+                if row:
+                    verdicts[i] = {'keep': bool(row[0]), 'reason': row[1]}
+        except sqlite3.Error as e:
+            print(f"  ⚠️  结论缓存不可用，全部重新判断: {e}")
+            verdicts = {}
+        
+        self.stats['hits'] += len(verdicts)
+        self.stats['misses'] += len(news_list) - len(verdicts)
+        return verdicts
+    
+    def store(self, pairs):
+        """
+        保存大模型结论
+        
+        Args:
+            pairs: [(新闻, {'keep': bool, 'reason': str}), ...]
+        """
+        if not self.enabled or not pairs:
+            return
+        
+        now = time.time()
+        try:
+            conn = self.connect()
+            with conn:
+                for news, verdict in pairs:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO verdicts '
+                        '(key, model, prompt_version, title, keep, reason, created_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (self.make_key(news), self.model, self.prompt_version,
+                         news.get('title', ''), int(bool(verdict.get('keep'))),
+                         verdict.get('reason', ''), now)
+                    )
+            self.stats['stored'] += len(pairs)
+        except sqlite3.Error as e:
+            print(f"  ⚠️  结论缓存写入失败: {e}")
+    
+    def reset_stats(self):
+        """清零本次运行的统计"""
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+    
+    def hit_rate(self):
+        """本次运行的缓存命中率"""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+    
+    def print_stats(self):
+        """打印本次运行的缓存统计"""
+        print(f"\n🗄️  结论缓存: 命中 {self.stats['hits']} 条, 未命中 {self.stats['misses']} 条, "
+              f"命中率 {self.hit_rate():.1%}, 新写入 {self.stats['stored']} 条")
+    
+    def compact(self, ttl_days=None):
+        """清理过期结论并压缩数据库，返回删除的记录数"""
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = time.time() - ttl_days * 86400
+        conn = self.connect()
+        with conn:
+            removed = conn.execute(
+                'DELETE FROM verdicts WHERE created_at < ?', (cutoff,)
+            ).rowcount
+        conn.execute('VACUUM')
+        return removed
+    
+    def size(self):
+        """缓存条数和文件大小"""
+        conn = self.connect()
+        return {
+            'verdicts': conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0],
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        }
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='大模型筛选结论缓存维护')
+    parser.add_argument('--compact', action='store_true', help='清理过期结论并压缩数据库')
+    parser.add_argument('--ttl-days', type=int, help='保留天数（默认读取配置）')
+    parser.add_argument('--stats', action='store_true', help='显示缓存统计')
+    args = parser.parse_args()
+    
+    # 维护命令不涉及具体模型和提示词，不清理旧版本结论
+    cache = VerdictCache(model=None, system_prompt='')
+    
+    if args.compact:
+        removed = cache.compact(args.ttl_days)
+        print(f"🧹 已清理 {removed} 条过期结论")
+    
+    size = cache.size()
+    print(f"📊 结论: {size['verdicts']} 条 | 文件大小: {size['size_bytes'] / 1024:.1f} KB")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()